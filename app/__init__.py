@@ -1,6 +1,6 @@
 # Flask application factory
 from flask import Flask
-from app.extensions import db, cors, migrate
+from app.extensions import db, cors, migrate, prediction_cache, artifact_store, image_fetcher, contact_writer, prediction_log, metrics, credential_cache, response_cache, upload_limits, model_registry
 from app.services import ImageAnalysisService
 
 def create_app():
@@ -10,37 +10,67 @@ def create_app():
     from config import Config
     app.config.from_object(Config)
     
-    print("Database URI:", app.config['SQLALCHEMY_DATABASE_URI'])
-
     # Ensure instance folder exists
     import os
     os.makedirs(os.path.join(app.instance_path), exist_ok=True)
 
-    # Initialize extensions
+    # Initialize extensions; the engine profile must be applied before
+    # Flask-SQLAlchemy builds the engines
+    from app import database
+    database.configure_engines(app)
     db.init_app(app)
+    database.apply_pragmas(app)
+    metrics.init_app(app)
     cors.init_app(app)
     migrate.init_app(app, db)
+    # Resolves MODEL_REVISION, which the prediction cache keys on
+    model_registry.init_app(app)
+    prediction_cache.init_app(app)
+    artifact_store.init_app(app)
+    image_fetcher.init_app(app)
+    contact_writer.init_app(app)
+    prediction_log.init_app(app)
+    credential_cache.init_app(app)
+    response_cache.init_app(app)
+    upload_limits.init_app(app)
+
+    from app.jobs import analysis_jobs
+    analysis_jobs.init_app(app)
 
-    # Create tables if not exists
+    # The ML model is loaded off the factory path so CLI commands and the
+    # contact/admin routes start immediately; see MODEL_LOAD_MODE
+    ImageAnalysisService.configure(app.config)
+    load_mode = app.config.get('MODEL_LOAD_MODE', 'background')
+    if load_mode == 'eager':
+        ImageAnalysisService.initialize_model(app.config)
+    elif load_mode == 'background':
+        app.before_request(ImageAnalysisService.start_background_load)
+
+    # The schema is owned by the migrations: run `flask db upgrade` (or
+    # init_db.py). create_all() here would create tables ahead of Alembic
+    # and make later upgrades of an existing database fail.
     with app.app_context():
-        db.create_all()
-        
-        # Initialize ML model
-        ImageAnalysisService.initialize_model()
-        
         # Import models after db initialization to avoid circular imports
         from app import models
 
+    app.logger.info("Database: %s", database.describe(app))
+
     # Register blueprints
     from app.main_routes import bp as main_bp
     from app.admin_routes import admin_bp
     from app.admin_ui_routes import admin_ui_bp
-    from app.cli import create_admin
+    from app.health_routes import health_bp
+    from app.cli import create_admin, hash_passwords, import_model, verify_model, set_journal_mode
     
     app.register_blueprint(main_bp)
     app.register_blueprint(admin_bp)
     app.register_blueprint(admin_ui_bp)
+    app.register_blueprint(health_bp)
     app.cli.add_command(create_admin)
+    app.cli.add_command(hash_passwords)
+    app.cli.add_command(import_model)
+    app.cli.add_command(verify_model)
+    app.cli.add_command(set_journal_mode)
 
     # Set secret key for sessions
     app.secret_key = 'your-secret-key-here'  # TODO: Replace with proper secret key
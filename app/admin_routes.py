@@ -1,43 +1,126 @@
 from flask.cli import with_appcontext
 import click
-from flask import Blueprint, request, jsonify, render_template, redirect, url_for, session
-from functools import wraps
-from app.models import User
+import csv
+from flask import Blueprint, request, jsonify, render_template, redirect, url_for, session, current_app, Response, stream_with_context
+from datetime import datetime
+from app.auth import basic_auth_required
+from app.response_cache import cached_response
 from app.services import (
     GetContactsUseCase,
     CreateContactUseCase,
     UpdateContactUseCase,
-    DeleteContactUseCase
+    DeleteContactUseCase,
+    GetContactsPageUseCase,
+    GetContactsVersionUseCase,
+    SearchContactsUseCase,
+    ImportContactsUseCase,
+    BulkUpdateContactsUseCase,
+    BulkDeleteContactsUseCase,
+    parse_contact_filters,
+    parse_contacts_csv,
+    export_contacts,
+    gzip_stream,
+    EXPORT_FORMATS,
+    GetPredictionStatsUseCase
 )
 
 admin_bp = Blueprint('admin_api', __name__, url_prefix='/admin/api')
 
-def basic_auth_required(f):
-    @wraps(f)
-    def decorated(*args, **kwargs):
-        if 'admin_logged_in' in session:
-            return f(*args, **kwargs)
-        auth = request.authorization
-        if not auth or not check_auth(auth.username, auth.password):
-            return jsonify({'message': 'Authentication required'}), 401
-        return f(*args, **kwargs)
-    return decorated
-
-def check_auth(username, password):
-    user = User.query.filter_by(username=username).first()
-    return user is not None and user.password == password
-
 @admin_bp.route('/contacts', methods=['GET'])
 @basic_auth_required
 def get_contacts():
-    contacts = GetContactsUseCase.execute()
-    return jsonify([{
-        'id': contact.id,
-        'name': contact.name,
-        'email': contact.email,
-        'message': contact.message,
-        'created_at': contact.created_at.isoformat() if contact.created_at else None
-    } for contact in contacts])
+    filters, errors = parse_contact_filters(request.args)
+    try:
+        limit = int(request.args.get('limit', current_app.config.get('CONTACTS_PAGE_SIZE', 50)))
+    except ValueError:
+        errors['limit'] = 'Must be an integer'
+        limit = 0
+    if errors:
+        return jsonify({'error': 'Validation failed', 'details': errors}), 400
+    limit = max(1, min(limit, current_app.config.get('CONTACTS_MAX_PAGE_SIZE', 500)))
+    
+    def build():
+        result = GetContactsPageUseCase.execute(limit, request.args.get('cursor'), filters)
+        if 'error' in result:
+            return jsonify(result), 400
+        return jsonify(result)
+    return cached_response(GetContactsVersionUseCase.execute(), build)
+
+@admin_bp.route('/contacts/search', methods=['GET'])
+@basic_auth_required
+def search_contacts():
+    try:
+        limit = int(request.args.get('limit', current_app.config.get('CONTACTS_PAGE_SIZE', 50)))
+        offset = max(0, int(request.args.get('offset', 0)))
+    except ValueError:
+        return jsonify({'error': 'Validation failed',
+                        'details': {'limit': 'limit and offset must be integers'}}), 400
+    limit = max(1, min(limit, current_app.config.get('CONTACTS_MAX_PAGE_SIZE', 500)))
+    
+    result = SearchContactsUseCase.execute(request.args.get('q', ''), limit, offset)
+    if 'error' in result:
+        return jsonify(result), 400
+    return jsonify(result)
+
+@admin_bp.route('/contacts/export', methods=['GET'])
+@basic_auth_required
+def export_contacts_route():
+    """Stream every matching contact as CSV or NDJSON"""
+    fmt = request.args.get('format', 'csv')
+    filters, errors = parse_contact_filters(request.args)
+    if fmt not in EXPORT_FORMATS:
+        errors['format'] = f"Must be one of: {', '.join(EXPORT_FORMATS)}"
+    if errors:
+        return jsonify({'error': 'Validation failed', 'details': errors}), 400
+    
+    chunks = export_contacts(fmt, filters, current_app.config.get('CONTACTS_EXPORT_BATCH_SIZE', 1000))
+    headers = {
+        'Content-Disposition': f"attachment; filename=contacts-{datetime.utcnow():%Y%m%d}.{fmt}",
+        'Vary': 'Accept-Encoding'
+    }
+    if request.args.get('gzip', '1') != '0' and request.accept_encodings['gzip']:
+        chunks = gzip_stream(chunks)
+        headers['Content-Encoding'] = 'gzip'
+    mimetype = 'text/csv' if fmt == 'csv' else 'application/x-ndjson'
+    return Response(stream_with_context(chunks), mimetype=mimetype, headers=headers)
+
+def _bulk_status(result):
+    if 'error' not in result:
+        return 200
+    return 400 if 'Validation failed' in result['error'] else 500
+
+@admin_bp.route('/contacts/bulk', methods=['POST'])
+@basic_auth_required
+def import_contacts():
+    """Import contacts from a JSON body or a CSV upload/body"""
+    upload = request.files.get('file')
+    if upload is not None or request.mimetype == 'text/csv':
+        raw = upload.read() if upload is not None else request.get_data()
+        try:
+            rows = parse_contacts_csv(raw.decode('utf-8-sig'))
+        except (UnicodeDecodeError, ValueError, csv.Error) as e:
+            return jsonify({'error': 'Validation failed', 'details': {'file': str(e)}}), 400
+    else:
+        data = request.get_json(silent=True)
+        rows = data.get('contacts') if isinstance(data, dict) else data
+    
+    result = ImportContactsUseCase.execute(rows, current_app.config.get('CONTACTS_BULK_MAX_ROWS', 10000))
+    return jsonify(result), _bulk_status(result)
+
+@admin_bp.route('/contacts/bulk', methods=['PUT'])
+@basic_auth_required
+def bulk_update_contacts():
+    data = request.get_json(silent=True)
+    rows = data.get('contacts') if isinstance(data, dict) else data
+    result = BulkUpdateContactsUseCase.execute(rows, current_app.config.get('CONTACTS_BULK_MAX_ROWS', 10000))
+    return jsonify(result), _bulk_status(result)
+
+@admin_bp.route('/contacts/bulk', methods=['DELETE'])
+@basic_auth_required
+def bulk_delete_contacts():
+    result = BulkDeleteContactsUseCase.execute(request.get_json(silent=True),
+                                               current_app.config.get('CONTACTS_BULK_MAX_ROWS', 10000))
+    return jsonify(result), _bulk_status(result)
 
 @admin_bp.route('/contacts/<int:id>', methods=['DELETE'])
 @basic_auth_required
@@ -55,4 +138,14 @@ def update_contact(id):
     if 'error' in result:
         status_code = 400 if 'Validation failed' in result['error'] else 500
         return jsonify(result), status_code
-    return jsonify(result)
\ No newline at end of file
+    return jsonify(result)
+
+@admin_bp.route('/predictions/stats', methods=['GET'])
+@basic_auth_required
+def prediction_stats():
+    """Prediction counts and confidence histograms from the daily rollups"""
+    result = GetPredictionStatsUseCase.execute(request.args,
+                                               current_app.config.get('PREDICTION_STATS_MAX_DAYS', 366))
+    if 'error' in result:
+        return jsonify(result), 400
+    return jsonify(result)
@@ -2,16 +2,15 @@ from flask.cli import with_appcontext
 import click
 from flask import Blueprint, request, jsonify, render_template, redirect, url_for, session
 from functools import wraps
-from app.models import User
+from app.auth import check_auth
+from app.response_cache import cached_response
 from app.services import (
     GetContactsUseCase,
+    GetContactsVersionUseCase,
     CreateContactUseCase,
     UpdateContactUseCase,
     DeleteContactUseCase
 )
-from functools import wraps
-from app.models import User
-from app.services import GetContactsUseCase
 
 admin_ui_bp = Blueprint('admin', __name__, url_prefix='/admin')
 
@@ -43,9 +42,7 @@ def logout():
 @admin_ui_bp.route('/dashboard')
 @admin_required
 def dashboard():
-    contacts = GetContactsUseCase.execute()
-    return render_template('admin/dashboard.html', contacts=contacts)
-
-def check_auth(username, password):
-    user = User.query.filter_by(username=username).first()
-    return user is not None and user.password == password
\ No newline at end of file
+    def build():
+        contacts = GetContactsUseCase.execute()
+        return render_template('admin/dashboard.html', contacts=contacts)
+    return cached_response(GetContactsVersionUseCase.execute(), build)
@@ -0,0 +1,156 @@
+import hashlib
+import os
+import re
+import tempfile
+import threading
+import time
+from io import BytesIO
+from typing import Dict, Optional
+
+_NAME_PATTERN = re.compile(r'^[0-9a-f]{64}\.jpg$')
+
+
+class ArtifactStore:
+    """Content-addressed store for images extracted from uploads
+
+    Files are named by the SHA-256 of their JPEG bytes, so re-extracting the
+    same page stores nothing new. A background sweeper removes files older
+    than ``ARTIFACT_MAX_AGE`` seconds and then the least recently stored ones
+    until the store fits in ``ARTIFACT_MAX_BYTES``.
+    """
+
+    def __init__(self, app=None):
+        self.root = None
+        self.max_bytes = 1024 ** 3
+        self.max_age = 7 * 24 * 3600.0
+        self.sweep_interval = 600.0
+        self._sweeper = None
+        self._lock = threading.Lock()
+        self._stats = {'stored': 0, 'deduplicated': 0, 'evicted': 0, 'sweeps': 0}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.configure(app.config)
+        app.extensions['artifact_store'] = self
+        # Start lazily so CLI commands never spawn the sweeper
+        app.before_request(self.start_sweeper)
+
+    def configure(self, config: Dict):
+        """Apply settings from a config mapping (also used by worker processes)"""
+        self.root = config.get('ARTIFACT_ROOT')
+        self.max_bytes = int(config.get('ARTIFACT_MAX_BYTES', 1024 ** 3))
+        self.max_age = float(config.get('ARTIFACT_MAX_AGE', 7 * 24 * 3600))
+        self.sweep_interval = float(config.get('ARTIFACT_SWEEP_INTERVAL', 600))
+
+    def _path(self, name: str) -> str:
+        # Two-character shard directories keep directory listings small
+        return os.path.join(self.root, name[:2], name)
+
+    def save_image(self, image, quality: int = 90) -> str:
+        """Store an image as JPEG and return its content-addressed name"""
+        buffer = BytesIO()
+        if image.mode not in ('RGB', 'L'):
+            image = image.convert('RGB')
+        image.save(buffer, 'JPEG', quality=quality)
+        data = buffer.getvalue()
+        name = hashlib.sha256(data).hexdigest() + '.jpg'
+        path = self._path(name)
+
+        if os.path.exists(path):
+            # Refresh the age so the sweeper keeps recently used artifacts
+            os.utime(path)
+            with self._lock:
+                self._stats['deduplicated'] += 1
+            return name
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, path)
+        with self._lock:
+            self._stats['stored'] += 1
+        return name
+
+    def path_for(self, name: str) -> Optional[str]:
+        """Filesystem path of a stored artifact, or None if unknown/invalid"""
+        if not self.root or not _NAME_PATTERN.match(name or ''):
+            return None
+        path = self._path(name)
+        return path if os.path.isfile(path) else None
+
+    def exists(self, name: str) -> bool:
+        return self.path_for(name) is not None
+
+    def etag_for(self, name: str) -> str:
+        """Names are content hashes, so they double as strong ETags"""
+        return name[:-len('.jpg')]
+
+    def sweep(self) -> int:
+        """Evict expired artifacts, then the oldest until under the size cap"""
+        if not self.root or not os.path.isdir(self.root):
+            return 0
+        now = time.time()
+        files = []
+        for directory, _, names in os.walk(self.root):
+            for name in names:
+                path = os.path.join(directory, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, path, name))
+
+        evicted = 0
+        total = 0
+        kept = []
+        for mtime, size, path, name in files:
+            # Leftover temp files from interrupted writes count as expired
+            if now - mtime > self.max_age or (name.endswith('.tmp') and now - mtime > 60):
+                evicted += self._remove(path)
+            else:
+                kept.append((mtime, size, path))
+                total += size
+
+        kept.sort()
+        for mtime, size, path in kept:
+            if total <= self.max_bytes:
+                break
+            evicted += self._remove(path)
+            total -= size
+
+        with self._lock:
+            self._stats['evicted'] += evicted
+            self._stats['sweeps'] += 1
+        return evicted
+
+    def _remove(self, path: str) -> int:
+        try:
+            os.remove(path)
+            return 1
+        except OSError:
+            return 0
+
+    def start_sweeper(self):
+        """Start the background sweeper thread once"""
+        if self._sweeper is not None or not self.root:
+            return
+        with self._lock:
+            if self._sweeper is not None:
+                return
+            self._sweeper = threading.Thread(target=self._sweep_forever,
+                                             name='artifact-sweeper', daemon=True)
+            self._sweeper.start()
+
+    def _sweep_forever(self):
+        while True:
+            try:
+                self.sweep()
+            except Exception:
+                pass
+            time.sleep(self.sweep_interval)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return dict(self._stats)
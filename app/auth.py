@@ -0,0 +1,157 @@
+import hashlib
+import hmac
+import os
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from typing import Dict, Optional
+
+HASH_PREFIXES = ('scrypt:', 'pbkdf2:')
+
+
+def is_password_hash(value: Optional[str]) -> bool:
+    """Whether a stored password is a werkzeug hash rather than legacy plaintext"""
+    return bool(value) and value.startswith(HASH_PREFIXES)
+
+
+class CredentialCache:
+    """Short-lived cache of successfully verified admin credentials
+
+    Password hashes are deliberately slow, which would make every Basic-auth
+    API call a CPU hotspot. After one successful verification the cache keeps
+    an HMAC of the password under a per-process random key, indexed by
+    username and the stored hash. A later request with the same password
+    then costs one HMAC. Changing the stored hash makes the old entry
+    unreachable. ``flask create-admin`` also invalidates the entry
+    explicitly. Entries expire after ``AUTH_CACHE_TTL`` seconds and the
+    least recently used ones are dropped beyond ``AUTH_CACHE_MAX_ENTRIES``.
+    Failed attempts are never cached.
+    """
+
+    def __init__(self, app=None):
+        self.ttl = 300.0
+        self.max_entries = 1024
+        self.hash_method = 'scrypt'
+        self._key = os.urandom(32)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.ttl = float(app.config.get('AUTH_CACHE_TTL', 300))
+        self.max_entries = int(app.config.get('AUTH_CACHE_MAX_ENTRIES', 1024))
+        self.hash_method = app.config.get('AUTH_HASH_METHOD', 'scrypt')
+        app.extensions['credential_cache'] = self
+
+    def _digest(self, password: str) -> bytes:
+        return hmac.new(self._key, password.encode('utf-8'), hashlib.sha256).digest()
+
+    def check(self, username: str, stored_hash: str, password: str) -> bool:
+        if self.ttl <= 0:
+            return False
+        key = (username, stored_hash)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] < time.monotonic():
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self._stats['misses'] += 1
+                return False
+            self._entries.move_to_end(key)
+        matched = hmac.compare_digest(entry[0], self._digest(password))
+        with self._lock:
+            self._stats['hits' if matched else 'misses'] += 1
+        return matched
+
+    def add(self, username: str, stored_hash: str, password: str):
+        if self.ttl <= 0:
+            return
+        entry = (self._digest(password), time.monotonic() + self.ttl)
+        with self._lock:
+            self._entries[(username, stored_hash)] = entry
+            self._entries.move_to_end((username, stored_hash))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, username: Optional[str] = None):
+        """Forget cached credentials for one user, or for everyone"""
+        with self._lock:
+            if username is None:
+                self._entries.clear()
+                return
+            for key in [key for key in self._entries if key[0] == username]:
+                del self._entries[key]
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return dict(self._stats, entries=len(self._entries))
+
+
+def hash_password(password: str) -> str:
+    from werkzeug.security import generate_password_hash
+    from app.extensions import credential_cache
+    return generate_password_hash(password, method=credential_cache.hash_method)
+
+
+_DUMMY_HASH = None
+
+
+def _dummy_hash() -> str:
+    global _DUMMY_HASH
+    if _DUMMY_HASH is None:
+        _DUMMY_HASH = hash_password(os.urandom(16).hex())
+    return _DUMMY_HASH
+
+
+def check_auth(username: Optional[str], password: Optional[str]) -> bool:
+    """Verify admin credentials, upgrading a legacy plaintext password on success"""
+    from werkzeug.security import check_password_hash
+    from app import db
+    from app.extensions import credential_cache
+    from app.models import User
+
+    if not username or password is None:
+        return False
+    user = User.query.filter_by(username=username).first()
+    if user is None:
+        # Spend the same hashing time so unknown usernames are not revealed
+        check_password_hash(_dummy_hash(), password)
+        return False
+
+    stored = user.password
+    if not is_password_hash(stored):
+        if not hmac.compare_digest(stored.encode('utf-8'), password.encode('utf-8')):
+            return False
+        user.password = hash_password(password)
+        try:
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+        credential_cache.add(username, user.password, password)
+        return True
+
+    if credential_cache.check(username, stored, password):
+        return True
+    if not check_password_hash(stored, password):
+        return False
+    credential_cache.add(username, stored, password)
+    return True
+
+
+def basic_auth_required(f):
+    """Allow a logged-in admin session or valid Basic-auth credentials"""
+    from flask import jsonify, request, session
+
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        if 'admin_logged_in' in session:
+            return f(*args, **kwargs)
+        auth = request.authorization
+        if not auth or not check_auth(auth.username, auth.password):
+            return jsonify({'message': 'Authentication required'}), 401
+        return f(*args, **kwargs)
+    return decorated
@@ -0,0 +1,200 @@
+import logging
+import os
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+BACKENDS = ('eager', 'int8', 'traced', 'compiled')
+
+
+def _logits_module(model):
+    """Wrap a HF classifier so it maps pixel_values -> logits (traceable)"""
+    import torch
+
+    class LogitsModule(torch.nn.Module):
+        def __init__(self, inner):
+            super().__init__()
+            self.inner = inner
+
+        def forward(self, pixel_values):
+            return self.inner(pixel_values=pixel_values).logits
+
+    return LogitsModule(model).eval()
+
+
+def has_convolutions(model) -> bool:
+    """Whether memory layout can matter: channels-last only affects convolutions"""
+    import torch
+    return any(isinstance(module, torch.nn.Conv2d) for module in model.modules())
+
+
+def build_runner(model, backend: str, example_pixel_values=None,
+                 channels_last: bool = False) -> Callable:
+    """Build a ``runner(pixel_values) -> logits`` callable for a backend
+
+    ``eager`` runs the fp32 model as is, ``int8`` applies dynamic int8
+    quantization to its Linear layers, ``traced`` freezes a TorchScript trace
+    and ``compiled`` uses torch.compile.
+    """
+    import torch
+    if backend not in BACKENDS:
+        raise ValueError(f'Unknown inference backend: {backend}')
+
+    if backend == 'int8':
+        model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    module = _logits_module(model)
+    if channels_last:
+        module = module.to(memory_format=torch.channels_last)
+
+    if backend == 'traced':
+        if example_pixel_values is None:
+            raise ValueError('The traced backend needs example inputs')
+        example = example_pixel_values
+        if channels_last:
+            example = example.contiguous(memory_format=torch.channels_last)
+        with torch.no_grad():
+            module = torch.jit.trace(module, example, check_trace=False)
+            module = torch.jit.optimize_for_inference(torch.jit.freeze(module))
+    elif backend == 'compiled':
+        module = torch.compile(module)
+
+    def run(pixel_values):
+        if channels_last:
+            pixel_values = pixel_values.contiguous(memory_format=torch.channels_last)
+        with torch.inference_mode():
+            return module(pixel_values)
+
+    return run
+
+
+def reference_images(directory: Optional[str] = None, count: int = 8) -> List:
+    """Load the parity reference set, or build a deterministic synthetic one"""
+    from PIL import Image
+    if directory and os.path.isdir(directory):
+        images = []
+        for name in sorted(os.listdir(directory)):
+            try:
+                with Image.open(os.path.join(directory, name)) as image:
+                    images.append(image.convert('RGB'))
+            except Exception:
+                continue
+        if images:
+            return images
+
+    import numpy as np
+    rng = np.random.default_rng(0)
+    images = []
+    for i in range(count):
+        # Fundus-like: dark background, bright disc with noisy texture
+        size = 512
+        y, x = np.mgrid[0:size, 0:size]
+        disc = ((x - size / 2) ** 2 + (y - size / 2) ** 2) < (size * 0.45) ** 2
+        pixels = rng.integers(0, 60, (size, size, 3))
+        base = np.array([180 + 8 * i, 80 + 10 * i, 30 + 5 * i])
+        pixels[disc] = np.clip(base + rng.normal(0, 25, (disc.sum(), 3)), 0, 255)
+        images.append(Image.fromarray(pixels.astype('uint8'), 'RGB'))
+    return images
+
+
+def _time_runner(runner: Callable, pixel_values, repeats: int = 3) -> float:
+    runner(pixel_values)  # warm-up
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        runner(pixel_values)
+        timings.append(time.perf_counter() - started)
+    return sorted(timings)[len(timings) // 2] * 1000.0
+
+
+def check_parity(reference: Callable, candidate: Callable, pixel_values,
+                 tolerance: float, min_agreement: float) -> Dict:
+    """Compare predicted stage and confidence of a candidate against fp32"""
+    import torch
+    report = {'images': int(pixel_values.shape[0])}
+    expected = torch.nn.functional.softmax(reference(pixel_values), dim=-1)
+    actual = torch.nn.functional.softmax(candidate(pixel_values), dim=-1)
+    # A single-image pass catches graphs that baked in the batch size
+    single = torch.nn.functional.softmax(candidate(pixel_values[:1]), dim=-1)
+
+    agreement = float((expected.argmax(-1) == actual.argmax(-1)).float().mean())
+    confidence_diff = float((expected.max(-1).values - actual.max(-1).values).abs().max())
+    single_diff = float((single[0] - actual[0]).abs().max())
+    report.update({
+        'label_agreement': agreement,
+        'max_confidence_diff': confidence_diff,
+        'batch_consistency_diff': single_diff,
+        'passed': (agreement >= min_agreement
+                   and confidence_diff <= tolerance
+                   and single_diff <= tolerance)
+    })
+    return report
+
+
+def select_backend(model, processor, config: Dict) -> Tuple[str, bool, Callable, Dict]:
+    """Pick the fastest configuration that matches fp32, or eager fp32
+
+    Returns ``(backend, channels_last, runner, info)``. Each candidate (the
+    requested backend, and with ``INFERENCE_CHANNELS_LAST=auto`` each memory
+    layout of it) is built, checked for parity against eager fp32 and timed
+    on the reference set. The fastest passing candidate is used only if it
+    beats eager by ``INFERENCE_MIN_SPEEDUP``; otherwise eager fp32 is kept.
+    """
+    requested = config.get('INFERENCE_BACKEND', 'eager')
+    layout = str(config.get('INFERENCE_CHANNELS_LAST', 'auto')).lower()
+    if layout == 'auto':
+        # Measured, not assumed: a layout only matters with convolutions
+        layouts = [False, True] if has_convolutions(model) else [False]
+    else:
+        layouts = [layout in ('1', 'true', 'yes')]
+    candidates = [(requested, channels_last) for channels_last in layouts
+                  if (requested, channels_last) != ('eager', False)]
+
+    eager = build_runner(model, 'eager')
+    info = {'requested': requested, 'backend': 'eager', 'channels_last': False}
+    if not candidates:
+        return 'eager', False, eager, info
+
+    images = reference_images(config.get('INFERENCE_PARITY_IMAGE_DIR'))
+    pixel_values = processor(images=images, return_tensors='pt')['pixel_values']
+    info['example_shape'] = [1] + list(pixel_values.shape[1:])
+    tolerance = float(config.get('INFERENCE_PARITY_TOLERANCE', 0.05))
+    min_agreement = float(config.get('INFERENCE_PARITY_MIN_AGREEMENT', 1.0))
+    min_speedup = float(config.get('INFERENCE_MIN_SPEEDUP', 1.1))
+
+    eager_ms = _time_runner(eager, pixel_values)
+    info['latency_ms'] = {'eager': eager_ms, 'batch_size': int(pixel_values.shape[0])}
+    info['candidates'] = []
+    best = None
+    for backend, channels_last in candidates:
+        report = {'backend': backend, 'channels_last': channels_last}
+        info['candidates'].append(report)
+        try:
+            runner = build_runner(model, backend, pixel_values, channels_last)
+            report['parity'] = check_parity(eager, runner, pixel_values, tolerance, min_agreement)
+        except Exception as e:
+            logger.warning('Inference backend %s (channels_last=%s) unavailable: %s',
+                           backend, channels_last, e)
+            report['error'] = str(e)
+            continue
+        if not report['parity']['passed']:
+            logger.warning('Inference backend %s (channels_last=%s) failed parity check: %s',
+                           backend, channels_last, report['parity'])
+            continue
+        report['latency_ms'] = _time_runner(runner, pixel_values)
+        report['speedup'] = eager_ms / report['latency_ms'] if report['latency_ms'] else None
+        if best is None or report['latency_ms'] < best[0]['latency_ms']:
+            best = (report, runner)
+
+    if best is None or (best[0]['speedup'] or 0.0) < min_speedup:
+        logger.info('Keeping eager fp32: no candidate passed parity with a %.2fx speedup', min_speedup)
+        return 'eager', False, eager, info
+
+    report, runner = best
+    info.update({'backend': report['backend'], 'channels_last': report['channels_last'],
+                 'parity': report['parity'], 'speedup': report['speedup']})
+    info['latency_ms'][report['backend']] = report['latency_ms']
+    logger.info('Inference backend %s (channels_last=%s) enabled: %.1f ms vs %.1f ms eager, %.2fx speedup',
+                report['backend'], report['channels_last'], report['latency_ms'], eager_ms,
+                report['speedup'])
+    return report['backend'], report['channels_last'], runner, info
@@ -0,0 +1,190 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List
+
+
+class _PendingItem:
+    """Queued inference request waiting to be batched"""
+
+    __slots__ = ('payload', 'future', 'enqueued_at')
+
+    def __init__(self, payload: Any):
+        self.payload = payload
+        self.future = Future()
+        self.enqueued_at = time.monotonic()
+
+
+class MicroBatcher:
+    """Dynamic micro-batching scheduler for model inference
+
+    Callers ``submit`` single items and get a future back. A scheduler thread
+    drains the queue into batches of at most ``max_batch_size`` items, waiting
+    no longer than ``max_wait_ms`` after the oldest item arrived, runs
+    ``run_batch`` once per batch and resolves each future with its own row.
+    With ``concurrency`` > 1 up to that many batches run at once (e.g. one per
+    inference worker process) while the scheduler keeps collecting the next.
+    """
+
+    def __init__(self, run_batch: Callable[[List[Any]], List[Any]],
+                 max_batch_size: int = 16, max_wait_ms: float = 10.0,
+                 max_queue_size: int = 0, name: str = 'inference-batcher',
+                 concurrency: int = 1):
+        self._run_batch = run_batch
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+        self.max_queue_size = max(0, int(max_queue_size))
+        self.name = name
+        self.concurrency = max(1, int(concurrency))
+
+        self._queue = deque()
+        self._cond = threading.Condition()
+        self._thread = None
+        self._stopped = False
+        self._slots = threading.Semaphore(self.concurrency)
+        self._executor = None
+        if self.concurrency > 1:
+            self._executor = ThreadPoolExecutor(max_workers=self.concurrency,
+                                                thread_name_prefix=name + '-run')
+
+        self._stats_lock = threading.Lock()
+        self._batches = 0
+        self._items = 0
+        self._failed_batches = 0
+        self._max_queue_depth = 0
+        self._batch_sizes: Dict[int, int] = {}
+        self._total_wait = 0.0
+        self._total_run = 0.0
+
+    def submit(self, payload: Any) -> Future:
+        """Queue a single item and return a future for its result"""
+        with self._cond:
+            if self._stopped:
+                raise RuntimeError('Inference batcher is stopped')
+            if self.max_queue_size and len(self._queue) >= self.max_queue_size:
+                raise RuntimeError('Inference queue is full')
+            item = _PendingItem(payload)
+            self._queue.append(item)
+            depth = len(self._queue)
+            self._ensure_started()
+            self._cond.notify()
+        with self._stats_lock:
+            self._max_queue_depth = max(self._max_queue_depth, depth)
+        return item.future
+
+    def submit_many(self, payloads: List[Any]) -> List[Future]:
+        """Queue several items at once so they can share a batch"""
+        return [self.submit(payload) for payload in payloads]
+
+    def stop(self, timeout: float = 5.0):
+        """Stop the scheduler after draining queued items"""
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+
+    @property
+    def queue_depth(self) -> int:
+        with self._cond:
+            return len(self._queue)
+
+    def stats(self) -> Dict:
+        """Return queue depth and batch-size statistics"""
+        with self._stats_lock:
+            batches = self._batches
+            return {
+                'max_batch_size': self.max_batch_size,
+                'max_wait_ms': self.max_wait * 1000.0,
+                'concurrency': self.concurrency,
+                'queue_depth': self.queue_depth,
+                'max_queue_depth': self._max_queue_depth,
+                'batches': batches,
+                'failed_batches': self._failed_batches,
+                'items': self._items,
+                'avg_batch_size': (self._items / batches) if batches else 0.0,
+                'batch_size_histogram': {str(size): count for size, count
+                                         in sorted(self._batch_sizes.items())},
+                'avg_queue_wait_ms': (self._total_wait / self._items * 1000.0) if self._items else 0.0,
+                'avg_batch_run_ms': (self._total_run / batches * 1000.0) if batches else 0.0,
+            }
+
+    def _ensure_started(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._loop, name=self.name, daemon=True)
+            self._thread.start()
+
+    def _next_batch(self) -> List[_PendingItem]:
+        with self._cond:
+            while not self._queue and not self._stopped:
+                self._cond.wait()
+            if not self._queue:
+                return []
+
+            deadline = self._queue[0].enqueued_at + self.max_wait
+            while len(self._queue) < self.max_batch_size and not self._stopped:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+
+            size = min(len(self._queue), self.max_batch_size)
+            return [self._queue.popleft() for _ in range(size)]
+
+    def _loop(self):
+        while True:
+            # Only start collecting once a slot is free, so a busy backend
+            # lets the queue grow into larger batches
+            self._slots.acquire()
+            batch = self._next_batch()
+            if not batch:
+                self._slots.release()
+                return
+            if self._executor is not None:
+                self._executor.submit(self._process_and_release, batch)
+            else:
+                self._process_and_release(batch)
+
+    def _process_and_release(self, batch: List[_PendingItem]):
+        try:
+            self._process(batch)
+        finally:
+            self._slots.release()
+
+    def _process(self, batch: List[_PendingItem]):
+        started = time.monotonic()
+        wait = sum(started - item.enqueued_at for item in batch)
+        try:
+            results = self._run_batch([item.payload for item in batch])
+            if len(results) != len(batch):
+                raise RuntimeError('Batch returned %d results for %d inputs' % (len(results), len(batch)))
+        except Exception as e:
+            failed = True
+            if len(batch) > 1:
+                # One bad input must not fail its neighbours: retry one by one
+                for item in batch:
+                    self._process_single(item)
+            else:
+                batch[0].future.set_exception(e)
+        else:
+            failed = False
+            for item, result in zip(batch, results):
+                item.future.set_result(result)
+
+        elapsed = time.monotonic() - started
+        with self._stats_lock:
+            self._batches += 1
+            self._items += len(batch)
+            self._failed_batches += int(failed)
+            self._batch_sizes[len(batch)] = self._batch_sizes.get(len(batch), 0) + 1
+            self._total_wait += wait
+            self._total_run += elapsed
+
+    def _process_single(self, item: _PendingItem):
+        try:
+            item.future.set_result(self._run_batch([item.payload])[0])
+        except Exception as e:
+            item.future.set_exception(e)
@@ -1,36 +1,117 @@
 from flask.cli import with_appcontext
 import click
+from app.auth import hash_password, is_password_hash
+from app.extensions import credential_cache
 from app.models import User
 from app import db
 
 @click.command('create-admin')
 @with_appcontext
 def create_admin():
-    """Create an admin user"""
+    """Create an admin user, or reset the password of an existing one"""
     from getpass import getpass
     username = input("Enter admin username: ")
     password = getpass("Enter admin password: ")
     confirm = getpass("Confirm admin password: ")
-    
+
     if password != confirm:
         print("Passwords don't match!")
         return
-    
-    # Check if user already exists
+
+    # Existing users get their password replaced
     existing = User.query.filter_by(username=username).first()
     if existing:
-        print(f"User {username} already exists!")
-        return
-        
-    admin = User(
-        username=username,
-        password=password
-    )
-    
+        existing.password = hash_password(password)
+        message = f"Password for {username} updated successfully!"
+    else:
+        db.session.add(User(
+            username=username,
+            password=hash_password(password)
+        ))
+        message = f"Admin user {username} created successfully!"
+
+    try:
+        db.session.commit()
+        credential_cache.invalidate(username)
+        print(message)
+    except Exception as e:
+        db.session.rollback()
+        print(f"Error saving admin user: {str(e)}")
+
+@click.command('hash-passwords')
+@with_appcontext
+def hash_passwords():
+    """Hash any admin passwords still stored in plaintext"""
+    users = [user for user in User.query.all() if not is_password_hash(user.password)]
+    for user in users:
+        user.password = hash_password(user.password)
+
     try:
-        db.session.add(admin)
         db.session.commit()
-        print(f"Admin user {username} created successfully!")
+        credential_cache.invalidate()
+        print(f"Hashed {len(users)} plaintext password(s)")
     except Exception as e:
         db.session.rollback()
-        print(f"Error creating admin user: {str(e)}")
\ No newline at end of file
+        print(f"Error hashing passwords: {str(e)}")
+
+@click.command('import-model')
+@click.argument('source', required=False)
+@click.option('--revision', help='Hub branch, tag or commit to pin (default: main)')
+@click.option('--name', help='Registry name (default: the hub repo id or directory name)')
+@click.option('--sha256', 'expected_digest', help='Reject the import unless the artifact digest matches')
+@with_appcontext
+def import_model(source, revision, name, expected_digest):
+    """Copy a model from the Hugging Face Hub or a local directory into the registry"""
+    from flask import current_app
+    from app.extensions import model_registry
+    from app.model_registry import ModelArtifactError
+    source = source or current_app.config['MODEL_NAME']
+    try:
+        manifest = model_registry.import_model(source, revision=revision, name=name,
+                                               expected_digest=expected_digest)
+    except ModelArtifactError as e:
+        print(f"Error importing model: {str(e)}")
+        raise SystemExit(1)
+
+    total = sum(entry['bytes'] for entry in manifest['files'].values())
+    print(f"Imported {manifest['name']}@{manifest['revision']} "
+          f"({len(manifest['files'])} files, {total} bytes)")
+    print(f"sha256: {manifest['digest']}")
+
+@click.command('verify-model')
+@click.argument('name', required=False)
+@click.option('--revision', help='Revision to check (default: the current one)')
+@click.option('--sha256', 'expected_digest', help='Also require this artifact digest')
+@click.option('--quick', is_flag=True, help='Compare file sizes only, not checksums')
+@with_appcontext
+def verify_model(name, revision, expected_digest, quick):
+    """Check a registry model's files against the checksums in its manifest"""
+    from flask import current_app
+    from app.extensions import model_registry
+    from app.model_registry import ModelArtifactError
+    name = name or current_app.config['MODEL_NAME']
+    try:
+        report = model_registry.verify(name, revision, checksums=not quick,
+                                       expected_digest=expected_digest)
+    except ModelArtifactError as e:
+        print(str(e))
+        raise SystemExit(1)
+
+    for problem in report['problems']:
+        print(f"  {problem}")
+    status = 'OK' if report['ok'] else 'FAILED'
+    print(f"{report['name']}@{report['revision']}: {status} ({report['checked']} check, sha256 {report['digest']})")
+    if not report['ok']:
+        raise SystemExit(1)
+
+@click.command('set-journal-mode')
+@with_appcontext
+def set_journal_mode():
+    """Apply the DB_PROFILE journal mode (e.g. WAL) to the SQLite database"""
+    from flask import current_app
+    from app import database
+    mode = database.set_journal_mode(current_app)
+    if mode is None:
+        print("Not a SQLite database; nothing to do")
+    else:
+        print(f"journal_mode={mode}")
@@ -0,0 +1,111 @@
+import atexit
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from app.batching import MicroBatcher
+
+WRITE_MODES = ('direct', 'group', 'async')
+
+
+class ContactQueueFullError(RuntimeError):
+    """Raised when the write-behind queue is at CONTACT_WRITE_MAX_QUEUE"""
+
+
+class ContactWriteBuffer:
+    """Group-commit buffer for public contact submissions
+
+    ``CONTACT_WRITE_MODE`` selects the durability contract:
+
+    - ``direct``: one INSERT and one commit per request (the original path)
+    - ``group``: submissions are coalesced into one executemany INSERT and a
+      single commit per batch; each request waits for its batch to commit, so
+      the id it returns is as durable as a direct write. A request whose
+      batch has not committed within ``CONTACT_WRITE_TIMEOUT`` is answered
+      as queued, like ``async``: its row still commits, so reporting a
+      failure would make the client resubmit a duplicate
+    - ``async``: the request is acknowledged once queued; rows are committed
+      within ``CONTACT_WRITE_MAX_WAIT_MS`` but a crash loses whatever is
+      still queued
+
+    Batches hold at most ``CONTACT_WRITE_MAX_BATCH`` rows and wait at most
+    ``CONTACT_WRITE_MAX_WAIT_MS`` after the oldest row arrived.
+    """
+
+    def __init__(self, app=None):
+        self.mode = 'direct'
+        self.timeout = 5.0
+        self._app = None
+        self._batcher: Optional[MicroBatcher] = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        mode = app.config.get('CONTACT_WRITE_MODE', 'direct')
+        if mode not in WRITE_MODES:
+            raise ValueError(f'Unknown CONTACT_WRITE_MODE: {mode}')
+        if self._batcher is not None:
+            self._batcher.stop()
+        self.mode = mode
+        self.timeout = float(app.config.get('CONTACT_WRITE_TIMEOUT', 5))
+        self._app = app
+        self._batcher = None
+        if mode != 'direct':
+            # The scheduler thread only starts on the first submission
+            self._batcher = MicroBatcher(
+                self._write_batch,
+                max_batch_size=int(app.config.get('CONTACT_WRITE_MAX_BATCH', 64)),
+                max_wait_ms=float(app.config.get('CONTACT_WRITE_MAX_WAIT_MS', 5)),
+                max_queue_size=int(app.config.get('CONTACT_WRITE_MAX_QUEUE', 10000)),
+                name='contact-writer'
+            )
+            # Drain queued async writes on a clean interpreter shutdown
+            atexit.register(self._batcher.stop)
+        app.extensions['contact_writer'] = self
+
+    @property
+    def enabled(self) -> bool:
+        return self._batcher is not None
+
+    def submit(self, contact_data: Dict) -> Optional[Dict]:
+        """Queue a validated contact; in group mode wait for its commit
+
+        Returns the committed contact, or None once it is queued but not
+        (yet) known to be committed.
+        """
+        row = {
+            'name': contact_data['name'],
+            'email': contact_data['email'],
+            'message': contact_data['message'],
+            # Stamped on arrival so queueing delay does not reorder contacts
+            'created_at': datetime.utcnow()
+        }
+        try:
+            future = self._batcher.submit(row)
+        except RuntimeError:
+            raise ContactQueueFullError('Contact submission queue is full')
+        if self.mode == 'async':
+            return None
+        try:
+            return future.result(timeout=self.timeout)
+        except TimeoutError:
+            return None
+
+    def _write_batch(self, rows: List[Dict]) -> List[Dict]:
+        from app.models import Contact
+        from app.repository import ContactRepository
+        with self._app.app_context():
+            ids = ContactRepository.bulk_create(rows)
+        return [Contact(id=contact_id, name=row['name'].strip(), email=row['email'].strip(),
+                        message=row['message'].strip(), created_at=row['created_at']).to_dict()
+                for contact_id, row in zip(ids, rows)]
+
+    def flush(self, timeout: float = 5.0):
+        """Commit everything queued and stop the writer thread"""
+        if self._batcher is not None:
+            self._batcher.stop(timeout)
+
+    def stats(self) -> Dict:
+        stats = {'mode': self.mode}
+        if self._batcher is not None:
+            stats.update(self._batcher.stats())
+        return stats
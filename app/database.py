@@ -0,0 +1,115 @@
+from typing import Dict, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+from app.extensions import db
+
+READ_BIND = 'read'
+
+# Stored in the database file itself rather than per connection; applied
+# once by `flask set-journal-mode` (or init_db.py), not on every connect
+PERSISTENT_PRAGMAS = ('journal_mode',)
+
+
+def resolve_profile(config) -> Dict:
+    """Pick the DB_PROFILES entry for the configured database"""
+    name = config.get('DB_PROFILE', 'auto')
+    if name == 'auto':
+        url = make_url(config['SQLALCHEMY_DATABASE_URI'])
+        name = 'sqlite-wal' if url.get_backend_name() == 'sqlite' else 'server'
+    profiles = config.get('DB_PROFILES', {})
+    if name not in profiles:
+        raise ValueError(f'Unknown DB_PROFILE: {name}')
+    return dict(profiles[name], name=name)
+
+
+def configure_engines(app) -> Dict:
+    """Merge the profile's engine options and read bind into the app config
+
+    Must run before ``db.init_app`` so Flask-SQLAlchemy builds the engines
+    with these options. Explicit SQLALCHEMY_ENGINE_OPTIONS still win.
+    """
+    profile = resolve_profile(app.config)
+    options = dict(profile.get('engine_options', {}))
+    options.update(app.config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = options
+
+    read_url = app.config.get('DATABASE_READ_URL')
+    if read_url:
+        binds = dict(app.config.get('SQLALCHEMY_BINDS') or {})
+        binds[READ_BIND] = dict(options, url=read_url)
+        app.config['SQLALCHEMY_BINDS'] = binds
+    app.extensions['db_profile'] = profile
+    return profile
+
+
+def _pragma_listener(pragmas: Dict):
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f'PRAGMA {name}={value}')
+        finally:
+            cursor.close()
+    return set_pragmas
+
+
+def _connection_pragmas(profile: Dict) -> Dict:
+    return {name: value for name, value in (profile.get('pragmas') or {}).items()
+            if name not in PERSISTENT_PRAGMAS}
+
+
+def apply_pragmas(app):
+    """Run the profile's per-connection PRAGMAs on every new SQLite connection"""
+    pragmas = _connection_pragmas(app.extensions['db_profile'])
+    if not pragmas:
+        return
+    with app.app_context():
+        for engine in db.engines.values():
+            if engine.dialect.name == 'sqlite':
+                event.listen(engine, 'connect', _pragma_listener(pragmas))
+
+
+def read_bind() -> Optional[Dict]:
+    """``bind_arguments`` routing a read-only statement to the read engine"""
+    engine = db.engines.get(READ_BIND)
+    return {'bind': engine} if engine is not None else None
+
+
+def set_journal_mode(app) -> Optional[str]:
+    """Apply the profile's journal_mode to the primary SQLite database, once
+
+    The journal mode persists in the database file, so this belongs in setup
+    rather than in the connect listener. Returns the resulting mode, or None
+    for a non-SQLite database.
+    """
+    mode = (app.extensions['db_profile'].get('pragmas') or {}).get('journal_mode')
+    with app.app_context():
+        engine = db.engine
+        if engine.dialect.name != 'sqlite':
+            return None
+        with engine.connect() as connection:
+            pragma = f'PRAGMA journal_mode={mode}' if mode else 'PRAGMA journal_mode'
+            return connection.exec_driver_sql(pragma).scalar()
+
+
+def describe(app) -> str:
+    """One-line summary of the configured database setup for startup logging
+
+    Built from the configuration only: the factory runs for every CLI
+    command and job worker, and must not open a connection.
+    """
+    profile = app.extensions['db_profile']
+    url = make_url(app.config['SQLALCHEMY_DATABASE_URI'])
+    parts = [url.render_as_string(hide_password=True), f"profile={profile['name']}"]
+    if url.get_backend_name() == 'sqlite':
+        for name, value in (profile.get('pragmas') or {}).items():
+            parts.append(f'{name}={value}')
+    else:
+        options = app.config.get('SQLALCHEMY_ENGINE_OPTIONS') or {}
+        parts.append(f"pool_size={options.get('pool_size', 'default')}")
+    read_url = app.config.get('DATABASE_READ_URL')
+    parts.append('read=' + (make_url(read_url).render_as_string(hide_password=True)
+                            if read_url else 'primary'))
+    return ' '.join(parts)
@@ -1,7 +1,27 @@
 from flask_sqlalchemy import SQLAlchemy
 from flask_cors import CORS
 from flask_migrate import Migrate
+from app.prediction_cache import PredictionCache
+from app.artifacts import ArtifactStore
+from app.fetcher import ImageFetcher
+from app.contact_writer import ContactWriteBuffer
+from app.prediction_log import PredictionLog
+from app.metrics import Metrics
+from app.auth import CredentialCache
+from app.response_cache import ResponseCache
+from app.uploads import UploadLimits
+from app.model_registry import ModelRegistry
 
 db = SQLAlchemy()
 cors = CORS()
-migrate = Migrate()
\ No newline at end of file
+migrate = Migrate()
+prediction_cache = PredictionCache()
+artifact_store = ArtifactStore()
+image_fetcher = ImageFetcher()
+contact_writer = ContactWriteBuffer()
+prediction_log = PredictionLog()
+metrics = Metrics()
+credential_cache = CredentialCache()
+response_cache = ResponseCache()
+upload_limits = UploadLimits()
+model_registry = ModelRegistry()
@@ -0,0 +1,210 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, NamedTuple, Optional
+from urllib.parse import urlsplit
+
+
+class FetchError(ValueError):
+    """Raised when a remote image cannot be downloaded within the limits"""
+
+
+class FetchResult(NamedTuple):
+    content: bytes
+    content_type: Optional[str]
+    from_cache: bool
+
+
+class ImageFetcher:
+    """Pooled, size-bounded downloader for image URLs
+
+    One shared ``requests.Session`` keeps connections alive across requests.
+    Every download has connect/read timeouts and an overall deadline, is
+    streamed, and is aborted once it exceeds ``FETCH_MAX_BYTES``. Concurrent
+    downloads per host are capped, and responses carrying an ETag or
+    Last-Modified are cached and revalidated so a repeated URL costs a 304.
+    """
+
+    def __init__(self, app=None, session=None):
+        self.connect_timeout = 5.0
+        self.read_timeout = 15.0
+        self.total_timeout = 30.0
+        self.max_bytes = 25 * 1024 * 1024
+        self.per_host_limit = 4
+        self.host_wait = 10.0
+        self.pool_size = 16
+        self.cache_max_entries = 128
+        self.cache_max_bytes = 64 * 1024 * 1024
+        self._session = session
+        self._lock = threading.Lock()
+        self._host_slots: Dict[str, threading.BoundedSemaphore] = {}
+        self._cache = OrderedDict()
+        self._cache_bytes = 0
+        self._stats = {'requests': 0, 'downloaded_bytes': 0, 'revalidated': 0,
+                       'cache_stores': 0, 'oversize_aborts': 0, 'errors': 0}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.configure(app.config)
+        app.extensions['image_fetcher'] = self
+
+    def configure(self, config: Dict):
+        """Apply settings from a config mapping (also used by worker processes)"""
+        self.connect_timeout = float(config.get('FETCH_CONNECT_TIMEOUT', 5))
+        self.read_timeout = float(config.get('FETCH_READ_TIMEOUT', 15))
+        self.total_timeout = float(config.get('FETCH_TOTAL_TIMEOUT', 30))
+        self.max_bytes = int(config.get('FETCH_MAX_BYTES', 25 * 1024 * 1024))
+        self.per_host_limit = int(config.get('FETCH_PER_HOST_LIMIT', 4))
+        self.host_wait = float(config.get('FETCH_HOST_WAIT', 10))
+        self.pool_size = int(config.get('FETCH_POOL_SIZE', 16))
+        self.cache_max_entries = int(config.get('FETCH_CACHE_MAX_ENTRIES', 128))
+        self.cache_max_bytes = int(config.get('FETCH_CACHE_MAX_BYTES', 64 * 1024 * 1024))
+
+    @property
+    def session(self):
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    import requests
+                    from requests.adapters import HTTPAdapter
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=self.pool_size,
+                                          pool_maxsize=self.pool_size, max_retries=0)
+                    session.mount('http://', adapter)
+                    session.mount('https://', adapter)
+                    self._session = session
+        return self._session
+
+    def _host_slot(self, host: str) -> threading.BoundedSemaphore:
+        with self._lock:
+            slot = self._host_slots.get(host)
+            if slot is None:
+                slot = self._host_slots[host] = threading.BoundedSemaphore(self.per_host_limit)
+            return slot
+
+    def fetch(self, url: str) -> FetchResult:
+        """Download a URL, reusing a revalidated cached copy when possible"""
+        parts = urlsplit(url)
+        if parts.scheme not in ('http', 'https') or not parts.hostname:
+            raise FetchError('Only http(s) URLs are supported')
+
+        slot = self._host_slot(parts.hostname.lower())
+        if not slot.acquire(timeout=self.host_wait):
+            raise FetchError(f'Too many concurrent downloads from {parts.hostname}')
+        try:
+            return self._fetch(url)
+        except FetchError:
+            self._count('errors')
+            raise
+        except Exception as e:
+            self._count('errors')
+            raise FetchError(str(e))
+        finally:
+            slot.release()
+
+    def _fetch(self, url: str) -> FetchResult:
+        cached = self._cache_get(url)
+        headers = {}
+        if cached is not None:
+            if cached.get('etag'):
+                headers['If-None-Match'] = cached['etag']
+            if cached.get('last_modified'):
+                headers['If-Modified-Since'] = cached['last_modified']
+
+        self._count('requests')
+        deadline = time.monotonic() + self.total_timeout
+        response = self.session.get(url, headers=headers, stream=True,
+                                    timeout=(self.connect_timeout, self.read_timeout))
+        with response:
+            if response.status_code == 304 and cached is not None:
+                self._count('revalidated')
+                return FetchResult(cached['content'], cached['content_type'], True)
+            response.raise_for_status()
+
+            declared = response.headers.get('Content-Length')
+            if declared and declared.isdigit() and int(declared) > self.max_bytes:
+                self._count('oversize_aborts')
+                raise FetchError(f'Image exceeds {self.max_bytes} bytes')
+
+            chunks = []
+            received = 0
+            for chunk in self._iter_body(response, deadline):
+                received += len(chunk)
+                if received > self.max_bytes:
+                    self._count('oversize_aborts')
+                    raise FetchError(f'Image exceeds {self.max_bytes} bytes')
+                chunks.append(chunk)
+            content = b''.join(chunks)
+
+            content_type = response.headers.get('Content-Type', '').split(';')[0].strip() or None
+            with self._lock:
+                self._stats['downloaded_bytes'] += received
+            self._cache_put(url, {
+                'content': content,
+                'content_type': content_type,
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified')
+            })
+        return FetchResult(content, content_type, False)
+
+    def _iter_body(self, response, deadline: float, chunk_size: int = 64 * 1024):
+        """Yield body chunks, enforcing the overall deadline on every socket read
+
+        ``read1`` returns whatever one receive delivers instead of waiting for
+        a full chunk, and the socket timeout is cut to the remaining budget,
+        so a server dripping bytes cannot stretch a download past it.
+        """
+        from urllib3.exceptions import ReadTimeoutError
+        raw = response.raw
+        sock = getattr(raw.connection, 'sock', None) if raw.connection is not None else None
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise FetchError(f'Download took longer than {self.total_timeout:g}s')
+            if sock is not None:
+                sock.settimeout(min(self.read_timeout, remaining))
+            try:
+                chunk = raw.read1(chunk_size, decode_content=True)
+            except (ReadTimeoutError, TimeoutError):
+                if time.monotonic() >= deadline:
+                    raise FetchError(f'Download took longer than {self.total_timeout:g}s')
+                raise FetchError(f'No data received for {self.read_timeout:g}s')
+            if not chunk:
+                return
+            yield chunk
+
+    def _cache_get(self, url: str) -> Optional[Dict]:
+        with self._lock:
+            entry = self._cache.get(url)
+            if entry is not None:
+                self._cache.move_to_end(url)
+            return entry
+
+    def _cache_put(self, url: str, entry: Dict):
+        # Only validatable responses are worth keeping
+        size = len(entry['content'])
+        if not (entry['etag'] or entry['last_modified']) or size > self.cache_max_bytes // 4:
+            return
+        with self._lock:
+            previous = self._cache.pop(url, None)
+            if previous is not None:
+                self._cache_bytes -= len(previous['content'])
+            self._cache[url] = entry
+            self._cache_bytes += size
+            self._stats['cache_stores'] += 1
+            while self._cache and (len(self._cache) > self.cache_max_entries
+                                   or self._cache_bytes > self.cache_max_bytes):
+                _, evicted = self._cache.popitem(last=False)
+                self._cache_bytes -= len(evicted['content'])
+
+    def _count(self, name: str):
+        with self._lock:
+            self._stats[name] += 1
+
+    def stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats['cache_entries'] = len(self._cache)
+            stats['cache_bytes'] = self._cache_bytes
+        return stats
@@ -0,0 +1,25 @@
+from flask import Blueprint, Response, jsonify
+from app.extensions import metrics
+from app.services import ImageAnalysisService
+
+health_bp = Blueprint('health', __name__)
+
+@health_bp.route('/healthz', methods=['GET'])
+def healthz():
+    """Liveness: the process is up and serving requests"""
+    return jsonify({'status': 'ok'})
+
+@health_bp.route('/readyz', methods=['GET'])
+def readyz():
+    """Readiness: the analysis model is loaded and can take traffic"""
+    status = ImageAnalysisService.get_status()
+    if not ImageAnalysisService.is_ready():
+        return jsonify({'status': 'not_ready', 'model': status}), 503
+    return jsonify({'status': 'ready', 'model': status})
+
+@health_bp.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    """Prometheus scrape endpoint (text exposition format)"""
+    if not metrics.enabled:
+        return jsonify({'error': 'Metrics are disabled'}), 404
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
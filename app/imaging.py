@@ -0,0 +1,196 @@
+import io
+import math
+import re
+import warnings
+from io import BytesIO
+from typing import List, Optional, Tuple
+
+
+class BufferReader(io.RawIOBase):
+    """Seekable read-only stream over a bytes-like object such as an mmap
+
+    Unlike ``BytesIO(data)`` it never copies a non-bytes buffer, so decoders
+    read a spooled upload straight from the page cache.
+    """
+
+    def __init__(self, data):
+        self._view = memoryview(data).cast('B')
+        self._position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        count = max(0, min(len(buffer), len(self._view) - self._position))
+        buffer[:count] = self._view[self._position:self._position + count]
+        self._position += count
+        return count
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self._position
+        elif whence == io.SEEK_END:
+            offset += len(self._view)
+        self._position = max(0, offset)
+        return self._position
+
+    def tell(self) -> int:
+        return self._position
+
+    def close(self):
+        if not self.closed:
+            self._view.release()
+        super().close()
+
+
+def open_buffer(data):
+    """A seekable stream over raw input bytes, an mmap or a memoryview"""
+    if isinstance(data, bytes):
+        return BytesIO(data)
+    return BufferReader(data)
+
+
+def set_max_image_pixels(max_pixels: Optional[int]):
+    """Reject images above ``max_pixels`` before decoding (decompression bombs)
+
+    Pillow only warns between MAX_IMAGE_PIXELS and twice that; the warning is
+    promoted to an error so the configured value is the hard limit.
+    """
+    from PIL import Image
+    Image.MAX_IMAGE_PIXELS = int(max_pixels) if max_pixels else None
+    warnings.filterwarnings('error', category=Image.DecompressionBombWarning)
+
+
+def load_image(data, draft_size: Optional[Tuple[int, int]] = None):
+    """Decode raw image bytes (or an mmap of them) into a PIL image
+
+    With ``draft_size`` JPEGs are decoded at the smallest DCT scale (1/2,
+    1/4 or 1/8) that is still larger than that size, so a 4000 px fundus
+    photo headed for a 224 px model input is never materialized at full
+    resolution. Strictly larger: the final step down is then always the
+    processor's own antialiasing resize. DCT scaling straight to the target
+    size differs from it noticeably (see check_draft_parity).
+    """
+    from PIL import Image
+    with open_buffer(data) as stream:
+        image = Image.open(stream)
+        if draft_size and image.format == 'JPEG':
+            image.draft('RGB', (draft_size[0] + 1, draft_size[1] + 1))
+        image.load()
+    return image
+
+
+def parse_page_selection(selection: Optional[str], page_count: int, max_pages: int = 0) -> List[int]:
+    """Parse '1', '2,4', '1-3' or 'all' into 1-based page numbers
+
+    Every page and range is checked against ``page_count`` before it is
+    expanded, and more than ``max_pages`` selected pages (0 = no limit) is
+    rejected, so a user-supplied range can neither exhaust memory nor
+    render an arbitrarily long PDF.
+    """
+    if not selection:
+        return [1]
+    selection = str(selection).strip().lower()
+
+    def check_count(count: int):
+        if max_pages and count > max_pages:
+            raise ValueError(f'{count} pages selected (limit {max_pages})')
+
+    if selection == 'all':
+        check_count(page_count)
+        return list(range(1, page_count + 1))
+    pages = set()
+    for part in selection.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        if '-' in part:
+            first, last = (int(value) for value in part.split('-', 1))
+        else:
+            first = last = int(part)
+        if first < 1 or last > page_count or first > last:
+            raise ValueError(f'Page {part} out of range (PDF has {page_count} pages)')
+        check_count(len(pages) + last - first + 1)
+        pages.update(range(first, last + 1))
+    return sorted(pages)
+
+
+def _pdf_info(data, path: Optional[str] = None) -> Tuple[int, Optional[Tuple[float, float]]]:
+    """Page count and first-page size in points, from pdfinfo"""
+    from pdf2image import pdfinfo_from_bytes, pdfinfo_from_path
+    info = pdfinfo_from_path(path) if path else pdfinfo_from_bytes(data)
+    size = None
+    match = re.match(r'\s*([\d.]+)\s*x\s*([\d.]+)', str(info.get('Page size', '')))
+    if match:
+        size = (float(match.group(1)), float(match.group(2)))
+    return int(info.get('Pages', 1)), size
+
+
+def render_dpi(page_size: Optional[Tuple[float, float]], min_pixels: int,
+               min_dpi: int = 36, max_dpi: int = 200) -> int:
+    """Lowest DPI at which the page's short side covers ``min_pixels``"""
+    if not page_size or min(page_size) <= 0:
+        return max_dpi
+    dpi = math.ceil(min_pixels * 72.0 / min(page_size))
+    return max(min_dpi, min(max_dpi, dpi))
+
+
+def extract_embedded_image(data, page: int, min_pixels: int):
+    """Return the largest raster image embedded in a PDF page, or None
+
+    Scanned fundus photos are usually stored as a single embedded JPEG, which
+    can be decoded directly instead of rasterizing the page. Needs the
+    optional ``pypdf`` package; without it every page is rasterized.
+    """
+    try:
+        from pypdf import PdfReader
+    except ImportError:
+        return None
+    try:
+        with open_buffer(data) as stream:
+            reader = PdfReader(stream)
+            candidates = [embedded.image for embedded in reader.pages[page - 1].images]
+    except Exception:
+        return None
+    candidates = [image for image in candidates if image is not None]
+    if not candidates:
+        return None
+    image = max(candidates, key=lambda candidate: candidate.size[0] * candidate.size[1])
+    if min(image.size) < min_pixels:
+        return None
+    return image
+
+
+def extract_pdf_images(data, pages: Optional[str] = None, min_pixels: int = 512,
+                       min_dpi: int = 36, max_dpi: int = 200,
+                       path: Optional[str] = None, max_pages: int = 0) -> List[Tuple[int, object]]:
+    """Extract ``(page_number, image)`` pairs for the selected PDF pages
+
+    Pages holding an embedded raster image of at least ``min_pixels`` on its
+    short side yield that image as is; other pages are rendered one at a time
+    at the lowest DPI that still gives ``min_pixels`` on the short side.
+    ``path`` names a file holding the same bytes (a spooled upload), which
+    poppler then reads directly instead of a temporary copy. At most
+    ``max_pages`` pages may be selected (0 = no limit).
+    """
+    from pdf2image import convert_from_bytes, convert_from_path
+    page_count, page_size = _pdf_info(data, path)
+    dpi = render_dpi(page_size, min_pixels, min_dpi, max_dpi)
+
+    images = []
+    for page in parse_page_selection(pages, page_count, max_pages):
+        image = extract_embedded_image(data, page, min_pixels)
+        if image is None:
+            if path:
+                rendered = convert_from_path(path, dpi=dpi, first_page=page, last_page=page)
+            else:
+                rendered = convert_from_bytes(data, dpi=dpi, first_page=page, last_page=page)
+            image = rendered[0] if rendered else None
+        if image is not None:
+            images.append((page, image))
+    if not images:
+        raise ValueError('Could not extract images from PDF')
+    return images
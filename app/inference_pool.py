@@ -0,0 +1,138 @@
+import os
+import time
+from typing import Dict, List, Optional
+
+# Set in each worker process by _init_worker
+_worker_runner = None
+
+
+def _init_worker(model, threads: int, backend: str, channels_last: bool, example_shape,
+                 warmup_shape=None, warmup_sizes=(), ready=None):
+    """Receive the shared-memory model once per worker process, then warm it up"""
+    global _worker_runner
+    from app.threads import THREAD_ENV_VARS
+    for name in THREAD_ENV_VARS:
+        os.environ[name] = str(max(1, threads))
+    import torch
+    from app.backends import build_runner
+    torch.set_num_threads(max(1, threads))
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        pass
+    example = torch.zeros(example_shape) if example_shape else None
+    _worker_runner = build_runner(model, backend, example, channels_last)
+    try:
+        if warmup_shape:
+            for size in warmup_sizes:
+                _run_forward(torch.rand([size] + list(warmup_shape[1:])))
+    finally:
+        if ready is not None:
+            ready.release()
+
+
+def _run_forward(pixel_values):
+    """Forward pass + softmax inside a worker process"""
+    import torch
+    return torch.nn.functional.softmax(_worker_runner(pixel_values), dim=-1)
+
+
+def _read_memory(pid: int) -> Optional[Dict[str, int]]:
+    """Read RSS/PSS/shared/private kB for a process from /proc (Linux only)"""
+    fields = {'Rss': 'rss_kb', 'Pss': 'pss_kb', 'Shared_Clean': 'shared_clean_kb',
+              'Shared_Dirty': 'shared_dirty_kb', 'Private_Clean': 'private_clean_kb',
+              'Private_Dirty': 'private_dirty_kb'}
+    try:
+        with open(f'/proc/{pid}/smaps_rollup') as f:
+            lines = f.readlines()
+    except OSError:
+        return None
+    memory = {}
+    for line in lines:
+        parts = line.split()
+        if len(parts) >= 2 and parts[0].rstrip(':') in fields:
+            memory[fields[parts[0].rstrip(':')]] = int(parts[1])
+    memory['private_kb'] = memory.get('private_clean_kb', 0) + memory.get('private_dirty_kb', 0)
+    return memory
+
+
+class InferencePool:
+    """Process pool of inference workers sharing one copy of the model weights
+
+    The parent moves every parameter and buffer into shared memory with
+    ``Module.share_memory()`` before starting the pool. Workers receive the
+    model through torch.multiprocessing, which passes shared storages by
+    handle instead of copying them, so each extra worker only adds its
+    interpreter and runtime overhead. Preprocessing stays in the parent and
+    only the small pixel tensors cross the process boundary.
+
+    Workers build the selected inference backend themselves; with ``int8``
+    each worker holds its own (4x smaller) quantized copy of the Linear
+    weights, since packed int8 weights cannot live in shared memory.
+
+    With ``warmup_shape`` each worker runs one forward pass per size in
+    ``warmup_sizes`` on random input before it takes work, and
+    ``wait_ready`` blocks until every worker has done so.
+
+    ``multiprocessing.Pool`` replaces a worker that dies, but the batch it
+    was running never completes, so ``predict`` gives up after ``timeout``
+    seconds instead of hanging the request.
+    """
+
+    def __init__(self, model, workers: int, start_method: str = 'spawn',
+                 threads_per_worker: int = 1, backend: str = 'eager',
+                 channels_last: bool = False, example_shape=None,
+                 warmup_shape=None, warmup_sizes=(), timeout: float = 60.0):
+        import torch.multiprocessing as mp
+        self.workers = max(1, int(workers))
+        self.timeout = float(timeout) if timeout else None
+        self.threads_per_worker = max(1, int(threads_per_worker))
+        self.start_method = start_method
+        self.model_bytes = sum(t.numel() * t.element_size()
+                               for t in list(model.parameters()) + list(model.buffers()))
+        model.share_memory()
+        context = mp.get_context(start_method)
+        self._ready = context.Semaphore(0)
+        self._pool = context.Pool(self.workers, initializer=_init_worker,
+                                  initargs=(model, self.threads_per_worker, backend,
+                                            channels_last, example_shape,
+                                            warmup_shape, tuple(warmup_sizes), self._ready))
+
+    def wait_ready(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every worker has loaded and warmed up its runner"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for _ in range(self.workers):
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            if not self._ready.acquire(timeout=remaining):
+                return False
+        return True
+
+    def predict(self, pixel_values):
+        """Run one batch on the next free worker and return softmax rows"""
+        import multiprocessing
+        try:
+            return self._pool.apply_async(_run_forward, (pixel_values,)).get(self.timeout)
+        except multiprocessing.TimeoutError:
+            raise TimeoutError(f'Inference worker did not answer within {self.timeout:g}s')
+
+    def worker_pids(self) -> List[int]:
+        # multiprocessing.Pool keeps its live worker processes in _pool
+        return [process.pid for process in self._pool._pool if process.is_alive()]
+
+    def close(self):
+        self._pool.terminate()
+        self._pool.join()
+
+    def stats(self, memory: bool = False) -> Dict:
+        """Pool settings and, optionally, per-process memory from /proc"""
+        stats = {
+            'workers': self.workers,
+            'start_method': self.start_method,
+            'threads_per_worker': self.threads_per_worker,
+            'timeout': self.timeout,
+            'model_bytes': self.model_bytes
+        }
+        if memory:
+            stats['parent'] = _read_memory(os.getpid())
+            stats['worker_memory'] = {str(pid): _read_memory(pid) for pid in self.worker_pids()}
+        return stats
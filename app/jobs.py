@@ -0,0 +1,176 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from multiprocessing import get_context
+from typing import Dict, Optional
+
+from flask import current_app
+from app.repository import AnalysisJobRepository
+
+
+def analyze_source(source_type: str, source: str, content_type: Optional[str] = None) -> Dict:
+    """Fetch, decode and analyze one job input (runs in a worker thread or process)"""
+    from app.services import AnalyzeInputUseCase
+    if source_type == 'url':
+        from app.extensions import image_fetcher
+        try:
+            fetched = image_fetcher.fetch(source)
+        except Exception as e:
+            return {'error': f'Invalid image URL: {str(e)}'}
+        return AnalyzeInputUseCase.execute(fetched.content, fetched.content_type,
+                                           invalid_message='Invalid image URL')
+
+    from app.uploads import map_file
+    data = map_file(source)
+    try:
+        return AnalyzeInputUseCase.execute(data, content_type, path=source)
+    finally:
+        if hasattr(data, 'close'):
+            try:
+                data.close()
+            except BufferError:
+                pass
+
+
+def _init_process_worker(config: Dict):
+    """Load the model once in each spawned inference process"""
+    from app.extensions import (prediction_cache, artifact_store, image_fetcher, prediction_log,
+                                upload_limits, model_registry)
+    from app.services import ImageAnalysisService
+    from app.threads import plan_threads
+    model_registry.configure(config)
+    prediction_cache.configure(config)
+    upload_limits.configure(config)
+    artifact_store.configure(config)
+    image_fetcher.configure(config)
+    prediction_log.configure(config)
+    prediction_log.connect(config['SQLALCHEMY_DATABASE_URI'])
+    # The job processes share their web worker's slice of the CPU budget
+    share = plan_threads(dict(config, INFERENCE_PROCESSES=0))['threads_per_worker']
+    threads = config.get('TORCH_NUM_THREADS') or max(1, share // int(config.get('ANALYSIS_JOB_WORKERS', 1)))
+    ImageAnalysisService.initialize_model(
+        dict(config, INFERENCE_BATCHING_ENABLED=False, INFERENCE_PROCESSES=0,
+             TORCH_NUM_THREADS=threads))
+
+
+def _picklable_config(config) -> Dict:
+    return {key: value for key, value in config.items()
+            if key.isupper() and isinstance(value, (str, int, float, bool, type(None)))}
+
+
+class AnalysisJobQueue:
+    """Background worker pool for asynchronous analysis jobs
+
+    Job state lives in the ``analysis_job`` table. Dispatcher threads claim a
+    job, run the fetch/decode/inference either in-thread or on a process
+    pool (``ANALYSIS_JOB_EXECUTOR``), and store the outcome. Jobs still
+    queued - or left running by a worker that died - are picked up again
+    the first time a restarted app serves a request.
+    """
+
+    def __init__(self, app=None):
+        self.executor_kind = 'thread'
+        self.workers = 2
+        self.upload_dir = None
+        self.stale_after = 600.0
+        self._app = None
+        self._lock = threading.Lock()
+        self._dispatcher = None
+        self._processes = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.executor_kind = app.config.get('ANALYSIS_JOB_EXECUTOR', 'thread')
+        if self.executor_kind not in ('thread', 'process'):
+            raise ValueError(f'Unknown ANALYSIS_JOB_EXECUTOR: {self.executor_kind}')
+        self.workers = max(1, int(app.config.get('ANALYSIS_JOB_WORKERS', 2)))
+        self.upload_dir = (app.config.get('ANALYSIS_JOB_UPLOAD_DIR')
+                           or os.path.join(app.instance_path, 'job_uploads'))
+        self.stale_after = float(app.config.get('ANALYSIS_JOB_STALE_SECONDS', 600))
+        app.extensions['analysis_jobs'] = self
+        # Start lazily so CLI commands never spin up workers
+        app.before_request(self._start_on_request)
+
+    @property
+    def started(self) -> bool:
+        return self._dispatcher is not None
+
+    def start(self, app):
+        """Create the worker pools and re-queue unfinished jobs"""
+        with self._lock:
+            if self._dispatcher is not None:
+                return
+            self._app = app
+            if self.executor_kind == 'process':
+                self._processes = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=get_context('spawn'),
+                    initializer=_init_process_worker,
+                    initargs=(_picklable_config(app.config),)
+                )
+            self._dispatcher = ThreadPoolExecutor(
+                max_workers=self.workers, thread_name_prefix='analysis-job')
+
+        with app.app_context():
+            try:
+                job_ids = AnalysisJobRepository.requeue_unfinished(self.stale_after)
+            except Exception:
+                app.logger.exception('Could not recover queued analysis jobs')
+                return
+        for job_id in job_ids:
+            self._dispatcher.submit(self._run, job_id)
+
+    def shutdown(self, wait: bool = True):
+        """Stop the worker pools; queued jobs stay in the table for next start"""
+        with self._lock:
+            dispatcher, processes = self._dispatcher, self._processes
+            self._dispatcher = self._processes = None
+        if dispatcher is not None:
+            dispatcher.shutdown(wait=wait, cancel_futures=True)
+        if processes is not None:
+            processes.shutdown(wait=wait, cancel_futures=True)
+
+    def store_upload(self, job_id: str, data: bytes) -> str:
+        """Persist an uploaded file for a job and return its path"""
+        os.makedirs(self.upload_dir, exist_ok=True)
+        path = os.path.join(self.upload_dir, job_id)
+        with open(path, 'wb') as f:
+            f.write(data)
+        return path
+
+    def enqueue(self, job_id: str):
+        """Schedule a queued job on the worker pool"""
+        if not self.started:
+            self.start(current_app._get_current_object())
+        self._dispatcher.submit(self._run, job_id)
+
+    def _start_on_request(self):
+        if not self.started:
+            self.start(current_app._get_current_object())
+
+    def _run(self, job_id: str):
+        with self._app.app_context():
+            job = AnalysisJobRepository.claim(job_id)
+            if job is None:
+                return
+            source_type, source, content_type = job.source_type, job.source, job.content_type
+
+            try:
+                if self._processes is not None:
+                    result = self._processes.submit(
+                        analyze_source, source_type, source, content_type).result()
+                else:
+                    result = analyze_source(source_type, source, content_type)
+            except Exception as e:
+                result = {'error': str(e)}
+
+            AnalysisJobRepository.finish(job_id, result)
+            if source_type == 'file':
+                try:
+                    os.remove(source)
+                except OSError:
+                    pass
+
+
+analysis_jobs = AnalysisJobQueue()
@@ -1,7 +1,11 @@
 from app.services import CreateContactUseCase
 from flask.cli import with_appcontext
-from flask import send_file
+from flask import send_file, Response, stream_with_context, current_app
+from typing import Callable, List, Tuple
+import json
+import mimetypes
 import os
+import zipfile
 import click
 from flask import Blueprint, request, jsonify, render_template, redirect, url_for, session
 from functools import wraps
@@ -11,88 +15,221 @@ from app.services import (
     CreateContactUseCase,
     UpdateContactUseCase,
     DeleteContactUseCase,
-    AnalyzeImageUseCase
+    AnalyzeImageUseCase,
+    AnalyzeInputUseCase,
+    AnalyzeBatchUseCase,
+    SubmitAnalysisJobUseCase,
+    GetAnalysisJobUseCase,
+    ImageAnalysisService,
+    ModelNotReadyError
 )
+from app.extensions import prediction_cache, artifact_store, image_fetcher, prediction_log, metrics, upload_limits
+from app.uploads import detach_upload, upload_buffer, upload_kind
+from app.imaging import open_buffer
+from werkzeug.exceptions import RequestEntityTooLarge
 bp = Blueprint('main', __name__)
 
+@bp.errorhandler(ModelNotReadyError)
+def model_not_ready(e):
+    return jsonify({'error': str(e)}), 503, {'Retry-After': '5'}
+
+@bp.errorhandler(RequestEntityTooLarge)
+def upload_too_large(e):
+    return jsonify({'error': f'Upload too large: {e.description}'}), 413
+
 @bp.route('/api/contact', methods=['POST'])
 def contact():
     data = request.get_json()
     result = CreateContactUseCase.execute(data)
     if 'error' in result:
+        if result['error'] == 'Service busy':
+            return jsonify(result), 503, {'Retry-After': '1'}
         status_code = 400 if 'Validation failed' in result['error'] else 500
         return jsonify(result), status_code
-    return jsonify(result), 201
+    # async write mode acknowledges before the row is committed
+    return jsonify(result), 202 if result.get('queued') else 201
 
 @bp.route('/api/analyze', methods=['POST'])
 def analyze():
-    from PIL import Image
-    from io import BytesIO
-    from pdf2image import convert_from_bytes
-    import requests
-    
     # Check if file was uploaded
     if 'file' in request.files:
         file = request.files['file']
         if file.filename == '':
             return jsonify({'error': 'No selected file'}), 400
-            
-        try:
-            if file.content_type == 'application/pdf':
-                images = convert_from_bytes(file.read())
-                if not images:
-                    return jsonify({'error': 'Could not extract images from PDF'}), 400
-                image = images[0]
-                # Save extracted image to temp file
-                import tempfile
-                temp_dir = os.path.join(bp.root_path, 'temp_images')
-                os.makedirs(temp_dir, exist_ok=True)
-                temp_img = tempfile.NamedTemporaryFile(
-                    suffix='.jpg',
-                    dir=temp_dir,
-                    delete=False
-                )
-                image.save(temp_img.name, 'JPEG')
-                temp_img.close()
-                
-                # Analyze the extracted image
-                result = AnalyzeImageUseCase.execute(image)
-                if 'error' in result:
-                    return jsonify(result), 500
-                
-                return jsonify({
-                    'prediction': result['prediction'],
-                    'confidence': result['confidence'],
-                    'extracted_image': os.path.basename(temp_img.name)
-                })
-            else:
-                image = Image.open(file.stream)
-        except Exception as e:
-            return jsonify({'error': f'Invalid file: {str(e)}'}), 400
+        with metrics.stage('upload_read'):
+            data, path = upload_buffer(file)
+        result = AnalyzeInputUseCase.execute(data, file.content_type,
+                                             pages=request.form.get('pages'), path=path)
     
     # Check if URL was provided
-    elif 'url' in request.json:
+    elif 'url' in (request.get_json(silent=True) or {}):
         try:
-            response = requests.get(request.json['url'])
-            image = Image.open(BytesIO(response.content))
+            with metrics.stage('url_fetch'):
+                fetched = image_fetcher.fetch(str(request.json['url']))
         except Exception as e:
             return jsonify({'error': f'Invalid image URL: {str(e)}'}), 400
+        result = AnalyzeInputUseCase.execute(fetched.content, fetched.content_type,
+                                             invalid_message='Invalid image URL')
     
     else:
         return jsonify({'error': 'No file or URL provided'}), 400
     
-    # Analyze the image
-    result = AnalyzeImageUseCase.execute(image)
     if 'error' in result:
-        return jsonify(result), 500
+        status_code = 400 if result['error'].startswith('Invalid') else 500
+        return jsonify(result), status_code
+    
+    with metrics.stage('serialize'):
+        response = jsonify(result)
+    return response, 200
+
+def _is_zip_upload(file) -> bool:
+    return (file.content_type in ('application/zip', 'application/x-zip-compressed')
+            or (file.filename or '').lower().endswith('.zip'))
+
+def _read_zip_member(archive, info, content_type) -> bytes:
+    # Checked against the declared size first so a zip bomb is never inflated
+    upload_limits.check_size(upload_kind(content_type, info.filename), info.file_size)
+    with archive.open(info) as member:
+        data = member.read(info.file_size + 1)
+    upload_limits.check_size(upload_kind(content_type, info.filename), len(data))
+    return data
+
+def _zip_items(file) -> List[Tuple[str, Callable]]:
+    # Members are read while the response streams, after the request has
+    # closed its uploads; the archive keeps its own view of the buffer (an
+    # mmap outlives its closed file while it is still referenced)
+    data, _ = upload_buffer(file)
+    archive = zipfile.ZipFile(open_buffer(data))
+    items = []
+    for info in archive.infolist():
+        name = info.filename
+        if info.is_dir() or name.startswith('__MACOSX/') or os.path.basename(name).startswith('.'):
+            continue
+        content_type = mimetypes.guess_type(name)[0]
+        items.append((name, lambda info=info, content_type=content_type: (
+            _read_zip_member(archive, info, content_type), content_type, 'Invalid file')))
+    return items
+
+def _url_loader(url: str) -> Callable:
+    def load():
+        try:
+            fetched = image_fetcher.fetch(url)
+        except Exception as e:
+            raise ValueError(f'Invalid image URL: {str(e)}')
+        return fetched.content, fetched.content_type, 'Invalid image URL'
+    return load
+
+@bp.route('/api/analyze/batch', methods=['POST'])
+def analyze_batch():
+    """Analyze many files, a ZIP archive or a list of URLs, streaming NDJSON"""
+    items = []
+    # Spooled files are read while the response streams, after the request
+    # has closed its uploads, so they are released by the generator instead
+    releases = []
+
+    def release_uploads():
+        for release in releases:
+            release()
+
+    if request.files:
+        for file in request.files.getlist('files') + request.files.getlist('file'):
+            if file.filename == '':
+                continue
+            if _is_zip_upload(file):
+                try:
+                    items.extend(_zip_items(file))
+                except zipfile.BadZipFile as e:
+                    release_uploads()
+                    return jsonify({'error': f'Invalid ZIP archive: {str(e)}'}), 400
+            else:
+                data, release = detach_upload(file)
+                releases.append(release)
+                items.append((file.filename, lambda data=data, content_type=file.content_type: (
+                    data, content_type, 'Invalid file')))
+    else:
+        urls = (request.get_json(silent=True) or {}).get('urls')
+        if isinstance(urls, list):
+            items = [(str(url), _url_loader(str(url))) for url in urls]
+
+    if not items:
+        return jsonify({'error': 'No files, ZIP archive or URLs provided'}), 400
+    max_items = current_app.config.get('ANALYZE_BATCH_MAX_ITEMS', 1000)
+    if len(items) > max_items:
+        release_uploads()
+        return jsonify({'error': f'Too many items: {len(items)} (limit {max_items})'}), 400
+
+    workers = current_app.config.get('ANALYZE_BATCH_WORKERS', 16)
+
+    def generate():
+        succeeded = 0
+        try:
+            for result in AnalyzeBatchUseCase.execute(items, workers=workers):
+                succeeded += 'error' not in result
+                yield json.dumps(result) + '\n'
+            yield json.dumps({'summary': {
+                'total': len(items),
+                'succeeded': succeeded,
+                'failed': len(items) - succeeded
+            }}) + '\n'
+        finally:
+            release_uploads()
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+@bp.route('/api/analyze/jobs', methods=['POST'])
+def submit_analysis_job():
+    """Queue an analysis and return its job id immediately"""
+    if 'file' in request.files:
+        file = request.files['file']
+        if file.filename == '':
+            return jsonify({'error': 'No selected file'}), 400
+        data, _ = upload_buffer(file)
+        job = SubmitAnalysisJobUseCase.execute(data=data, content_type=file.content_type)
+    elif 'url' in (request.get_json(silent=True) or {}):
+        job = SubmitAnalysisJobUseCase.execute(url=str(request.json['url']))
+    else:
+        return jsonify({'error': 'No file or URL provided'}), 400
     
-    return jsonify(result), 200
+    job['status_url'] = url_for('main.get_analysis_job', job_id=job['id'])
+    return jsonify(job), 202
+
+@bp.route('/api/analyze/jobs/<job_id>', methods=['GET'])
+def get_analysis_job(job_id):
+    """Return an analysis job's status and, once finished, its result"""
+    job = GetAnalysisJobUseCase.execute(job_id)
+    if not job:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(job)
+
+@bp.route('/api/analyze/stats', methods=['GET'])
+def analyze_stats():
+    """Report inference queue depth and batch-size statistics"""
+    stats = ImageAnalysisService.get_stats(memory=request.args.get('memory') == '1')
+    stats['cache'] = prediction_cache.stats()
+    stats['artifacts'] = artifact_store.stats()
+    stats['fetcher'] = image_fetcher.stats()
+    stats['prediction_log'] = prediction_log.stats()
+    return jsonify(stats)
+
+@bp.route('/api/model/info', methods=['GET'])
+def model_info():
+    """Report the loaded model, active inference backend and its parity/speedup"""
+    return jsonify(ImageAnalysisService.get_info())
 
 @bp.route('/temp_images/<path:filename>')
 def serve_temp_image(filename):
-    """Serve temporary extracted images"""
-    temp_dir = os.path.join(bp.root_path, 'temp_images')
-    image_path = os.path.join(temp_dir, filename)
-    if not os.path.exists(image_path):
+    """Serve extracted images with ETag, Range and long-lived caching"""
+    image_path = artifact_store.path_for(filename)
+    if image_path is None:
         return jsonify({'error': 'Image not found'}), 404
-    return send_file(image_path, mimetype='image/jpeg')
\ No newline at end of file
+    response = send_file(
+        image_path,
+        mimetype='image/jpeg',
+        conditional=True,
+        etag=artifact_store.etag_for(filename),
+        max_age=current_app.config.get('ARTIFACT_CACHE_MAX_AGE', 31536000)
+    )
+    # Content-addressed names never change content
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
@@ -0,0 +1,294 @@
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Sequence, Tuple
+
+# Latency buckets in seconds, from sub-millisecond SQL to multi-second PDFs
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+                   0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = '') -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonic counter with optional labels"""
+
+    kind = 'counter'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, *labelvalues: str):
+        key = tuple(labelvalues)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def collect(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f'{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}'
+                for key, value in items]
+
+
+class Histogram:
+    """Cumulative-bucket histogram with optional labels"""
+
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labelvalues -> [per-bucket counts (+Inf last), sum]
+        self._series: Dict[Tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labelvalues: str):
+        key = tuple(labelvalues)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    @contextmanager
+    def time(self, *labelvalues: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, *labelvalues)
+
+    def snapshot(self) -> Dict[Tuple[str, ...], Tuple[int, float]]:
+        """(count, sum) per label-value tuple; diff two snapshots for a window"""
+        with self._lock:
+            return {key: (sum(counts), total) for key, (counts, total) in self._series.items()}
+
+    def collect(self) -> List[str]:
+        with self._lock:
+            items = sorted((key, (list(counts), total)) for key, (counts, total) in self._series.items())
+        lines = []
+        for key, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                labels = _format_labels(self.labelnames, key, f'le="{_format_value(bound)}"')
+                lines.append(f'{self.name}_bucket{labels} {cumulative}')
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f'{self.name}_sum{labels} {_format_value(total)}')
+            lines.append(f'{self.name}_count{labels} {cumulative}')
+        return lines
+
+
+class Gauge:
+    """Gauge read from a callback at scrape time
+
+    The callback returns a number, or a dict mapping label-value tuples to
+    numbers; returning None omits the sample.
+    """
+
+    kind = 'gauge'
+
+    def __init__(self, name: str, documentation: str, callback: Callable,
+                 labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.callback = callback
+
+    def collect(self) -> List[str]:
+        try:
+            value = self.callback()
+        except Exception:
+            return []
+        if value is None:
+            return []
+        if not isinstance(value, dict):
+            value = {(): value}
+        return [f'{self.name}{_format_labels(self.labelnames, key)} {_format_value(float(sample))}'
+                for key, sample in sorted(value.items()) if sample is not None]
+
+
+class Metrics:
+    """In-process Prometheus metrics for the Flask app
+
+    Records request counts and latency per blueprint, per-stage analysis
+    timings, SQL statement timing via SQLAlchemy cursor events, and gauges
+    read at scrape time. Everything is a dict update under a short lock, so
+    it is cheap enough to leave on. Metrics are per process: inference and
+    job worker processes are not included.
+    """
+
+    def __init__(self, app=None):
+        self.enabled = True
+        self._metrics: Dict[str, object] = {}
+        self.requests = self.counter(
+            'http_requests_total', 'HTTP requests by blueprint, method and status',
+            ('blueprint', 'method', 'status'))
+        self.request_latency = self.histogram(
+            'http_request_duration_seconds', 'HTTP request latency by blueprint',
+            ('blueprint',))
+        self.stages = self.histogram(
+            'analysis_stage_duration_seconds', 'Time spent in each analysis stage', ('stage',))
+        self.queries = self.histogram(
+            'db_query_duration_seconds', 'SQL statement latency by statement type', ('operation',))
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        from flask import g, request
+        from sqlalchemy import event
+        from app.extensions import db
+
+        self.enabled = bool(app.config.get('METRICS_ENABLED', True))
+        app.extensions['metrics'] = self
+        if not self.enabled:
+            return
+
+        def start_timer():
+            g._metrics_started = time.perf_counter()
+
+        def remember_status(response):
+            g._metrics_status = response.status_code
+            return response
+
+        def record_request(exception):
+            # Teardown also runs when a view raises and after_request is skipped
+            started = g.pop('_metrics_started', None)
+            if started is None:
+                return
+            status = 500 if exception is not None else g.pop('_metrics_status', 500)
+            blueprint = request.blueprint or 'none'
+            self.requests.inc(1.0, blueprint, request.method, str(status))
+            self.request_latency.observe(time.perf_counter() - started, blueprint)
+
+        # Registered first so the timer covers the other before_request hooks
+        app.before_request_funcs.setdefault(None, []).insert(0, start_timer)
+        app.after_request(remember_status)
+        app.teardown_request(record_request)
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            conn.info.setdefault('_metrics_query_started', []).append(time.perf_counter())
+
+        def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            started = conn.info['_metrics_query_started'].pop()
+            operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else 'OTHER'
+            self.queries.observe(time.perf_counter() - started, operation)
+
+        def handle_error(exception_context):
+            stack = exception_context.connection.info.get('_metrics_query_started') \
+                if exception_context.connection is not None else None
+            if stack:
+                stack.pop()
+
+        with app.app_context():
+            engines = dict(db.engines)
+        for engine in engines.values():
+            event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+            event.listen(engine, 'after_cursor_execute', after_cursor_execute)
+            event.listen(engine, 'handle_error', handle_error)
+        self._register_app_gauges(engines)
+
+    def _register_app_gauges(self, engines: Dict):
+        # Imports happen at scrape time; the services import this module
+        def service():
+            from app.services import ImageAnalysisService
+            return ImageAnalysisService
+
+        def extension(name):
+            import app.extensions
+            return getattr(app.extensions, name)
+
+        def batcher_value(batcher, field):
+            return batcher.stats()[field] if batcher is not None else None
+
+        self.gauge('model_ready', 'Whether the analysis model is loaded (1) or not (0)',
+                   lambda: 1 if service().is_ready() else 0)
+        self.gauge('inference_queue_depth', 'Images waiting for an inference batch',
+                   lambda: batcher_value(service()._batcher, 'queue_depth'))
+        self.gauge('inference_batches', 'Inference batches run since start',
+                   lambda: batcher_value(service()._batcher, 'batches'))
+        self.gauge('inference_avg_batch_size', 'Average inference batch size since start',
+                   lambda: batcher_value(service()._batcher, 'avg_batch_size'))
+        self.gauge('contact_write_queue_depth', 'Contact submissions waiting for a group commit',
+                   lambda: batcher_value(extension('contact_writer')._batcher, 'queue_depth'))
+        self.gauge('prediction_log_queue_depth', 'Prediction log rows waiting to be written',
+                   lambda: batcher_value(extension('prediction_log')._batcher, 'queue_depth'))
+        self.gauge('prediction_cache_entries', 'Entries in the in-memory prediction cache',
+                   lambda: extension('prediction_cache').stats()['entries'])
+        self.gauge('prediction_cache_hit_ratio', 'Prediction cache hit ratio since start',
+                   lambda: extension('prediction_cache').stats()['hit_rate'])
+
+        def pool_checked_out():
+            return {(str(key or 'default'),): engine.pool.checkedout()
+                    for key, engine in engines.items() if hasattr(engine.pool, 'checkedout')}
+
+        self.gauge('db_pool_checked_out', 'Database connections currently checked out',
+                   pool_checked_out, ('bind',))
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def gauge(self, name: str, documentation: str, callback: Callable,
+              labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, callback, labelnames))
+
+    def _register(self, metric):
+        self._metrics[metric.name] = metric
+        return metric
+
+    @contextmanager
+    def stage(self, name: str):
+        """Time a block as one analysis stage"""
+        if not self.enabled:
+            yield
+            return
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages.observe(time.perf_counter() - started, name)
+
+    def observe_stage(self, name: str, seconds: float):
+        if self.enabled:
+            self.stages.observe(seconds, name)
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format (0.0.4)"""
+        lines = []
+        for metric in self._metrics.values():
+            samples = metric.collect()
+            if not samples:
+                continue
+            lines.append(f'# HELP {metric.name} {metric.documentation}')
+            lines.append(f'# TYPE {metric.name} {metric.kind}')
+            lines.extend(samples)
+        return '\n'.join(lines) + '\n'
@@ -0,0 +1,217 @@
+import fnmatch
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+# Files kept from a checkpoint: configs, processor settings and safetensors weights
+ARTIFACT_PATTERNS = ('*.json', '*.txt', '*.safetensors')
+MANIFEST = 'manifest.json'
+CURRENT = 'CURRENT'
+
+
+class ModelArtifactError(RuntimeError):
+    """Raised when a model artifact is missing from the registry or fails verification"""
+
+
+def file_sha256(path: str, chunk_size: int = 1024 * 1024) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def artifact_digest(files: Dict[str, Dict]) -> str:
+    """One checksum for a whole artifact: SHA-256 over the sorted per-file hashes"""
+    lines = ''.join(f"{name}\0{files[name]['sha256']}\n" for name in sorted(files))
+    return hashlib.sha256(lines.encode()).hexdigest()
+
+
+def _artifact_files(directory: str) -> List[str]:
+    names = []
+    for root, _, files in os.walk(directory):
+        for name in files:
+            relative = os.path.relpath(os.path.join(root, name), directory)
+            if relative != MANIFEST and any(fnmatch.fnmatch(name, p) for p in ARTIFACT_PATTERNS):
+                names.append(relative)
+    return sorted(names)
+
+
+def _write_atomic(path: str, content: str):
+    temporary = f'{path}.{os.getpid()}.tmp'
+    with open(temporary, 'w') as f:
+        f.write(content)
+    os.replace(temporary, path)
+
+
+class ModelRegistry:
+    """Pinned model checkpoints stored under ``MODEL_REGISTRY_DIR``
+
+    Layout: ``<root>/<org>--<name>/<revision>/`` holds the config, the
+    processor config and the weights as safetensors, next to a
+    ``manifest.json`` with the size and SHA-256 of every file. A ``CURRENT``
+    file per model names the revision used when ``MODEL_REVISION`` is not
+    set. ``flask import-model`` is the only step that touches the network.
+    The app loads from here with ``local_files_only``, and safetensors
+    weights are memory-mapped instead of unpickled.
+    """
+
+    def __init__(self, app=None):
+        self.root = None
+        self.verify_mode = 'size'
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.configure(app.config)
+        # Pin the registry's current revision so the prediction cache, the
+        # prediction log and job processes all see the revision being served
+        if app.config.get('MODEL_SOURCE', 'registry') == 'registry' and not app.config.get('MODEL_REVISION'):
+            app.config['MODEL_REVISION'] = self.current_revision(app.config.get('MODEL_NAME', ''))
+        app.extensions['model_registry'] = self
+
+    def configure(self, config: Dict):
+        """Apply settings from a config mapping (also used by worker processes)"""
+        self.root = config.get('MODEL_REGISTRY_DIR')
+        self.verify_mode = config.get('MODEL_REGISTRY_VERIFY', 'size')
+
+    def model_dir(self, name: str) -> str:
+        return os.path.join(self.root, name.strip('/').replace('/', '--'))
+
+    def current_revision(self, name: str) -> Optional[str]:
+        try:
+            with open(os.path.join(self.model_dir(name), CURRENT)) as f:
+                return f.read().strip() or None
+        except OSError:
+            return None
+
+    def revisions(self, name: str) -> List[str]:
+        directory = self.model_dir(name)
+        if not os.path.isdir(directory):
+            return []
+        return sorted(entry for entry in os.listdir(directory)
+                      if os.path.isfile(os.path.join(directory, entry, MANIFEST)))
+
+    def manifest(self, name: str, revision: Optional[str] = None) -> Dict:
+        revision = revision or self.current_revision(name)
+        path = os.path.join(self.model_dir(name), revision or '', MANIFEST)
+        if not revision or not os.path.isfile(path):
+            raise ModelArtifactError(
+                f"Model {name}@{revision or 'current'} is not in the registry at {self.root}; "
+                f"import it with `flask import-model {name}`")
+        with open(path) as f:
+            return json.load(f)
+
+    def resolve(self, name: str, revision: Optional[str] = None) -> str:
+        """Directory to load ``name`` from, after a ``MODEL_REGISTRY_VERIFY`` check
+
+        A ``name`` that is itself a local directory is returned unchanged.
+        """
+        if os.path.isdir(name):
+            return name
+        manifest = self.manifest(name, revision)
+        directory = os.path.join(self.model_dir(name), manifest['revision'])
+        if self.verify_mode != 'none':
+            report = self.verify(name, manifest['revision'], checksums=self.verify_mode == 'checksum')
+            if not report['ok']:
+                raise ModelArtifactError(f"Model {name}@{manifest['revision']} failed verification: "
+                                         + '; '.join(report['problems']))
+        return directory
+
+    def verify(self, name: str, revision: Optional[str] = None, checksums: bool = True,
+               expected_digest: Optional[str] = None) -> Dict:
+        """Compare an artifact's files with its manifest (sizes, and SHA-256 if ``checksums``)"""
+        manifest = self.manifest(name, revision)
+        directory = os.path.join(self.model_dir(name), manifest['revision'])
+        problems = []
+        for filename, entry in manifest['files'].items():
+            path = os.path.join(directory, filename)
+            if not os.path.isfile(path):
+                problems.append(f'{filename} is missing')
+            elif os.path.getsize(path) != entry['bytes']:
+                problems.append(f"{filename} is {os.path.getsize(path)} bytes, expected {entry['bytes']}")
+            elif checksums and file_sha256(path) != entry['sha256']:
+                problems.append(f'{filename} does not match its checksum')
+        if expected_digest and expected_digest != manifest['digest']:
+            problems.append(f"artifact digest is {manifest['digest']}, expected {expected_digest}")
+        return {
+            'name': name,
+            'revision': manifest['revision'],
+            'digest': manifest['digest'],
+            'path': directory,
+            'checked': 'checksum' if checksums else 'size',
+            'ok': not problems,
+            'problems': problems
+        }
+
+    def import_model(self, source: str, revision: Optional[str] = None, name: Optional[str] = None,
+                     expected_digest: Optional[str] = None, make_current: bool = True) -> Dict:
+        """Copy a hub repo (at a pinned commit) or a local checkpoint into the registry
+
+        Checkpoints without safetensors weights are converted by loading and
+        re-saving them, which needs torch. The artifact is assembled in a
+        temporary directory and renamed into place, so a failed or rejected
+        import leaves the registry unchanged.
+        """
+        if os.path.isdir(source):
+            checkpoint, name = source, name or os.path.basename(os.path.normpath(source))
+        else:
+            from huggingface_hub import snapshot_download
+            name = name or source
+            checkpoint = snapshot_download(source, revision=revision,
+                                           allow_patterns=list(ARTIFACT_PATTERNS))
+            # Snapshots are stored under the resolved commit hash
+            revision = os.path.basename(checkpoint)
+
+        target_root = self.model_dir(name)
+        os.makedirs(target_root, exist_ok=True)
+        staging = tempfile.mkdtemp(prefix='.import-', dir=target_root)
+        try:
+            # mkdtemp creates 0700; the serving user may differ from the importer
+            os.chmod(staging, 0o755)
+            for filename in _artifact_files(checkpoint):
+                destination = os.path.join(staging, filename)
+                os.makedirs(os.path.dirname(destination), exist_ok=True)
+                shutil.copyfile(os.path.join(checkpoint, filename), destination)
+            if not any(f.endswith('.safetensors') for f in _artifact_files(staging)):
+                self._convert_to_safetensors(source, revision, staging)
+
+            files = {filename: {'sha256': file_sha256(os.path.join(staging, filename)),
+                                'bytes': os.path.getsize(os.path.join(staging, filename))}
+                     for filename in _artifact_files(staging)}
+            digest = artifact_digest(files)
+            if expected_digest and expected_digest != digest:
+                raise ModelArtifactError(f'Artifact digest is {digest}, expected {expected_digest}')
+            revision = revision or f'local-{digest[:12]}'
+            manifest = {
+                'name': name,
+                'revision': revision,
+                'source': source,
+                'digest': digest,
+                'files': files,
+                'imported_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+            }
+            _write_atomic(os.path.join(staging, MANIFEST), json.dumps(manifest, indent=2, sort_keys=True))
+
+            target = os.path.join(target_root, revision)
+            if os.path.isdir(target):
+                shutil.rmtree(target)
+            os.replace(staging, target)
+        except BaseException:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+        if make_current:
+            _write_atomic(os.path.join(target_root, CURRENT), revision + '\n')
+        return manifest
+
+    @staticmethod
+    def _convert_to_safetensors(source: str, revision: Optional[str], staging: str):
+        """Load pickled (.bin) weights once and store them as safetensors"""
+        from transformers import AutoModelForImageClassification
+        model = AutoModelForImageClassification.from_pretrained(source, revision=revision)
+        # transformers 5 always serializes with safetensors
+        model.save_pretrained(staging)
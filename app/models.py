@@ -1,14 +1,24 @@
 
+import json
 from datetime import datetime
+from sqlalchemy import DDL, event
 from app import db
 
 
 class Contact(db.Model):
+    __table_args__ = (
+        # Keyset pagination orders by (created_at, id); filters narrow by
+        # exact email or name prefix
+        db.Index('ix_contact_created_at_id', 'created_at', 'id'),
+        db.Index('ix_contact_email_created_at', 'email', 'created_at'),
+        db.Index('ix_contact_name', 'name'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
     email = db.Column(db.String(100), nullable=False)
     message = db.Column(db.Text, nullable=False)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
 
     def __repr__(self):
         return f'<Contact {self.name} - {self.email}>'
@@ -30,10 +40,153 @@ class Contact(db.Model):
         }
 
 
+# External-content FTS5 index over contact text, kept in sync by triggers so
+# every write path (ORM, bulk statements, raw SQL) updates it. SQLite only;
+# other backends search with ContactRepository's portable fallback.
+CONTACT_FTS_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS contact_fts USING fts5("
+    "name, email, message, content='contact', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS contact_fts_ai AFTER INSERT ON contact BEGIN "
+    "INSERT INTO contact_fts(rowid, name, email, message) "
+    "VALUES (new.id, new.name, new.email, new.message); END",
+    "CREATE TRIGGER IF NOT EXISTS contact_fts_ad AFTER DELETE ON contact BEGIN "
+    "INSERT INTO contact_fts(contact_fts, rowid, name, email, message) "
+    "VALUES ('delete', old.id, old.name, old.email, old.message); END",
+    "CREATE TRIGGER IF NOT EXISTS contact_fts_au AFTER UPDATE ON contact BEGIN "
+    "INSERT INTO contact_fts(contact_fts, rowid, name, email, message) "
+    "VALUES ('delete', old.id, old.name, old.email, old.message); "
+    "INSERT INTO contact_fts(rowid, name, email, message) "
+    "VALUES (new.id, new.name, new.email, new.message); END",
+]
+
+CONTACT_FTS_DROP_DDL = [
+    "DROP TRIGGER IF EXISTS contact_fts_au",
+    "DROP TRIGGER IF EXISTS contact_fts_ad",
+    "DROP TRIGGER IF EXISTS contact_fts_ai",
+    "DROP TABLE IF EXISTS contact_fts",
+]
+
+for _statement in CONTACT_FTS_DDL:
+    event.listen(Contact.__table__, 'after_create', DDL(_statement).execute_if(dialect='sqlite'))
+for _statement in CONTACT_FTS_DROP_DDL:
+    event.listen(Contact.__table__, 'before_drop', DDL(_statement).execute_if(dialect='sqlite'))
+
+
+class TableVersion(db.Model):
+    """Change counter per table, bumped in the same transaction as each write
+
+    Lets list views answer conditional requests and reuse rendered responses
+    with one primary-key lookup instead of re-reading the table.
+    """
+    __tablename__ = 'table_version'
+
+    name = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+
+# Seed the row so concurrent first writes only ever UPDATE it
+event.listen(TableVersion.__table__, 'after_create', DDL(
+    "INSERT INTO table_version (name, version, updated_at) VALUES ('contact', 0, CURRENT_TIMESTAMP)"))
+
+
 class User(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(100), unique=True, nullable=False)
-    password = db.Column(db.String(100), nullable=False)
+    password = db.Column(db.String(255), nullable=False)
+
+    def __repr__(self):
+        return f'<User {self.username}>'
+
+
+class AnalysisJob(db.Model):
+    id = db.Column(db.String(32), primary_key=True)
+    status = db.Column(db.String(20), nullable=False, default='queued', index=True)
+    source_type = db.Column(db.String(10), nullable=False)
+    source = db.Column(db.Text, nullable=False)
+    content_type = db.Column(db.String(100))
+    result = db.Column(db.Text)
+    error = db.Column(db.Text)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
 
     def __repr__(self):
-        return f'<User {self.username}>'
\ No newline at end of file
+        return f'<AnalysisJob {self.id} - {self.status}>'
+
+    def to_dict(self):
+        """Convert model to dictionary for JSON serialization"""
+        return {
+            'id': self.id,
+            'status': self.status,
+            'source_type': self.source_type,
+            'result': json.loads(self.result) if self.result else None,
+            'error': self.error,
+            'attempts': self.attempts,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
+
+
+class PredictionRecord(db.Model):
+    __tablename__ = 'prediction_log'
+
+    id = db.Column(db.Integer, primary_key=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    input_hash = db.Column(db.String(64), nullable=False, index=True)
+    content_type = db.Column(db.String(100))
+    page = db.Column(db.Integer)
+    label = db.Column(db.String(50), nullable=False)
+    confidence = db.Column(db.Float, nullable=False)
+    probabilities = db.Column(db.Text)
+    model_name = db.Column(db.String(200))
+    model_revision = db.Column(db.String(64))
+    cached = db.Column(db.Boolean, nullable=False, default=False)
+    decode_ms = db.Column(db.Float)
+    inference_ms = db.Column(db.Float)
+    total_ms = db.Column(db.Float)
+
+    def __repr__(self):
+        return f'<PredictionRecord {self.id} - {self.label}>'
+
+    def to_dict(self):
+        """Convert model to dictionary for JSON serialization"""
+        return {
+            'id': self.id,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'input_hash': self.input_hash,
+            'content_type': self.content_type,
+            'page': self.page,
+            'label': self.label,
+            'confidence': self.confidence,
+            'probabilities': json.loads(self.probabilities) if self.probabilities else None,
+            'model_name': self.model_name,
+            'model_revision': self.model_revision,
+            'cached': self.cached,
+            'latency_ms': {'decode': self.decode_ms, 'inference': self.inference_ms, 'total': self.total_ms}
+        }
+
+
+# Rollups maintained incrementally by PredictionLog on every insert, so
+# statistics cost O(days x labels) instead of a scan of prediction_log
+class PredictionDailyStat(db.Model):
+    __tablename__ = 'prediction_daily_stat'
+
+    day = db.Column(db.Date, primary_key=True)
+    label = db.Column(db.String(50), primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+    cached_count = db.Column(db.Integer, nullable=False, default=0)
+    confidence_sum = db.Column(db.Float, nullable=False, default=0.0)
+    total_ms_sum = db.Column(db.Float, nullable=False, default=0.0)
+
+
+class PredictionConfidenceBin(db.Model):
+    __tablename__ = 'prediction_confidence_bin'
+
+    day = db.Column(db.Date, primary_key=True)
+    label = db.Column(db.String(50), primary_key=True)
+    bin = db.Column(db.Integer, primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
@@ -0,0 +1,219 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+
+def inference_identity(backend: str, fast_preprocess: bool, draft_decode: bool) -> str:
+    """Backend and preprocessing mode, e.g. ``int8/fast+draft`` or ``eager/hf``"""
+    preprocessing = ('fast' if fast_preprocess else 'hf') + ('+draft' if draft_decode else '')
+    return f'{backend}/{preprocessing}'
+
+
+class PredictionCache:
+    """Content-addressed cache of analysis results
+
+    Keys are a SHA-256 of the model identifier/revision plus the raw input
+    bytes, so a re-submitted image is answered without decoding it. Entries
+    live in a bounded in-memory LRU tier with a TTL and, optionally, in a
+    SQLite file that survives restarts.
+    """
+
+    # Persistent-tier trimming runs once every this many writes
+    TRIM_INTERVAL = 64
+
+    def __init__(self, app=None):
+        self.enabled = True
+        self.max_entries = 4096
+        self.ttl = 86400.0
+        self.persist_max_entries = 100000
+        self.model_id = ''
+        self.model_tag = ''
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        self._db_lock = threading.Lock()
+        self._persist_writes = 0
+        self._counters = {
+            'hits': 0,
+            'misses': 0,
+            'persistent_hits': 0,
+            'evictions': 0,
+            'expirations': 0,
+            'stores': 0,
+        }
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.configure(app.config)
+        app.extensions['prediction_cache'] = self
+
+    def configure(self, config: Dict):
+        """Apply settings from a config mapping (also used by worker processes)"""
+        self.enabled = config.get('PREDICTION_CACHE_ENABLED', True)
+        self.max_entries = int(config.get('PREDICTION_CACHE_MAX_ENTRIES', 4096))
+        self.ttl = float(config.get('PREDICTION_CACHE_TTL', 86400))
+        self.persist_max_entries = int(config.get('PREDICTION_CACHE_PERSIST_MAX_ENTRIES', 100000))
+        self.model_id = '%s@%s' % (config.get('MODEL_NAME', ''), config.get('MODEL_REVISION') or 'main')
+        # The configured pipeline until the model is loaded and reports the
+        # active one (a backend that fails parity falls back to eager)
+        fast = bool(config.get('PREPROCESS_FAST', True))
+        self.set_inference_identity(inference_identity(
+            config.get('INFERENCE_BACKEND', 'eager'), fast,
+            fast and bool(config.get('PREPROCESS_DRAFT_DECODE', True))))
+
+        path = config.get('PREDICTION_CACHE_PATH')
+        if self.enabled and path:
+            self._open_store(path)
+
+    def set_inference_identity(self, identity: str):
+        """Key entries by how predictions are computed, not only by the weights
+
+        int8 vs fp32 or draft vs full decoding give slightly different
+        probabilities, so their results must not be served for each other.
+        """
+        self.model_tag = f'{self.model_id}/{identity}'
+
+    def make_key(self, data: bytes, variant: str = '') -> str:
+        """Hash raw input bytes together with the model identifier/revision
+
+        ``variant`` distinguishes requests that analyze the same bytes
+        differently, e.g. different PDF page selections.
+        """
+        return self.key_for_hash(hashlib.sha256(data).hexdigest(), variant)
+
+    def key_for_hash(self, data_hash: str, variant: str = '') -> str:
+        """``make_key`` from the input's SHA-256 hex digest, so uploads are hashed once"""
+        digest = hashlib.sha256(self.model_tag.encode('utf-8'))
+        digest.update(b'\0' + variant.encode('utf-8') + b'\0')
+        digest.update(data_hash.encode('ascii'))
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Return a cached result, or None on a miss"""
+        if not self.enabled:
+            return None
+
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                stored_at, value = entry
+                if now - stored_at <= self.ttl:
+                    self._entries.move_to_end(key)
+                    self._counters['hits'] += 1
+                    return dict(value)
+                del self._entries[key]
+                self._counters['expirations'] += 1
+
+        entry = self._load_persistent(key, now)
+        with self._lock:
+            if entry is None:
+                self._counters['misses'] += 1
+                return None
+            self._counters['hits'] += 1
+            self._counters['persistent_hits'] += 1
+            self._remember(key, entry[0], entry[1])
+        return dict(entry[1])
+
+    def set(self, key: str, value: Dict):
+        """Store a result in both tiers"""
+        if not self.enabled:
+            return
+
+        now = time.time()
+        with self._lock:
+            self._remember(key, now, dict(value))
+            self._counters['stores'] += 1
+        self._store_persistent(key, now, value)
+
+    def clear(self):
+        """Drop every cached entry from both tiers"""
+        with self._lock:
+            self._entries.clear()
+        if self._db is not None:
+            with self._db_lock:
+                self._db.execute('DELETE FROM prediction_cache')
+                self._db.commit()
+
+    def stats(self) -> Dict:
+        """Return hit/miss/eviction counters and tier sizes"""
+        with self._lock:
+            stats = dict(self._counters)
+            stats['entries'] = len(self._entries)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = (stats['hits'] / lookups) if lookups else 0.0
+        stats['max_entries'] = self.max_entries
+        stats['ttl'] = self.ttl
+        stats['persistent'] = self._db is not None
+        return stats
+
+    def _remember(self, key: str, stored_at: float, value: Dict):
+        # Caller holds self._lock
+        self._entries[key] = (stored_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._counters['evictions'] += 1
+
+    def _open_store(self, path: str):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS prediction_cache ('
+            ' key TEXT PRIMARY KEY,'
+            ' value TEXT NOT NULL,'
+            ' stored_at REAL NOT NULL)'
+        )
+        self._db.execute(
+            'CREATE INDEX IF NOT EXISTS ix_prediction_cache_stored_at '
+            'ON prediction_cache (stored_at)'
+        )
+        self._db.commit()
+
+    def _load_persistent(self, key: str, now: float):
+        if self._db is None:
+            return None
+        with self._db_lock:
+            row = self._db.execute(
+                'SELECT value, stored_at FROM prediction_cache WHERE key = ?', (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if now - row[1] > self.ttl:
+                self._db.execute('DELETE FROM prediction_cache WHERE key = ?', (key,))
+                self._db.commit()
+                with self._lock:
+                    self._counters['expirations'] += 1
+                return None
+        return row[1], json.loads(row[0])
+
+    def _store_persistent(self, key: str, stored_at: float, value: Dict):
+        if self._db is None:
+            return
+        with self._db_lock:
+            self._db.execute(
+                'INSERT OR REPLACE INTO prediction_cache (key, value, stored_at) VALUES (?, ?, ?)',
+                (key, json.dumps(value), stored_at)
+            )
+            deleted = 0
+            self._persist_writes += 1
+            if self._persist_writes % self.TRIM_INTERVAL == 0:
+                # Trim expired rows and keep the file under its entry limit
+                self._db.execute(
+                    'DELETE FROM prediction_cache WHERE stored_at < ?', (stored_at - self.ttl,)
+                )
+                deleted = self._db.execute(
+                    'DELETE FROM prediction_cache WHERE key IN ('
+                    ' SELECT key FROM prediction_cache ORDER BY stored_at DESC LIMIT -1 OFFSET ?)',
+                    (self.persist_max_entries,)
+                ).rowcount
+            self._db.commit()
+        if deleted > 0:
+            with self._lock:
+                self._counters['evictions'] += deleted
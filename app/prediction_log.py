@@ -0,0 +1,188 @@
+import atexit
+import hashlib
+import json
+import logging
+import threading
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from app.batching import MicroBatcher
+
+logger = logging.getLogger(__name__)
+
+# Confidence histogram resolution: bin i covers [i / BINS, (i + 1) / BINS)
+HISTOGRAM_BINS = 20
+
+
+def confidence_bin(confidence: float) -> int:
+    return min(max(int(confidence * HISTOGRAM_BINS), 0), HISTOGRAM_BINS - 1)
+
+
+def input_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _increment(connection, table, keys: List[str], rows: List[Dict], counters: List[str]):
+    """Upsert rows, adding ``counters`` onto existing rows with the same keys"""
+    dialect = connection.dialect.name
+    if dialect in ('sqlite', 'postgresql'):
+        if dialect == 'sqlite':
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert
+        statement = insert(table)
+        statement = statement.on_conflict_do_update(
+            index_elements=keys,
+            set_={name: table.c[name] + statement.excluded[name] for name in counters})
+        connection.execute(statement, rows)
+        return
+    if dialect in ('mysql', 'mariadb'):
+        from sqlalchemy.dialects.mysql import insert
+        statement = insert(table)
+        statement = statement.on_duplicate_key_update(
+            {name: table.c[name] + statement.inserted[name] for name in counters})
+        connection.execute(statement, rows)
+        return
+
+    # Portable fallback: update, then insert whatever did not exist yet
+    for row in rows:
+        match = [table.c[key] == row[key] for key in keys]
+        updated = connection.execute(table.update().where(*match).values(
+            {name: table.c[name] + row[name] for name in counters})).rowcount
+        if not updated:
+            connection.execute(table.insert().values(row))
+
+
+class PredictionLog:
+    """Write-behind log of every analysis plus incrementally updated rollups
+
+    ``record`` never blocks the request: rows are queued on a MicroBatcher
+    and each batch is inserted into ``prediction_log`` together with its
+    per-day/per-label counts and confidence histogram increments in one
+    transaction, so the rollups always match the log.
+    """
+
+    def __init__(self, app=None):
+        self.enabled = True
+        self.max_batch = 64
+        self.max_wait_ms = 50.0
+        self.max_queue = 10000
+        self._engine = None
+        self._batcher: Optional[MicroBatcher] = None
+        self._batcher_lock = threading.Lock()
+        self._dropped = 0
+        self._failed = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        from app.extensions import db
+        self.configure(app.config)
+        with app.app_context():
+            self._engine = db.engine
+        app.extensions['prediction_log'] = self
+
+    def configure(self, config: Dict):
+        """Apply settings from a config mapping (also used by worker processes)"""
+        self.enabled = bool(config.get('PREDICTION_LOG_ENABLED', True))
+        self.max_batch = int(config.get('PREDICTION_LOG_MAX_BATCH', 64))
+        self.max_wait_ms = float(config.get('PREDICTION_LOG_MAX_WAIT_MS', 50))
+        self.max_queue = int(config.get('PREDICTION_LOG_MAX_QUEUE', 10000))
+        with self._batcher_lock:
+            batcher, self._batcher = self._batcher, None
+        if batcher is not None:
+            batcher.stop()
+
+    def connect(self, url: str):
+        """Use a private engine (worker processes have no Flask app)"""
+        from sqlalchemy import create_engine
+        self._engine = create_engine(url)
+
+    def record(self, result: Dict, data_hash: str, content_type: Optional[str] = None,
+               model_name: Optional[str] = None, model_revision: Optional[str] = None,
+               cached: bool = False, timings: Optional[Dict[str, float]] = None):
+        """Queue one row per prediction in an analysis result (one per PDF page)"""
+        if not self.enabled or self._engine is None:
+            return
+        timings = timings or {}
+        now = datetime.utcnow()
+        for prediction in result.get('pages', [result]):
+            if 'prediction' not in prediction:
+                continue
+            probabilities = prediction.get('probabilities')
+            row = {
+                'created_at': now,
+                'input_hash': data_hash,
+                'content_type': content_type,
+                'page': prediction.get('page'),
+                'label': prediction['prediction'],
+                'confidence': float(prediction['confidence']),
+                'probabilities': json.dumps(probabilities) if probabilities is not None else None,
+                'model_name': model_name,
+                'model_revision': model_revision,
+                'cached': cached,
+                'decode_ms': timings.get('decode_ms'),
+                'inference_ms': timings.get('inference_ms'),
+                'total_ms': timings.get('total_ms')
+            }
+            try:
+                self._get_batcher().submit(row)
+            except RuntimeError:
+                self._dropped += 1
+
+    def _get_batcher(self) -> MicroBatcher:
+        batcher = self._batcher
+        if batcher is not None:
+            return batcher
+        # Concurrent first requests must share one writer thread
+        with self._batcher_lock:
+            if self._batcher is None:
+                self._batcher = MicroBatcher(self._write_batch, max_batch_size=self.max_batch,
+                                             max_wait_ms=self.max_wait_ms,
+                                             max_queue_size=self.max_queue, name='prediction-log')
+                atexit.register(self.flush)
+            return self._batcher
+
+    def _write_batch(self, rows: List[Dict]) -> List[None]:
+        from app.models import PredictionRecord, PredictionDailyStat, PredictionConfidenceBin
+
+        daily = defaultdict(lambda: {'count': 0, 'cached_count': 0,
+                                     'confidence_sum': 0.0, 'total_ms_sum': 0.0})
+        bins = defaultdict(int)
+        for row in rows:
+            key = (row['created_at'].date(), row['label'])
+            stat = daily[key]
+            stat['count'] += 1
+            stat['cached_count'] += int(row['cached'])
+            stat['confidence_sum'] += row['confidence']
+            stat['total_ms_sum'] += row['total_ms'] or 0.0
+            bins[key + (confidence_bin(row['confidence']),)] += 1
+
+        try:
+            with self._engine.begin() as connection:
+                connection.execute(PredictionRecord.__table__.insert(), rows)
+                _increment(connection, PredictionDailyStat.__table__, ['day', 'label'],
+                           [dict(day=day, label=label, **stat) for (day, label), stat in daily.items()],
+                           ['count', 'cached_count', 'confidence_sum', 'total_ms_sum'])
+                _increment(connection, PredictionConfidenceBin.__table__, ['day', 'label', 'bin'],
+                           [{'day': day, 'label': label, 'bin': index, 'count': count}
+                            for (day, label, index), count in bins.items()],
+                           ['count'])
+        except Exception:
+            self._failed += len(rows)
+            logger.exception('Could not write %d prediction log rows', len(rows))
+        return [None] * len(rows)
+
+    def flush(self, timeout: float = 5.0):
+        """Write everything queued and stop the writer thread"""
+        with self._batcher_lock:
+            batcher, self._batcher = self._batcher, None
+        if batcher is not None:
+            batcher.stop(timeout)
+
+    def stats(self) -> Dict:
+        stats = {'enabled': self.enabled, 'dropped': self._dropped, 'failed': self._failed}
+        if self._batcher is not None:
+            stats.update(self._batcher.stats())
+        return stats
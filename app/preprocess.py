@@ -0,0 +1,180 @@
+from typing import Dict, List, Optional, Tuple
+
+
+def _size_dict(size) -> Dict:
+    """Normalize a processor size (dict or SizeDict) to its set keys"""
+    return {key: value for key, value in dict(size or {}).items() if value is not None}
+
+
+class FastImagePreprocessor:
+    """Vectorized equivalent of a Hugging Face image processor
+
+    Supports the resize / center-crop / rescale / normalize pipeline used by
+    ViT- and ConvNeXt-style processors. Resizing uses PIL with the processor's
+    own resample filter; rescale and mean/std normalization are folded into
+    one NumPy multiply-add over the whole batch. Construction raises
+    ``ValueError`` for processor settings it does not reproduce, so callers
+    can fall back to the HF processor.
+    """
+
+    def __init__(self, processor):
+        import numpy as np
+
+        self.do_resize = getattr(processor, 'do_resize', True)
+        self.do_rescale = getattr(processor, 'do_rescale', True)
+        self.do_normalize = getattr(processor, 'do_normalize', True)
+        self.do_center_crop = getattr(processor, 'do_center_crop', False)
+        self.resample = int(getattr(processor, 'resample', 2))
+        size = _size_dict(getattr(processor, 'size', None))
+        crop_pct = getattr(processor, 'crop_pct', None)
+
+        if 'height' in size and 'width' in size:
+            self.resize_to = (int(size['width']), int(size['height']))
+            self.shortest_edge = None
+        elif 'shortest_edge' in size:
+            self.resize_to = None
+            self.shortest_edge = int(size['shortest_edge'])
+            if crop_pct is not None and self.shortest_edge < 384:
+                # ConvNeXt: resize to shortest_edge / crop_pct, then crop back
+                self.crop_to = (self.shortest_edge, self.shortest_edge)
+                self.shortest_edge = int(self.shortest_edge / crop_pct)
+                self.do_center_crop = True
+        else:
+            raise ValueError(f'Unsupported processor size: {size}')
+
+        if self.do_center_crop and not hasattr(self, 'crop_to'):
+            crop = _size_dict(getattr(processor, 'crop_size', None))
+            if 'height' not in crop or 'width' not in crop:
+                raise ValueError(f'Unsupported processor crop size: {crop}')
+            self.crop_to = (int(crop['width']), int(crop['height']))
+
+        scale = float(getattr(processor, 'rescale_factor', 1 / 255)) if self.do_rescale else 1.0
+        if self.do_normalize:
+            mean = np.asarray(processor.image_mean, dtype=np.float32)
+            std = np.asarray(processor.image_std, dtype=np.float32)
+        else:
+            mean = np.zeros(3, dtype=np.float32)
+            std = np.ones(3, dtype=np.float32)
+        # (x * scale - mean) / std == x * (scale / std) - mean / std
+        self._multiplier = (scale / std).astype(np.float32)
+        self._offset = (-mean / std).astype(np.float32)
+
+    @property
+    def decode_size(self) -> Tuple[int, int]:
+        """Smallest (width, height) a decoder may reduce an image to"""
+        if self.resize_to is not None:
+            return self.resize_to
+        return (self.shortest_edge, self.shortest_edge)
+
+    def _resize(self, image):
+        if not self.do_resize:
+            return image
+        if self.resize_to is not None:
+            target = self.resize_to
+        else:
+            width, height = image.size
+            short, long = (width, height) if width <= height else (height, width)
+            new_short, new_long = self.shortest_edge, int(self.shortest_edge * long / short)
+            target = (new_short, new_long) if width <= height else (new_long, new_short)
+        if image.size == target:
+            return image
+        return image.resize(target, resample=self.resample)
+
+    def _center_crop(self, image):
+        if not self.do_center_crop:
+            return image
+        width, height = image.size
+        crop_width, crop_height = self.crop_to
+        left = (width - crop_width) // 2
+        top = (height - crop_height) // 2
+        return image.crop((left, top, left + crop_width, top + crop_height))
+
+    def pixel_array(self, images: List):
+        """Return float32 (N, H, W, 3) pixel values as a NumPy array"""
+        import numpy as np
+
+        arrays = []
+        for image in images:
+            if image.mode != 'RGB':
+                image = image.convert('RGB')
+            arrays.append(np.asarray(self._center_crop(self._resize(image))))
+        batch = np.stack(arrays).astype(np.float32)
+        batch *= self._multiplier
+        batch += self._offset
+        return batch
+
+    def __call__(self, images: List):
+        """Return a float32 (N, 3, H, W) pixel_values tensor"""
+        import torch
+        return torch.from_numpy(self.pixel_array(images)).permute(0, 3, 1, 2).contiguous()
+
+
+def reference_pixels(processor, images: List):
+    """HF processor output as an (N, 3, H, W) NumPy array"""
+    import numpy as np
+    try:
+        import torch  # noqa: F401
+        tensors = 'pt'
+    except ImportError:
+        tensors = 'np'
+    return np.asarray(processor(images=images, return_tensors=tensors)['pixel_values'])
+
+
+def _compare(expected, actual) -> Dict:
+    import numpy as np
+    if tuple(expected.shape) != tuple(actual.shape):
+        return {'error': f'shape {tuple(actual.shape)} != {tuple(expected.shape)}'}
+    diff = np.abs(expected - actual)
+    return {'max_abs_diff': float(diff.max()), 'mean_abs_diff': float(diff.mean())}
+
+
+def check_preprocessor_parity(processor, fast: FastImagePreprocessor, images: List,
+                              atol: float) -> Dict:
+    """Compare the fast path against the HF processor on the same images"""
+    report = _compare(reference_pixels(processor, images),
+                      fast.pixel_array(images).transpose(0, 3, 1, 2))
+    if 'error' in report:
+        return dict(report, passed=False)
+    return dict(report, passed=report['max_abs_diff'] <= atol, atol=atol)
+
+
+def draft_reference(images: List, decode_size: Tuple[int, int], scale: int = 4,
+                    quality: int = 90) -> List[bytes]:
+    """JPEGs ``scale`` times larger than the decode size, so draft mode reduces them"""
+    import io
+    width, height = decode_size
+    encoded = []
+    for image in images:
+        buffer = io.BytesIO()
+        image.convert('RGB').resize((width * scale, height * scale)).save(buffer, 'JPEG', quality=quality)
+        encoded.append(buffer.getvalue())
+    return encoded
+
+
+def check_draft_parity(processor, fast: FastImagePreprocessor, jpegs: List[bytes],
+                       atol: float) -> Dict:
+    """Draft decode + fast path vs full-resolution decode + HF processor
+
+    Decoding at a reduced DCT scale changes individual pixels by up to a few
+    percent of the value range, so the check bounds the mean absolute
+    difference (in normalized pixel units) rather than the maximum.
+    """
+    from app.imaging import load_image
+    full = [load_image(data) for data in jpegs]
+    draft = [load_image(data, draft_size=fast.decode_size) for data in jpegs]
+    report = _compare(reference_pixels(processor, full),
+                      fast.pixel_array(draft).transpose(0, 3, 1, 2))
+    if 'error' in report:
+        return dict(report, passed=False)
+    report['draft_sizes'] = sorted({image.size for image in draft})
+    return dict(report, passed=report['mean_abs_diff'] <= atol, atol=atol)
+
+
+def build_fast_preprocessor(processor, reference: List, atol: float) -> Tuple[Optional[FastImagePreprocessor], Dict]:
+    """Build the fast path and keep it only if it matches the HF processor"""
+    try:
+        fast = FastImagePreprocessor(processor)
+        report = check_preprocessor_parity(processor, fast, reference, atol)
+    except Exception as e:
+        return None, {'passed': False, 'error': str(e)}
+    return (fast if report['passed'] else None), report
@@ -1,7 +1,24 @@
-from typing import List, Optional, Dict
-from datetime import datetime
+from typing import Iterator, List, Optional, Dict, Tuple
+import json
+import re
+from datetime import date, datetime, timedelta
+from sqlalchemy import and_, or_, text, insert, update, delete, select, func
 from app.extensions import db
-from app.models import Contact
+from app.database import read_bind
+from app.models import Contact, TableVersion, AnalysisJob, PredictionDailyStat, PredictionConfidenceBin
+
+# Match highlight markers; control characters cannot occur in escaped HTML,
+# so the service layer can escape the snippet and then swap in <mark> tags
+SNIPPET_START = '\x02'
+SNIPPET_END = '\x03'
+SNIPPET_CONTEXT = 60
+
+# Rows per IN list / executemany call inside one bulk transaction
+BULK_CHUNK_SIZE = 500
+
+def _chunks(items: List, size: int = BULK_CHUNK_SIZE):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
 
 class ContactRepository:
     """Repository pattern implementation for Contact model"""
@@ -9,15 +26,182 @@ class ContactRepository:
     @staticmethod
     def get_all() -> List[Dict]:
         """Get all contacts as serialized dictionaries"""
-        contacts = Contact.query.all()
+        contacts = db.session.scalars(select(Contact), bind_arguments=read_bind()).all()
         return [contact.to_dict() for contact in contacts]
     
     @staticmethod
     def get_by_id(contact_id: int) -> Optional[Dict]:
         """Get single contact by ID as serialized dictionary"""
-        contact = Contact.query.get(contact_id)
+        contact = db.session.get(Contact, contact_id, bind_arguments=read_bind())
         return contact.to_dict() if contact else None
     
+    @staticmethod
+    def get_version() -> Tuple[int, Optional[datetime]]:
+        """Current (version, last modified) of the contact table"""
+        row = db.session.execute(
+            select(TableVersion.version, TableVersion.updated_at).where(TableVersion.name == 'contact'),
+            bind_arguments=read_bind()).first()
+        return (row.version, row.updated_at) if row else (0, None)
+    
+    @staticmethod
+    def bump_version():
+        """Record a contact change; call inside the writing transaction, before commit"""
+        now = datetime.utcnow()
+        result = db.session.execute(
+            update(TableVersion).where(TableVersion.name == 'contact')
+            .values(version=TableVersion.version + 1, updated_at=now),
+            execution_options={'synchronize_session': False})
+        if result.rowcount == 0:
+            db.session.execute(insert(TableVersion).values(name='contact', version=1, updated_at=now))
+    
+    @staticmethod
+    def filter_query(query, filters: Optional[Dict] = None):
+        """Apply email / name-prefix / created_at range filters to a query"""
+        filters = filters or {}
+        if filters.get('email'):
+            query = query.filter(Contact.email == filters['email'])
+        if filters.get('name'):
+            # A range instead of LIKE so the name index serves the prefix
+            prefix = filters['name']
+            query = query.filter(Contact.name >= prefix, Contact.name < prefix + '\uffff')
+        if filters.get('created_from'):
+            query = query.filter(Contact.created_at >= filters['created_from'])
+        if filters.get('created_to'):
+            query = query.filter(Contact.created_at < filters['created_to'])
+        return query
+    
+    @staticmethod
+    def page_query(limit: int, after: Optional[Tuple[datetime, int]] = None,
+                   filters: Optional[Dict] = None):
+        """Newest-first keyset query on (created_at, id), fetching one extra row"""
+        query = ContactRepository.filter_query(select(Contact), filters)
+        if after is not None:
+            created_at, contact_id = after
+            query = query.filter(or_(
+                Contact.created_at < created_at,
+                and_(Contact.created_at == created_at, Contact.id < contact_id)
+            ))
+        return query.order_by(Contact.created_at.desc(), Contact.id.desc()).limit(limit + 1)
+    
+    @staticmethod
+    def get_page(limit: int, after: Optional[Tuple[datetime, int]] = None,
+                 filters: Optional[Dict] = None) -> Tuple[List[Dict], Optional[Tuple[datetime, int]]]:
+        """Get one page of contacts and the keyset position of the next page"""
+        contacts = db.session.scalars(ContactRepository.page_query(limit, after, filters),
+                                      bind_arguments=read_bind()).all()
+        next_position = None
+        if len(contacts) > limit:
+            contacts = contacts[:limit]
+            next_position = (contacts[-1].created_at, contacts[-1].id)
+        return [contact.to_dict() for contact in contacts], next_position
+    
+    @staticmethod
+    def iter_batches(filters: Optional[Dict] = None, batch_size: int = 1000) -> Iterator[List[Dict]]:
+        """Yield every matching contact, newest first, one keyset page at a time"""
+        after = None
+        while True:
+            contacts, after = ContactRepository.get_page(batch_size, after, filters)
+            if contacts:
+                yield contacts
+            if after is None:
+                return
+    
+    @staticmethod
+    def fts_available() -> bool:
+        """True when the SQLite FTS5 contact index exists"""
+        bind = read_bind()
+        engine = bind['bind'] if bind else db.engine
+        if engine.dialect.name != 'sqlite':
+            return False
+        return db.session.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'contact_fts'"),
+            bind_arguments=bind
+        ).first() is not None
+    
+    @staticmethod
+    def search(terms: List[str], limit: int, offset: int = 0) -> Tuple[List[Dict], int]:
+        """Ranked search for contacts containing every term (as a prefix)
+        
+        Returns ``(contacts, total)``; each contact carries ``score`` (higher
+        is better, None on the fallback path) and a marked-up ``snippet``.
+        """
+        if ContactRepository.fts_available():
+            return ContactRepository._search_fts(terms, limit, offset)
+        return ContactRepository._search_like(terms, limit, offset)
+    
+    @staticmethod
+    def _search_fts(terms: List[str], limit: int, offset: int) -> Tuple[List[Dict], int]:
+        # Quote every term so user input is never parsed as FTS5 syntax
+        match = ' '.join('"%s"*' % term.replace('"', '""') for term in terms)
+        # bm25 weights: a hit in the name counts most, then email, then message
+        rows = db.session.execute(text(
+            "SELECT rowid, bm25(contact_fts, 10.0, 5.0, 1.0) AS rank, "
+            "snippet(contact_fts, -1, :start, :end, '…', 16) AS snippet "
+            "FROM contact_fts WHERE contact_fts MATCH :match "
+            "ORDER BY rank LIMIT :limit OFFSET :offset"
+        ), {'match': match, 'start': SNIPPET_START, 'end': SNIPPET_END,
+            'limit': limit, 'offset': offset}, bind_arguments=read_bind()).all()
+        total = db.session.execute(
+            text("SELECT count(*) FROM contact_fts WHERE contact_fts MATCH :match"),
+            {'match': match}, bind_arguments=read_bind()
+        ).scalar()
+        
+        contacts = {contact.id: contact for contact in db.session.scalars(
+            select(Contact).where(Contact.id.in_([row.rowid for row in rows])),
+            bind_arguments=read_bind())}
+        results = []
+        for row in rows:
+            contact = contacts.get(row.rowid)
+            if contact is None:
+                continue
+            result = contact.to_dict()
+            result['score'] = -row.rank
+            result['snippet'] = row.snippet
+            results.append(result)
+        return results, total
+    
+    @staticmethod
+    def _search_like(terms: List[str], limit: int, offset: int) -> Tuple[List[Dict], int]:
+        # Portable path: every term must appear in some column, newest first
+        query = select(Contact)
+        for term in terms:
+            pattern = '%' + term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+            query = query.filter(or_(
+                Contact.name.ilike(pattern, escape='\\'),
+                Contact.email.ilike(pattern, escape='\\'),
+                Contact.message.ilike(pattern, escape='\\')
+            ))
+        total = db.session.scalar(select(func.count()).select_from(query.subquery()),
+                                  bind_arguments=read_bind())
+        contacts = db.session.scalars(
+            query.order_by(Contact.created_at.desc(), Contact.id.desc()).limit(limit).offset(offset),
+            bind_arguments=read_bind()).all()
+        results = []
+        for contact in contacts:
+            result = contact.to_dict()
+            result['score'] = None
+            result['snippet'] = ContactRepository._like_snippet(contact, terms)
+            results.append(result)
+        return results, total
+    
+    @staticmethod
+    def _like_snippet(contact: Contact, terms: List[str]) -> str:
+        """Excerpt around the first match, with every term occurrence marked"""
+        lowered_terms = [term.lower() for term in terms]
+        for value in (contact.message, contact.name, contact.email):
+            lowered = value.lower()
+            hits = [lowered.find(term) for term in lowered_terms if term in lowered]
+            if hits:
+                break
+        else:
+            return ''
+        start = max(0, min(hits) - SNIPPET_CONTEXT)
+        end = min(len(value), min(hits) + SNIPPET_CONTEXT)
+        pattern = '|'.join(re.escape(term) for term in sorted(set(lowered_terms), key=len, reverse=True))
+        excerpt = re.sub(f'({pattern})', SNIPPET_START + r'\1' + SNIPPET_END,
+                         value[start:end], flags=re.IGNORECASE)
+        return ('…' if start > 0 else '') + excerpt + ('…' if end < len(value) else '')
+    
     @staticmethod
     def create(contact_data: Dict) -> Dict:
         """Create new contact and return serialized dictionary"""
@@ -27,6 +211,7 @@ class ContactRepository:
             message=contact_data['message'].strip()
         )
         db.session.add(contact)
+        ContactRepository.bump_version()
         db.session.commit()
         return contact.to_dict()
     
@@ -40,6 +225,7 @@ class ContactRepository:
         contact.name = contact_data['name'].strip()
         contact.email = contact_data['email'].strip()
         contact.message = contact_data['message'].strip()
+        ContactRepository.bump_version()
         db.session.commit()
         return contact.to_dict()
     
@@ -51,5 +237,187 @@ class ContactRepository:
             return {'success': False, 'message': 'Contact not found'}
             
         db.session.delete(contact)
+        ContactRepository.bump_version()
         db.session.commit()
-        return {'success': True, 'message': 'Contact deleted'}
\ No newline at end of file
+        return {'success': True, 'message': 'Contact deleted'}
+    
+    @staticmethod
+    def existing_ids(ids: List[int]) -> set:
+        """Subset of the given IDs that exist"""
+        found = set()
+        for chunk in _chunks(list(ids)):
+            found.update(db.session.scalars(select(Contact.id).where(Contact.id.in_(chunk))))
+        return found
+    
+    @staticmethod
+    def bulk_create(rows: List[Dict]) -> List[int]:
+        """Insert validated contacts with executemany and one commit; returns new IDs"""
+        ids = []
+        try:
+            for chunk in _chunks(rows):
+                values = [{
+                    'name': row['name'].strip(),
+                    'email': row['email'].strip(),
+                    'message': row['message'].strip(),
+                    'created_at': row.get('created_at') or datetime.utcnow()
+                } for row in chunk]
+                ids.extend(db.session.scalars(
+                    insert(Contact).returning(Contact.id, sort_by_parameter_order=True), values))
+            if ids:
+                ContactRepository.bump_version()
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        return ids
+    
+    @staticmethod
+    def bulk_update(rows: List[Dict]) -> List[int]:
+        """Update validated contacts by ID with one commit; returns IDs not found"""
+        existing = ContactRepository.existing_ids([row['id'] for row in rows])
+        values = [{
+            'id': row['id'],
+            'name': row['name'].strip(),
+            'email': row['email'].strip(),
+            'message': row['message'].strip()
+        } for row in rows if row['id'] in existing]
+        try:
+            for chunk in _chunks(values):
+                # ORM bulk UPDATE by primary key runs as a single executemany
+                db.session.execute(update(Contact), chunk)
+            if values:
+                ContactRepository.bump_version()
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        return [row['id'] for row in rows if row['id'] not in existing]
+    
+    @staticmethod
+    def bulk_delete(ids: List[int]) -> Tuple[int, List[int]]:
+        """Delete contacts with set-based DELETE ... WHERE id IN; returns (deleted, missing IDs)"""
+        ids = list(dict.fromkeys(ids))
+        existing = ContactRepository.existing_ids(ids)
+        try:
+            for chunk in _chunks(ids):
+                db.session.execute(delete(Contact).where(Contact.id.in_(chunk)),
+                                   execution_options={'synchronize_session': False})
+            if existing:
+                ContactRepository.bump_version()
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        return len(existing), [contact_id for contact_id in ids if contact_id not in existing]
+    
+    @staticmethod
+    def delete_matching(filters: Dict) -> int:
+        """Delete every contact matching the list filters in one statement"""
+        try:
+            deleted = ContactRepository.filter_query(Contact.query, filters).delete(synchronize_session=False)
+            if deleted:
+                ContactRepository.bump_version()
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        return deleted
+
+
+class AnalysisJobRepository:
+    """Repository pattern implementation for AnalysisJob model"""
+    
+    @staticmethod
+    def create(job_id: str, source_type: str, source: str, content_type: Optional[str] = None) -> Dict:
+        """Create a queued job and return serialized dictionary"""
+        job = AnalysisJob(
+            id=job_id,
+            status='queued',
+            source_type=source_type,
+            source=source,
+            content_type=content_type
+        )
+        db.session.add(job)
+        db.session.commit()
+        return job.to_dict()
+    
+    @staticmethod
+    def get_by_id(job_id: str) -> Optional[Dict]:
+        """Get single job by ID as serialized dictionary"""
+        job = AnalysisJob.query.get(job_id)
+        return job.to_dict() if job else None
+    
+    @staticmethod
+    def claim(job_id: str) -> Optional[AnalysisJob]:
+        """Atomically move a queued job to running; None if another worker has it"""
+        claimed = AnalysisJob.query.filter_by(id=job_id, status='queued').update({
+            'status': 'running',
+            'started_at': datetime.utcnow(),
+            'attempts': AnalysisJob.attempts + 1
+        }, synchronize_session=False)
+        db.session.commit()
+        return AnalysisJob.query.get(job_id) if claimed else None
+    
+    @staticmethod
+    def finish(job_id: str, result: Dict):
+        """Store a job's outcome; results carrying 'error' mark it failed"""
+        job = AnalysisJob.query.get(job_id)
+        if not job:
+            return
+        if 'error' in result:
+            job.status = 'failed'
+            job.error = result['error']
+        else:
+            job.status = 'succeeded'
+            job.result = json.dumps(result)
+        job.finished_at = datetime.utcnow()
+        db.session.commit()
+    
+    @staticmethod
+    def requeue_unfinished(stale_after: float) -> List[str]:
+        """Re-queue jobs left running by a dead worker and return all queued IDs"""
+        cutoff = datetime.utcnow() - timedelta(seconds=stale_after)
+        AnalysisJob.query.filter(
+            AnalysisJob.status == 'running',
+            AnalysisJob.started_at < cutoff
+        ).update({'status': 'queued'}, synchronize_session=False)
+        db.session.commit()
+        jobs = AnalysisJob.query.filter_by(status='queued').order_by(AnalysisJob.created_at).all()
+        return [job.id for job in jobs]
+
+
+class PredictionStatsRepository:
+    """Read access to the prediction rollup tables"""
+    
+    @staticmethod
+    def get_daily(start: date, end: date) -> List[Dict]:
+        """Per-day, per-label rollup rows for start <= day <= end"""
+        rows = db.session.scalars(
+            select(PredictionDailyStat)
+            .where(PredictionDailyStat.day >= start, PredictionDailyStat.day <= end)
+            .order_by(PredictionDailyStat.day, PredictionDailyStat.label),
+            bind_arguments=read_bind()
+        )
+        return [{
+            'day': row.day.isoformat(),
+            'label': row.label,
+            'count': row.count,
+            'cached_count': row.cached_count,
+            'confidence_sum': row.confidence_sum,
+            'total_ms_sum': row.total_ms_sum
+        } for row in rows]
+    
+    @staticmethod
+    def get_histograms(start: date, end: date) -> Dict[str, Dict[int, int]]:
+        """Confidence bin counts per label, summed over the day range"""
+        rows = db.session.execute(
+            select(PredictionConfidenceBin.label, PredictionConfidenceBin.bin,
+                   func.sum(PredictionConfidenceBin.count))
+            .where(PredictionConfidenceBin.day >= start, PredictionConfidenceBin.day <= end)
+            .group_by(PredictionConfidenceBin.label, PredictionConfidenceBin.bin),
+            bind_arguments=read_bind()
+        )
+        histograms: Dict[str, Dict[int, int]] = {}
+        for label, index, count in rows:
+            histograms.setdefault(label, {})[index] = int(count)
+        return histograms
@@ -0,0 +1,130 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Callable, Dict, Optional, Tuple
+
+
+def source_digest() -> str:
+    """Short digest of the app package's Python sources, as a build id"""
+    digest = hashlib.sha1()
+    root = os.path.dirname(os.path.abspath(__file__))
+    for directory, dirnames, filenames in sorted(os.walk(root)):
+        for name in sorted(filenames):
+            if name.endswith('.py'):
+                path = os.path.join(directory, name)
+                digest.update(os.path.relpath(path, root).encode())
+                with open(path, 'rb') as f:
+                    digest.update(f.read())
+    return digest.hexdigest()[:12]
+
+
+class ResponseCache:
+    """Rendered contact-listing responses keyed by table version and query
+
+    Each key includes the ``contact`` table version. A write makes every
+    older entry unreachable, and older entries are dropped as soon as a
+    response for a newer version is stored. Only successful responses are
+    kept, bounded by ``CONTACTS_RESPONSE_CACHE_MAX_ENTRIES`` and
+    ``CONTACTS_RESPONSE_CACHE_MAX_BYTES``. ETags also include ``build_id``
+    (``APP_BUILD_ID``), so they do not survive a deploy.
+    """
+
+    def __init__(self, app=None):
+        self.enabled = True
+        self.build_id = ''
+        self.max_entries = 256
+        self.max_bytes = 32 * 1024 * 1024
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'not_modified': 0}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.enabled = bool(app.config.get('CONTACTS_RESPONSE_CACHE_ENABLED', True))
+        self.max_entries = int(app.config.get('CONTACTS_RESPONSE_CACHE_MAX_ENTRIES', 256))
+        self.max_bytes = int(app.config.get('CONTACTS_RESPONSE_CACHE_MAX_BYTES', 32 * 1024 * 1024))
+        self.build_id = app.config.get('APP_BUILD_ID') or source_digest()
+        self.clear()
+        app.extensions['response_cache'] = self
+
+    def get(self, key: Tuple) -> Optional[Tuple[bytes, str]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats['hits'] += 1
+            return entry
+
+    def put(self, key: Tuple, body: bytes, mimetype: str):
+        if not self.enabled or len(body) > self.max_bytes // 4:
+            return
+        version = key[1]
+        with self._lock:
+            for stale in [k for k in self._entries if k[1] < version]:
+                self._bytes -= len(self._entries.pop(stale)[0])
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= len(previous[0])
+            self._entries[key] = (body, mimetype)
+            self._bytes += len(body)
+            while self._entries and (len(self._entries) > self.max_entries
+                                     or self._bytes > self.max_bytes):
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted[0])
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def count_not_modified(self):
+        with self._lock:
+            self._stats['not_modified'] += 1
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return dict(self._stats, entries=len(self._entries), bytes=self._bytes)
+
+
+def cached_response(version: Tuple[int, Optional[datetime]], build: Callable):
+    """Serve a versioned listing with an ETag, a 304, or a cached rendering
+
+    ``version`` is read before ``build`` runs. A write that lands in between
+    makes the cached body newer than its key, never older, so a stale
+    rendering is never served under a current version.
+    """
+    from flask import make_response, request
+    from app.extensions import response_cache
+
+    number, modified = version
+    key = (request.endpoint, number, tuple(sorted(request.args.items(multi=True))))
+    etag = hashlib.sha1(repr((response_cache.build_id,) + key).encode()).hexdigest()[:20]
+
+    # Only If-None-Match is honoured: Last-Modified has one-second resolution
+    # and cannot tell apart two writes within the same second
+    if request.if_none_match.contains(etag):
+        response_cache.count_not_modified()
+        response = make_response('', 304)
+    else:
+        entry = response_cache.get(key) if response_cache.enabled else None
+        if entry is not None:
+            response = make_response(entry[0])
+            response.mimetype = entry[1]
+        else:
+            response = make_response(build())
+            if response.status_code != 200:
+                return response
+            response_cache.put(key, response.get_data(), response.mimetype)
+
+    response.set_etag(etag)
+    if modified is not None:
+        response.last_modified = modified
+    # Authenticated data: browsers may keep it but must revalidate every time
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
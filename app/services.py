@@ -1,8 +1,32 @@
-from typing import Dict, Optional, List
-from datetime import datetime
+from typing import Callable, Dict, Iterable, Iterator, Optional, List, Tuple
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from datetime import date, datetime, timedelta
+import os
 import re
-from app.repository import ContactRepository
+import io
+import csv
+import html
+import json
+import zlib
+import base64
+import threading
+import time
+from uuid import uuid4
+from app.repository import (ContactRepository, AnalysisJobRepository, PredictionStatsRepository,
+                            SNIPPET_START, SNIPPET_END)
 from app.models import Contact
+from app.batching import MicroBatcher
+from app.inference_pool import InferencePool
+from app.backends import select_backend, reference_images
+from app.preprocess import build_fast_preprocessor, check_draft_parity, draft_reference
+from app.threads import plan_threads, apply_thread_plan, warmup_batch_sizes
+from app.extensions import (prediction_cache, artifact_store, contact_writer, prediction_log, metrics,
+                            model_registry)
+from app.prediction_log import input_hash, HISTOGRAM_BINS
+from app.prediction_cache import inference_identity
+from app.contact_writer import ContactQueueFullError
+from app.imaging import load_image, extract_pdf_images
+from app.jobs import analysis_jobs
 
 def validate_email(email: str) -> bool:
     """Validate email format"""
@@ -29,6 +53,107 @@ def validate_contact_data(data: Dict) -> Dict[str, str]:
     
     return errors
 
+def parse_contact_filters(args: Dict) -> Tuple[Dict, Dict[str, str]]:
+    """Parse list/export filter parameters into repository filters"""
+    filters = {}
+    errors = {}
+    if args.get('email'):
+        filters['email'] = args['email'].strip()
+    if args.get('name'):
+        filters['name'] = args['name'].strip()
+    for field in ('created_from', 'created_to'):
+        if args.get(field):
+            try:
+                filters[field] = datetime.fromisoformat(args[field])
+            except ValueError:
+                errors[field] = 'Must be an ISO 8601 date or datetime'
+    return filters, errors
+
+def encode_cursor(position: Tuple[datetime, int]) -> str:
+    """Opaque token for a (created_at, id) keyset position"""
+    created_at, contact_id = position
+    payload = json.dumps([created_at.isoformat() if created_at else None, contact_id])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+def decode_cursor(token: str) -> Tuple[datetime, int]:
+    """Inverse of encode_cursor; raises ValueError for malformed tokens"""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        created_at, contact_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(created_at), int(contact_id)
+    except Exception:
+        raise ValueError('Invalid cursor')
+
+CONTACT_FIELDS = ('name', 'email', 'message')
+
+def _validate_bulk_row(row, require_id: bool = False) -> Tuple[Optional[Dict], Dict[str, str]]:
+    """Normalize one bulk row and validate it with validate_contact_data"""
+    if not isinstance(row, dict):
+        return None, {'row': 'Must be an object with name, email and message'}
+    data = {field: None if row.get(field) is None else str(row[field]) for field in CONTACT_FIELDS}
+    errors = validate_contact_data(data)
+    if require_id:
+        try:
+            data['id'] = int(row.get('id'))
+        except (TypeError, ValueError):
+            errors['id'] = 'Contact id must be an integer'
+    elif row.get('created_at'):
+        try:
+            data['created_at'] = datetime.fromisoformat(str(row['created_at']))
+        except ValueError:
+            errors['created_at'] = 'Must be an ISO 8601 date or datetime'
+    return data, errors
+
+def parse_contacts_csv(content: str) -> List[Dict]:
+    """Parse CSV text with a name,email,message[,created_at] header row"""
+    reader = csv.DictReader(io.StringIO(content))
+    if reader.fieldnames is None:
+        raise ValueError('CSV file is empty')
+    reader.fieldnames = [name.strip().lower() for name in reader.fieldnames]
+    missing = [field for field in CONTACT_FIELDS if field not in reader.fieldnames]
+    if missing:
+        raise ValueError(f"CSV header is missing: {', '.join(missing)}")
+    return list(reader)
+
+EXPORT_FORMATS = ('csv', 'ndjson')
+EXPORT_FIELDS = ('id', 'name', 'email', 'message', 'created_at')
+
+def export_contacts(fmt: str, filters: Optional[Dict] = None, batch_size: int = 1000) -> Iterator[str]:
+    """Render matching contacts as CSV or NDJSON, one chunk per database batch"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if fmt == 'csv':
+        writer.writerow(EXPORT_FIELDS)
+    for batch in ContactRepository.iter_batches(filters, batch_size):
+        for contact in batch:
+            if fmt == 'csv':
+                writer.writerow([contact[field] for field in EXPORT_FIELDS])
+            else:
+                buffer.write(json.dumps({field: contact[field] for field in EXPORT_FIELDS}) + '\n')
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+def gzip_stream(chunks: Iterable[str]) -> Iterator[bytes]:
+    """Gzip-compress a stream of text chunks incrementally"""
+    # wbits=31 selects the gzip container (zlib's default is raw zlib)
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode('utf-8'))
+        if data:
+            yield data
+    yield compressor.flush()
+
+def parse_search_terms(query: str) -> List[str]:
+    """Split a free-text query into word terms (punctuation is ignored)"""
+    return re.findall(r'\w+', query or '')
+
+def render_snippet(snippet: str) -> str:
+    """HTML-escape a search snippet and turn its match markers into <mark> tags"""
+    return html.escape(snippet or '').replace(SNIPPET_START, '<mark>').replace(SNIPPET_END, '</mark>')
+
 class ContactService:
     """Service layer for contact operations"""
     
@@ -37,6 +162,128 @@ class ContactService:
         """Get all contacts as serialized dictionaries"""
         return ContactRepository.get_all()
     
+    @staticmethod
+    def get_contacts_version() -> Tuple[int, Optional[datetime]]:
+        """Change counter and last-modified time of the contact table"""
+        return ContactRepository.get_version()
+    
+    @staticmethod
+    def get_contacts_page(limit: int, cursor: Optional[str] = None,
+                          filters: Optional[Dict] = None) -> Dict:
+        """Get one keyset page of contacts plus the next-page cursor"""
+        try:
+            after = decode_cursor(cursor) if cursor else None
+        except ValueError as e:
+            return {'error': 'Validation failed', 'details': {'cursor': str(e)}}
+        
+        contacts, next_position = ContactRepository.get_page(limit, after, filters)
+        return {
+            'contacts': contacts,
+            'next_cursor': encode_cursor(next_position) if next_position else None,
+            'limit': limit
+        }
+    
+    @staticmethod
+    def search_contacts(query: str, limit: int, offset: int = 0) -> Dict:
+        """Ranked full-text search over name, email and message"""
+        terms = parse_search_terms(query)
+        if not terms:
+            return {'error': 'Validation failed', 'details': {'q': 'Search query must contain a word'}}
+        
+        contacts, total = ContactRepository.search(terms, limit, offset)
+        for contact in contacts:
+            contact['snippet'] = render_snippet(contact['snippet'])
+        return {
+            'results': contacts,
+            'total': total,
+            'limit': limit,
+            'offset': offset,
+            'next_offset': offset + limit if offset + limit < total else None
+        }
+    
+    @staticmethod
+    def import_contacts(rows: List, max_rows: int) -> Dict:
+        """Validate every row and insert the valid ones in one transaction"""
+        if not isinstance(rows, list) or not rows:
+            return {'error': 'Validation failed', 'details': {'contacts': 'Provide a non-empty list of contacts'}}
+        if len(rows) > max_rows:
+            return {'error': 'Validation failed', 'details': {'contacts': f'At most {max_rows} rows per request'}}
+        
+        valid, errors = [], []
+        for number, row in enumerate(rows, 1):
+            data, row_errors = _validate_bulk_row(row)
+            if row_errors:
+                errors.append({'row': number, 'details': row_errors})
+            else:
+                valid.append(data)
+        
+        try:
+            ids = ContactRepository.bulk_create(valid) if valid else []
+        except Exception as e:
+            return {'error': 'Failed to import contacts', 'details': str(e)}
+        return {'imported': len(ids), 'ids': ids, 'errors': errors}
+    
+    @staticmethod
+    def bulk_update_contacts(rows: List, max_rows: int) -> Dict:
+        """Validate every row and apply the valid updates in one transaction"""
+        if not isinstance(rows, list) or not rows:
+            return {'error': 'Validation failed', 'details': {'contacts': 'Provide a non-empty list of contacts'}}
+        if len(rows) > max_rows:
+            return {'error': 'Validation failed', 'details': {'contacts': f'At most {max_rows} rows per request'}}
+        
+        valid, errors = [], []
+        for number, row in enumerate(rows, 1):
+            data, row_errors = _validate_bulk_row(row, require_id=True)
+            if row_errors:
+                errors.append({'row': number, 'details': row_errors})
+            else:
+                valid.append((number, data))
+        
+        try:
+            missing = set(ContactRepository.bulk_update([data for _, data in valid])) if valid else set()
+        except Exception as e:
+            return {'error': 'Failed to update contacts', 'details': str(e)}
+        errors.extend({'row': number, 'id': data['id'], 'details': {'id': 'Contact not found'}}
+                      for number, data in valid if data['id'] in missing)
+        errors.sort(key=lambda error: error['row'])
+        return {'updated': len(valid) - sum(1 for _, data in valid if data['id'] in missing),
+                'errors': errors}
+    
+    @staticmethod
+    def bulk_delete_contacts(payload: Dict, max_rows: int) -> Dict:
+        """Delete contacts by a list of IDs or by list filters"""
+        if not isinstance(payload, dict):
+            return {'error': 'Validation failed', 'details': {'body': 'Expected a JSON object'}}
+        
+        if 'ids' in payload:
+            ids = payload['ids']
+            if not isinstance(ids, list) or not ids:
+                return {'error': 'Validation failed', 'details': {'ids': 'Provide a non-empty list of ids'}}
+            if len(ids) > max_rows:
+                return {'error': 'Validation failed', 'details': {'ids': f'At most {max_rows} ids per request'}}
+            try:
+                ids = [int(contact_id) for contact_id in ids]
+            except (TypeError, ValueError):
+                return {'error': 'Validation failed', 'details': {'ids': 'Contact ids must be integers'}}
+            try:
+                deleted, missing = ContactRepository.bulk_delete(ids)
+            except Exception as e:
+                return {'error': 'Failed to delete contacts', 'details': str(e)}
+            return {'deleted': deleted, 'missing_ids': missing}
+        
+        filters, errors = parse_contact_filters(payload.get('filter') or {})
+        if errors:
+            return {'error': 'Validation failed', 'details': errors}
+        if not filters:
+            # Never let an empty filter turn into "delete everything"
+            return {'error': 'Validation failed',
+                    'details': {'filter': 'Provide ids or at least one of email, name, created_from, created_to'}}
+        try:
+            deleted = ContactRepository.delete_matching(filters)
+        except Exception as e:
+            return {'error': 'Failed to delete contacts', 'details': str(e)}
+        return {'deleted': deleted, 'missing_ids': []}
+    
     @staticmethod
     def get_contact(contact_id: int) -> Optional[Dict]:
         """Get single contact by ID as serialized dictionary"""
@@ -55,6 +302,26 @@ class ContactService:
         except Exception as e:
             return {'error': 'Failed to save contact', 'details': str(e)}
     
+    @staticmethod
+    def submit_contact(contact_data: Dict) -> Dict:
+        """Create a contact through the configured CONTACT_WRITE_MODE"""
+        if not contact_writer.enabled:
+            return ContactService.create_contact(contact_data)
+        
+        errors = validate_contact_data(contact_data)
+        if errors:
+            return {'error': 'Validation failed', 'details': errors}
+        
+        try:
+            contact = contact_writer.submit(contact_data)
+        except ContactQueueFullError as e:
+            return {'error': 'Service busy', 'details': str(e)}
+        except Exception as e:
+            return {'error': 'Failed to save contact', 'details': str(e)}
+        if contact is None:
+            return {'message': 'Submission accepted', 'queued': True}
+        return {'message': 'Submitted successfully', 'contact': contact}
+    
     @staticmethod
     def update_contact(contact_id: int, contact_data: Dict) -> Dict:
         """Update existing contact with validation"""
@@ -82,7 +349,7 @@ class CreateContactUseCase:
     
     @staticmethod
     def execute(contact_data: Dict) -> Dict:
-        return ContactService.create_contact(contact_data)
+        return ContactService.submit_contact(contact_data)
 
 class GetContactsUseCase:
     """Use case for getting contacts"""
@@ -91,6 +358,48 @@ class GetContactsUseCase:
     def execute() -> List[Dict]:
         return ContactService.get_all_contacts()
 
+class GetContactsVersionUseCase:
+    """Use case for the contact table version behind conditional listings"""
+    
+    @staticmethod
+    def execute() -> Tuple[int, Optional[datetime]]:
+        return ContactService.get_contacts_version()
+
+class GetContactsPageUseCase:
+    """Use case for paginated, filtered contact listings"""
+    
+    @staticmethod
+    def execute(limit: int, cursor: Optional[str] = None, filters: Optional[Dict] = None) -> Dict:
+        return ContactService.get_contacts_page(limit, cursor, filters)
+
+class SearchContactsUseCase:
+    """Use case for full-text contact search"""
+    
+    @staticmethod
+    def execute(query: str, limit: int, offset: int = 0) -> Dict:
+        return ContactService.search_contacts(query, limit, offset)
+
+class ImportContactsUseCase:
+    """Use case for bulk contact imports"""
+    
+    @staticmethod
+    def execute(rows: List, max_rows: int) -> Dict:
+        return ContactService.import_contacts(rows, max_rows)
+
+class BulkUpdateContactsUseCase:
+    """Use case for bulk contact updates"""
+    
+    @staticmethod
+    def execute(rows: List, max_rows: int) -> Dict:
+        return ContactService.bulk_update_contacts(rows, max_rows)
+
+class BulkDeleteContactsUseCase:
+    """Use case for bulk contact deletes"""
+    
+    @staticmethod
+    def execute(payload: Dict, max_rows: int) -> Dict:
+        return ContactService.bulk_delete_contacts(payload, max_rows)
+
 class UpdateContactUseCase:
     """Use case for updating contacts"""
     
@@ -98,41 +407,323 @@ class UpdateContactUseCase:
     def execute(contact_id: int, contact_data: Dict) -> Dict:
         return ContactService.update_contact(contact_id, contact_data)
 
+class ModelNotReadyError(RuntimeError):
+    """Raised when the image analysis model is not loaded (yet)"""
+
 class ImageAnalysisService:
     """Service for image analysis operations"""
     
     _model = None
     _processor = None
+    _batcher = None
+    _pool = None
+    _runner = None
+    _backend_info: Dict = {}
+    _fast_preprocessor = None
+    _preprocess_info: Dict = {}
+    _threads_info: Dict = {}
+    _warmup_info: Dict = {}
+    _config: Dict = {}
+    _load_state = 'not_loaded'
+    _load_error = None
+    _load_lock = threading.Lock()
+    _loaded = threading.Event()
 
     @classmethod
-    def initialize_model(cls):
-        """Initialize model (called during app startup)"""
+    def configure(cls, config: Dict):
+        """Remember the app config used when the model is loaded later"""
+        cls._config = dict(config)
+
+    @classmethod
+    def initialize_model(cls, config: Optional[Dict] = None):
+        """Initialize model synchronously"""
+        config = config if config is not None else cls._config
+        model_name = config.get('MODEL_NAME', "AsmaaElnagger/Diabetic_RetinoPathy_detection")
+        revision = config.get('MODEL_REVISION')
+        if config.get('MODEL_SOURCE', 'registry') == 'registry':
+            # Before the transformers import, which reads it once
+            os.environ.setdefault('HF_HUB_OFFLINE', '1')
+            location = model_registry.resolve(model_name, revision)
+            options = {'local_files_only': True}
+            weights = {'use_safetensors': True}
+        else:
+            location, options, weights = model_name, {'revision': revision}, {}
+        # Before transformers imports torch, so OpenMP/MKL see the limits
+        cls._threads_info = apply_thread_plan(plan_threads(config))
         from transformers import AutoImageProcessor, AutoModelForImageClassification
-        import torch
-        cls._processor = AutoImageProcessor.from_pretrained("AsmaaElnagger/Diabetic_RetinoPathy_detection")
-        cls._model = AutoModelForImageClassification.from_pretrained("AsmaaElnagger/Diabetic_RetinoPathy_detection")
+        cls._processor = AutoImageProcessor.from_pretrained(location, **options)
+        cls._model = AutoModelForImageClassification.from_pretrained(location, **options, **weights)
         cls._model.eval()
 
+        backend, channels_last, cls._runner, cls._backend_info = select_backend(
+            cls._model, cls._processor, config)
+
+        cls._fast_preprocessor = None
+        cls._preprocess_info = {'fast': False}
+        if config.get('PREPROCESS_FAST', True):
+            cls._fast_preprocessor, parity = build_fast_preprocessor(
+                cls._processor,
+                reference_images(config.get('INFERENCE_PARITY_IMAGE_DIR')),
+                atol=float(config.get('PREPROCESS_PARITY_ATOL', 1e-4))
+            )
+            cls._preprocess_info = {'fast': cls._fast_preprocessor is not None, 'parity': parity}
+        cls._preprocess_info['draft_decode'] = False
+        if config.get('PREPROCESS_DRAFT_DECODE', True) and cls._fast_preprocessor is not None:
+            try:
+                draft_parity = check_draft_parity(
+                    cls._processor, cls._fast_preprocessor,
+                    draft_reference(reference_images(config.get('INFERENCE_PARITY_IMAGE_DIR')),
+                                    cls._fast_preprocessor.decode_size),
+                    atol=float(config.get('PREPROCESS_DRAFT_ATOL', 0.02)))
+            except Exception as e:
+                draft_parity = {'passed': False, 'error': str(e)}
+            cls._preprocess_info['draft_parity'] = draft_parity
+            cls._preprocess_info['draft_decode'] = draft_parity['passed']
+        prediction_cache.set_inference_identity(inference_identity(
+            backend, cls._preprocess_info['fast'], cls._preprocess_info['draft_decode']))
+
+        if cls._pool is not None:
+            cls._pool.close()
+            cls._pool = None
+        warmup_enabled = config.get('MODEL_WARMUP_ENABLED', True)
+        warmup_sizes = warmup_batch_sizes(config) if warmup_enabled else []
+        warmup_images = reference_images(count=max(warmup_sizes)) if warmup_sizes else []
+        processes = int(config.get('INFERENCE_PROCESSES', 0))
+        if processes > 0:
+            cls._pool = InferencePool(
+                cls._model,
+                workers=processes,
+                start_method=config.get('INFERENCE_PROCESS_START_METHOD', 'spawn'),
+                threads_per_worker=cls._threads_info['process_threads'],
+                backend=backend,
+                channels_last=channels_last,
+                example_shape=cls._backend_info.get('example_shape'),
+                warmup_shape=list(cls._preprocess(warmup_images[:1]).shape) if warmup_sizes else None,
+                warmup_sizes=warmup_sizes,
+                timeout=config.get('INFERENCE_PROCESS_TIMEOUT', 60)
+            )
+
+        if cls._batcher is not None:
+            cls._batcher.stop()
+            cls._batcher = None
+        if config.get('INFERENCE_BATCHING_ENABLED', True):
+            cls._batcher = MicroBatcher(
+                cls._predict_batch,
+                max_batch_size=config.get('INFERENCE_MAX_BATCH_SIZE', 16),
+                max_wait_ms=config.get('INFERENCE_MAX_WAIT_MS', 10),
+                max_queue_size=config.get('INFERENCE_MAX_QUEUE_SIZE', 0),
+                concurrency=max(1, processes)
+            )
+
+        cls._warmup_info = {'enabled': bool(warmup_sizes)}
+        if warmup_sizes:
+            cls._load_state = 'warming'
+            cls._warmup_info = cls._warm_up(warmup_images, warmup_sizes,
+                                            rounds=int(config.get('MODEL_WARMUP_ROUNDS', 2)),
+                                            timeout=float(config.get('MODEL_WARMUP_TIMEOUT', 300)))
+        cls._load_state = 'ready'
+        cls._load_error = None
+        cls._loaded.set()
+
+    @classmethod
+    def _warm_up(cls, images: List, sizes: List[int], rounds: int, timeout: float) -> Dict:
+        """Run synthetic batches of every size the batcher can form before going ready
+
+        The first passes pay for allocator growth, oneDNN kernel selection and
+        lazy initialization; doing them here keeps them out of the first
+        requests' latency. Pool workers warm themselves up in their
+        initializer; here we only wait for them and warm the preprocessing.
+        Timings bypass the request metrics.
+        """
+        import torch
+        started = time.perf_counter()
+        info = {'enabled': True, 'batch_sizes': sizes, 'rounds': rounds, 'timings_ms': {}}
+        if cls._pool is not None:
+            info['pool_ready'] = cls._pool.wait_ready(timeout)
+        for size in sizes:
+            batch = [images[i % len(images)] for i in range(size)]
+            timings = []
+            for _ in range(max(1, rounds)):
+                round_started = time.perf_counter()
+                pixel_values = cls._preprocess(batch)
+                if cls._pool is None:
+                    torch.nn.functional.softmax(cls._runner(pixel_values), dim=-1)
+                timings.append(round((time.perf_counter() - round_started) * 1000.0, 2))
+            info['timings_ms'][str(size)] = {'first': timings[0], 'last': timings[-1]}
+        info['seconds'] = round(time.perf_counter() - started, 3)
+        return info
+
+    @classmethod
+    def start_background_load(cls):
+        """Load the model on a background thread unless already loading/loaded"""
+        if cls._load_state in ('loading', 'warming', 'ready'):
+            return
+        with cls._load_lock:
+            if cls._load_state in ('loading', 'warming', 'ready'):
+                return
+            cls._load_state = 'loading'
+            cls._load_error = None
+            cls._loaded.clear()
+            threading.Thread(target=cls._load_in_background, name='model-loader', daemon=True).start()
+
+    @classmethod
+    def _load_in_background(cls):
+        try:
+            cls.initialize_model()
+        except Exception as e:
+            cls._load_state = 'failed'
+            cls._load_error = str(e)
+            cls._loaded.set()
+
+    @classmethod
+    def ensure_model(cls, timeout: Optional[float] = None):
+        """Wait (up to timeout seconds) for the model, starting the load if needed"""
+        if cls._load_state == 'ready':
+            return
+        cls.start_background_load()
+        if timeout is None:
+            timeout = cls._config.get('MODEL_LOAD_WAIT', 30)
+        cls._loaded.wait(timeout)
+        if cls._load_state != 'ready':
+            if cls._load_state == 'failed':
+                raise ModelNotReadyError(f"Image analysis model failed to load: {cls._load_error}")
+            raise ModelNotReadyError("Image analysis model is still loading")
+
+    @classmethod
+    def model_revision(cls) -> Optional[str]:
+        """Configured revision, or the commit the weights were resolved to"""
+        revision = cls._config.get('MODEL_REVISION')
+        if revision is None and cls._model is not None:
+            revision = getattr(cls._model.config, '_commit_hash', None)
+        return revision
+
+    @classmethod
+    def is_ready(cls) -> bool:
+        return cls._load_state == 'ready'
+
+    @classmethod
+    def get_status(cls) -> Dict:
+        """Get model load state for health checks"""
+        return {
+            'state': cls._load_state,
+            'error': cls._load_error,
+            'model': cls._config.get('MODEL_NAME'),
+            'revision': cls._config.get('MODEL_REVISION'),
+            'source': cls._config.get('MODEL_SOURCE', 'registry')
+        }
+
+    @classmethod
+    def _preprocess(cls, images: List):
+        """Images -> pixel_values, via the fast path when it passed parity"""
+        if cls._fast_preprocessor is not None:
+            return cls._fast_preprocessor(images)
+        return cls._processor(images=images, return_tensors="pt")['pixel_values']
+
+    @classmethod
+    def decode_size(cls) -> Optional[Tuple[int, int]]:
+        """Size JPEG decoding may be reduced to, or None for full resolution"""
+        if cls._preprocess_info.get('draft_decode') and cls._fast_preprocessor is not None:
+            return cls._fast_preprocessor.decode_size
+        return None
+
+    @classmethod
+    def _predict_batch(cls, images: List) -> List:
+        """Run one batched forward pass and return a softmax row per image"""
+        import torch
+        with metrics.stage('preprocess'):
+            pixel_values = cls._preprocess(images)
+        if cls._pool is not None:
+            # Forward pass and softmax both run in the worker process
+            with metrics.stage('pool_forward'):
+                predictions = cls._pool.predict(pixel_values)
+        else:
+            with metrics.stage('forward'):
+                logits = cls._runner(pixel_values)
+            with metrics.stage('softmax'):
+                predictions = torch.nn.functional.softmax(logits, dim=-1)
+        return list(predictions)
+
+    @classmethod
+    def _format_prediction(cls, probabilities) -> Dict:
+        """Turn a softmax row into the API prediction payload"""
+        predicted_class = int(probabilities.argmax())
+        labels = cls._model.config.id2label
+        return {
+            'prediction': "stage " + labels[predicted_class],
+            'confidence': float(probabilities.max()),
+            'probabilities': {"stage " + labels[i]: float(p) for i, p in enumerate(probabilities.tolist())}
+        }
+
     @classmethod
     def analyze_image(cls, image) -> Dict:
         """Run prediction on image"""
-        if cls._model is None or cls._processor is None:
-            raise RuntimeError("Image analysis model not initialized")
+        # Not _model: it is set early in initialize_model, before the
+        # runner, the batcher and the warm-up are in place
+        if not cls.is_ready():
+            cls.ensure_model()
             
         try:
-            import torch
-            inputs = cls._processor(images=image, return_tensors="pt")
-            with torch.no_grad():
-                outputs = cls._model(**inputs)
-            predictions = torch.nn.functional.softmax(outputs.logits, dim=-1)
-            predicted_class = predictions.argmax().item()
-            return {
-                'prediction': "stage " + cls._model.config.id2label[predicted_class],
-                'confidence': float(predictions.max())
-            }
+            if image.mode != 'RGB':
+                image = image.convert('RGB')
+            # Includes time spent queued for a micro-batch
+            with metrics.stage('inference'):
+                if cls._batcher is not None:
+                    probabilities = cls._batcher.submit(image).result()
+                else:
+                    probabilities = cls._predict_batch([image])[0]
+            with metrics.stage('format'):
+                return cls._format_prediction(probabilities)
         except Exception as e:
             return {'error': str(e)}
 
+    @classmethod
+    def analyze_images(cls, images: List) -> List[Dict]:
+        """Run prediction on several images, sharing forward passes"""
+        # Not _model: it is set early in initialize_model, before the
+        # runner, the batcher and the warm-up are in place
+        if not cls.is_ready():
+            cls.ensure_model()
+
+        images = [image if image.mode == 'RGB' else image.convert('RGB') for image in images]
+        try:
+            if cls._batcher is not None:
+                futures = cls._batcher.submit_many(images)
+            else:
+                rows = cls._predict_batch(images)
+        except Exception as e:
+            return [{'error': str(e)} for _ in images]
+
+        results = []
+        for i in range(len(images)):
+            try:
+                probabilities = futures[i].result() if cls._batcher is not None else rows[i]
+                results.append(cls._format_prediction(probabilities))
+            except Exception as e:
+                results.append({'error': str(e)})
+        return results
+
+    @classmethod
+    def get_info(cls) -> Dict:
+        """Get model identity and the active inference backend"""
+        info = cls.get_status()
+        info['backend'] = cls._backend_info
+        info['preprocessing'] = cls._preprocess_info
+        info['threads'] = cls._threads_info
+        info['warmup'] = cls._warmup_info
+        if cls._model is not None:
+            info['labels'] = cls._model.config.id2label
+        return info
+
+    @classmethod
+    def get_stats(cls, memory: bool = False) -> Dict:
+        """Get inference queue, batching and worker pool statistics"""
+        return {
+            'model_loaded': cls._model is not None,
+            'model_state': cls._load_state,
+            'batching': cls._batcher.stats() if cls._batcher is not None else None,
+            'inference_pool': cls._pool.stats(memory=memory) if cls._pool is not None else None
+        }
+
 class AnalyzeImageUseCase:
     """Use case for analyzing images"""
     
@@ -140,6 +731,242 @@ class AnalyzeImageUseCase:
     def execute(image) -> Dict:
         return ImageAnalysisService.analyze_image(image)
 
+def _artifacts_present(result: Dict) -> bool:
+    """A cached PDF result is only usable while its extracted images exist"""
+    pages = result.get('pages', [result])
+    return all(artifact_store.exists(page['extracted_image'])
+               for page in pages if 'extracted_image' in page)
+
+def _log_prediction(result: Dict, data_hash: str, content_type: Optional[str],
+                    cached: bool, timings: Dict[str, float]):
+    prediction_log.record(result, data_hash, content_type,
+                          model_name=ImageAnalysisService._config.get('MODEL_NAME'),
+                          model_revision=ImageAnalysisService.model_revision(),
+                          cached=cached, timings=timings)
+
+class AnalyzeInputUseCase:
+    """Use case for analyzing raw upload/URL bytes through the prediction cache"""
+    
+    @staticmethod
+    def execute(data: bytes, content_type: Optional[str] = None,
+                invalid_message: str = 'Invalid file', pages: Optional[str] = None,
+                path: Optional[str] = None) -> Dict:
+        """``data`` may be an mmap of a spooled upload, ``path`` the file behind it"""
+        started = time.perf_counter()
+        is_pdf = content_type == 'application/pdf'
+        data_hash = input_hash(data)
+        with metrics.stage('cache_lookup'):
+            key = prediction_cache.key_for_hash(data_hash, variant=f'pages={pages or 1}' if is_pdf else '')
+            cached = prediction_cache.get(key)
+        if cached is not None and _artifacts_present(cached):
+            _log_prediction(cached, data_hash, content_type, cached=True,
+                            timings={'total_ms': (time.perf_counter() - started) * 1000.0})
+            return cached
+
+        try:
+            if is_pdf:
+                config = ImageAnalysisService._config
+                decode_size = ImageAnalysisService.decode_size() or (0, 0)
+                with metrics.stage('pdf_extract'):
+                    extracted = extract_pdf_images(
+                        data, pages,
+                        min_pixels=max(min(decode_size), config.get('PDF_RENDER_MIN_PIXELS', 512)),
+                        min_dpi=config.get('PDF_RENDER_MIN_DPI', 36),
+                        max_dpi=config.get('PDF_RENDER_MAX_DPI', 200),
+                        path=path,
+                        max_pages=config.get('PDF_MAX_PAGES', 50)
+                    )
+            else:
+                with metrics.stage('image_decode'):
+                    image = load_image(data, draft_size=ImageAnalysisService.decode_size())
+        except Exception as e:
+            return {'error': f'{invalid_message}: {str(e)}'}
+        decoded = time.perf_counter()
+
+        if is_pdf:
+            # All selected pages go through the model in one batched call
+            results = ImageAnalysisService.analyze_images([image for _, image in extracted])
+            inferred = time.perf_counter()
+            page_results = []
+            for (page, image), page_result in zip(extracted, results):
+                if 'error' in page_result:
+                    return page_result
+                page_result['page'] = page
+                with metrics.stage('artifact_store'):
+                    page_result['extracted_image'] = artifact_store.save_image(image)
+                page_results.append(page_result)
+            result = page_results[0] if len(page_results) == 1 else {'pages': page_results}
+        else:
+            result = AnalyzeImageUseCase.execute(image)
+            inferred = time.perf_counter()
+            if 'error' in result:
+                return result
+
+        prediction_cache.set(key, result)
+        _log_prediction(result, data_hash, content_type, cached=False, timings={
+            'decode_ms': (decoded - started) * 1000.0,
+            'inference_ms': (inferred - decoded) * 1000.0,
+            'total_ms': (time.perf_counter() - started) * 1000.0
+        })
+        return result
+
+def _analyze_batch_item(loader: Callable) -> Dict:
+    """Load one batch item and analyze it, reporting failures inline"""
+    try:
+        data, content_type, invalid_message = loader()
+        return AnalyzeInputUseCase.execute(data, content_type, invalid_message)
+    except Exception as e:
+        return {'error': str(e)}
+
+class AnalyzeBatchUseCase:
+    """Use case for analyzing many inputs, yielding results as they finish"""
+    
+    @staticmethod
+    def execute(items: Iterable[Tuple[str, Callable]], workers: int = 16) -> Iterator[Dict]:
+        """Each item is ``(name, loader)``; ``loader()`` returns
+        ``(data, content_type, invalid_message)``. Decoding runs on a thread
+        pool whose concurrent submissions are coalesced by the inference
+        batcher, and results are yielded in completion order."""
+        workers = max(1, workers)
+        items = iter(enumerate(items))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='analyze-batch') as pool:
+            pending = {}
+
+            def fill():
+                # Keep a bounded window in flight so large uploads are not
+                # all read into memory up front
+                while len(pending) < workers * 2:
+                    try:
+                        index, (name, loader) = next(items)
+                    except StopIteration:
+                        return
+                    pending[pool.submit(_analyze_batch_item, loader)] = (index, name)
+
+            fill()
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index, name = pending.pop(future)
+                    result = {'index': index, 'name': name}
+                    result.update(future.result())
+                    yield result
+                fill()
+
+class AnalysisJobService:
+    """Service layer for asynchronous analysis jobs"""
+    
+    @staticmethod
+    def submit_file(data: bytes, content_type: Optional[str] = None) -> Dict:
+        """Store an upload, queue a job for it and return the job"""
+        job_id = uuid4().hex
+        path = analysis_jobs.store_upload(job_id, data)
+        job = AnalysisJobRepository.create(job_id, 'file', path, content_type)
+        analysis_jobs.enqueue(job_id)
+        return job
+    
+    @staticmethod
+    def submit_url(url: str) -> Dict:
+        """Queue a job that fetches and analyzes an image URL"""
+        job_id = uuid4().hex
+        job = AnalysisJobRepository.create(job_id, 'url', url)
+        analysis_jobs.enqueue(job_id)
+        return job
+    
+    @staticmethod
+    def get_job(job_id: str) -> Optional[Dict]:
+        """Get job status and result"""
+        return AnalysisJobRepository.get_by_id(job_id)
+
+class SubmitAnalysisJobUseCase:
+    """Use case for queueing an asynchronous analysis"""
+    
+    @staticmethod
+    def execute(data: Optional[bytes] = None, content_type: Optional[str] = None,
+                url: Optional[str] = None) -> Dict:
+        if url is not None:
+            return AnalysisJobService.submit_url(url)
+        return AnalysisJobService.submit_file(data, content_type)
+
+class GetAnalysisJobUseCase:
+    """Use case for polling an analysis job"""
+    
+    @staticmethod
+    def execute(job_id: str) -> Optional[Dict]:
+        return AnalysisJobService.get_job(job_id)
+
+class PredictionStatsService:
+    """Service for aggregate prediction statistics (reads rollups only)"""
+    
+    @staticmethod
+    def get_stats(start: date, end: date) -> Dict:
+        """Counts per day and label, confidence means and histograms"""
+        daily_rows = PredictionStatsRepository.get_daily(start, end)
+        histograms = PredictionStatsRepository.get_histograms(start, end)
+        
+        labels: Dict[str, Dict] = {}
+        daily: Dict[str, Dict] = {}
+        for row in daily_rows:
+            totals = labels.setdefault(row['label'], {'count': 0, 'cached_count': 0,
+                                                      'confidence_sum': 0.0, 'total_ms_sum': 0.0})
+            for field in totals:
+                totals[field] += row[field]
+            day = daily.setdefault(row['day'], {'day': row['day'], 'total': 0, 'counts': {}})
+            day['counts'][row['label']] = row['count']
+            day['total'] += row['count']
+        
+        summary = {}
+        for label, totals in sorted(labels.items()):
+            bins = histograms.get(label, {})
+            summary[label] = {
+                'count': totals['count'],
+                'cached_count': totals['cached_count'],
+                'mean_confidence': totals['confidence_sum'] / totals['count'] if totals['count'] else None,
+                'mean_total_ms': totals['total_ms_sum'] / totals['count'] if totals['count'] else None,
+                'confidence_histogram': [bins.get(index, 0) for index in range(HISTOGRAM_BINS)]
+            }
+        return {
+            'from': start.isoformat(),
+            'to': end.isoformat(),
+            'total': sum(label['count'] for label in summary.values()),
+            'labels': summary,
+            'daily': list(daily.values()),
+            'histogram_bins': [[index / HISTOGRAM_BINS, (index + 1) / HISTOGRAM_BINS]
+                               for index in range(HISTOGRAM_BINS)]
+        }
+
+class GetPredictionStatsUseCase:
+    """Use case for prediction statistics over a day range"""
+    
+    @staticmethod
+    def execute(args: Dict, max_days: int) -> Dict:
+        errors = {}
+        today = datetime.utcnow().date()
+        try:
+            end = date.fromisoformat(args['to']) if args.get('to') else today
+        except ValueError:
+            errors['to'] = 'Must be an ISO 8601 date'
+        try:
+            if args.get('from'):
+                start = date.fromisoformat(args['from'])
+            else:
+                days = int(args.get('days', 30))
+                # Checked before building the timedelta, which overflows on huge values
+                if not 1 <= days <= max_days:
+                    errors['days'] = f'Must be between 1 and {max_days}'
+                else:
+                    start = (end if 'to' not in errors else today) - timedelta(days=days - 1)
+        except ValueError:
+            errors['from'] = 'from must be an ISO 8601 date and days an integer'
+        except OverflowError:
+            errors['from'] = 'Date range starts before year 1'
+        if errors:
+            return {'error': 'Validation failed', 'details': errors}
+        if start > end:
+            return {'error': 'Validation failed', 'details': {'from': 'Must not be after to'}}
+        if (end - start).days + 1 > max_days:
+            return {'error': 'Validation failed', 'details': {'from': f'At most {max_days} days per request'}}
+        return PredictionStatsService.get_stats(start, end)
+
 class DeleteContactUseCase:
     """Use case for deleting contacts"""
     
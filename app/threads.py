@@ -0,0 +1,108 @@
+import os
+from typing import Dict, List, Optional
+
+THREAD_ENV_VARS = ('OMP_NUM_THREADS', 'MKL_NUM_THREADS', 'OPENBLAS_NUM_THREADS')
+
+
+def _cgroup_cpu_limit() -> Optional[float]:
+    """CPU quota of the container in cores (cgroup v2, then v1), if any"""
+    try:
+        with open('/sys/fs/cgroup/cpu.max') as f:
+            quota, period = f.read().split()[:2]
+        if quota != 'max':
+            return int(quota) / int(period)
+    except (OSError, ValueError):
+        pass
+    try:
+        with open('/sys/fs/cgroup/cpu/cpu.cfs_quota_us') as f:
+            quota = int(f.read())
+        with open('/sys/fs/cgroup/cpu/cpu.cfs_period_us') as f:
+            period = int(f.read())
+        if quota > 0 and period > 0:
+            return quota / period
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def available_cpus() -> int:
+    """CPUs this process may use, honouring CPU affinity and a container quota"""
+    try:
+        count = len(os.sched_getaffinity(0))
+    except AttributeError:
+        count = os.cpu_count() or 1
+    quota = _cgroup_cpu_limit()
+    if quota:
+        count = min(count, int(quota))
+    return max(1, count)
+
+
+def plan_threads(config: Dict) -> Dict:
+    """Divide the node's CPU budget among web workers and inference processes
+
+    ``CPU_BUDGET`` cores (default: every available core) are shared by
+    ``WEB_WORKERS`` processes. Without an inference pool a worker gives its
+    share to torch's intra-op pool. With ``INFERENCE_PROCESSES`` the parent
+    only preprocesses, so it keeps one thread and the pool processes split
+    the share. Explicit ``TORCH_NUM_THREADS`` / ``INFERENCE_PROCESS_THREADS``
+    values win over the computed ones.
+    """
+    budget = int(config.get('CPU_BUDGET', 0)) or available_cpus()
+    web_workers = max(1, int(config.get('WEB_WORKERS', 1)))
+    per_worker = max(1, budget // web_workers)
+    processes = int(config.get('INFERENCE_PROCESSES', 0))
+    if processes > 0:
+        intra_op = 1
+        process_threads = (int(config.get('INFERENCE_PROCESS_THREADS', 0))
+                           or max(1, per_worker // processes))
+    else:
+        intra_op = per_worker
+        process_threads = 0
+    return {
+        'cpu_budget': budget,
+        'web_workers': web_workers,
+        'threads_per_worker': per_worker,
+        'intra_op_threads': int(config.get('TORCH_NUM_THREADS', 0)) or intra_op,
+        'inter_op_threads': max(1, int(config.get('TORCH_INTEROP_THREADS', 1))),
+        'process_threads': process_threads
+    }
+
+
+def apply_thread_plan(plan: Dict) -> Dict:
+    """Apply a plan to OpenMP/MKL and torch; returns the plan with what took effect
+
+    The environment variables only reach native libraries that have not been
+    loaded yet, so this runs before transformers (and with it torch) is
+    imported. Variables set by the operator are left alone.
+    """
+    for name in THREAD_ENV_VARS:
+        os.environ.setdefault(name, str(plan['intra_op_threads']))
+    import torch
+    torch.set_num_threads(plan['intra_op_threads'])
+    try:
+        torch.set_num_interop_threads(plan['inter_op_threads'])
+    except RuntimeError:
+        # Only settable once per process, before any inter-op work has run
+        pass
+    return dict(plan, torch_threads=torch.get_num_threads(),
+                torch_interop_threads=torch.get_num_interop_threads())
+
+
+def warmup_batch_sizes(config: Dict) -> List[int]:
+    """Batch sizes the batcher can produce: powers of two up to the maximum
+
+    ``MODEL_WARMUP_BATCH_SIZES`` ('1,4,16') overrides the default.
+    """
+    explicit = str(config.get('MODEL_WARMUP_BATCH_SIZES') or '').strip()
+    if explicit:
+        return sorted({max(1, int(size)) for size in explicit.split(',') if size.strip()})
+    if not config.get('INFERENCE_BATCHING_ENABLED', True):
+        return [1]
+    largest = max(1, int(config.get('INFERENCE_MAX_BATCH_SIZE', 16)))
+    sizes = set()
+    size = 1
+    while size < largest:
+        sizes.add(size)
+        size *= 2
+    sizes.add(largest)
+    return sorted(sizes)
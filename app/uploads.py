@@ -0,0 +1,195 @@
+import io
+import mmap
+import os
+import tempfile
+from typing import Callable, Dict, Optional, Tuple, Union
+
+from flask import Request, current_app
+from werkzeug.exceptions import RequestEntityTooLarge
+
+UPLOAD_KINDS = ('image', 'pdf', 'zip', 'other')
+
+Buffer = Union[bytes, mmap.mmap]
+
+
+def upload_kind(content_type: Optional[str], filename: Optional[str] = None) -> str:
+    """Classify an upload as image / pdf / zip / other for its size limit"""
+    content_type = (content_type or '').split(';')[0].strip().lower()
+    extension = os.path.splitext(filename or '')[1].lower()
+    if content_type == 'application/pdf' or extension == '.pdf':
+        return 'pdf'
+    if content_type in ('application/zip', 'application/x-zip-compressed') or extension == '.zip':
+        return 'zip'
+    if content_type.startswith('image/') or extension in ('.jpg', '.jpeg', '.png', '.tif', '.tiff',
+                                                           '.bmp', '.webp', '.gif'):
+        return 'image'
+    return 'other'
+
+
+class SpooledUpload:
+    """Upload stream held in memory up to a threshold, then in a temp file
+
+    Werkzeug writes each multipart file part into this stream while it parses
+    the body. A part larger than its kind's limit raises
+    ``RequestEntityTooLarge`` at that point, before the rest of the body is
+    read. Parts over the spool threshold move to a ``NamedTemporaryFile``,
+    which ``buffer()`` hands out as a read-only mmap and ``path`` exposes to
+    tools that want a file name. A ``detach``-ed spool ignores ``close`` (the
+    request's cleanup) and stays open until ``release``.
+    """
+
+    def __init__(self, kind: str, limit: int, threshold: int, directory: Optional[str] = None):
+        self.kind = kind
+        self.limit = limit
+        self.threshold = threshold
+        self.directory = directory
+        self.size = 0
+        self._file = io.BytesIO()
+        self._map = None
+        self._detached = False
+
+    @property
+    def on_disk(self) -> bool:
+        return not isinstance(self._file, io.BytesIO)
+
+    @property
+    def path(self) -> Optional[str]:
+        return self._file.name if self.on_disk else None
+
+    def write(self, data) -> int:
+        self.size += len(data)
+        if self.limit and self.size > self.limit:
+            raise RequestEntityTooLarge(f'{self.kind} uploads are limited to {self.limit} bytes')
+        if not self.on_disk and self.size > self.threshold:
+            spooled = tempfile.NamedTemporaryFile(prefix='upload-', dir=self.directory)
+            spooled.write(self._file.getbuffer())
+            self._file = spooled
+        return self._file.write(data)
+
+    def buffer(self) -> Buffer:
+        """The contents as bytes when small, otherwise as an mmap of the spool file"""
+        if not self.on_disk:
+            return self._file.getvalue()
+        if self._map is None:
+            self._file.flush()
+            if self.size == 0:
+                return b''
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._map
+
+    def detach(self):
+        """Keep the spool open after the request closes its uploads"""
+        self._detached = True
+
+    def close(self):
+        if not self._detached:
+            self.release()
+
+    def release(self):
+        if self._map is not None:
+            try:
+                self._map.close()
+            except BufferError:
+                # Still viewed by a decoder; released when that view is dropped
+                pass
+            self._map = None
+        self._file.close()
+
+    def __getattr__(self, name):
+        # read/seek/tell/readline/... for werkzeug, zipfile and FileStorage.save
+        return getattr(self.__dict__['_file'], name)
+
+
+class UploadLimits:
+    """Size limits and spooling for request uploads
+
+    ``MAX_CONTENT_LENGTH`` caps the whole request. Werkzeug rejects an
+    oversized ``Content-Length`` before reading anything. Each file part is
+    also capped by kind (``UPLOAD_MAX_IMAGE_BYTES``, ``UPLOAD_MAX_PDF_BYTES``,
+    ``UPLOAD_MAX_ZIP_BYTES``, ``UPLOAD_MAX_OTHER_BYTES``) while it streams in.
+    Parts above ``UPLOAD_SPOOL_THRESHOLD`` are spooled to ``UPLOAD_SPOOL_DIR``.
+    Peak memory per upload is therefore bounded by the threshold plus the
+    decoded image, not by the file size.
+    """
+
+    def __init__(self, app=None):
+        self.max_bytes: Dict[str, int] = {kind: 0 for kind in UPLOAD_KINDS}
+        self.spool_threshold = 1024 * 1024
+        self.spool_dir = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.configure(app.config)
+        app.request_class = UploadRequest
+        app.extensions['upload_limits'] = self
+
+    def configure(self, config: Dict):
+        """Apply settings from a config mapping (also used by worker processes)"""
+        from app.imaging import set_max_image_pixels
+        self.max_bytes = {
+            'image': int(config.get('UPLOAD_MAX_IMAGE_BYTES', 30 * 1024 * 1024)),
+            'pdf': int(config.get('UPLOAD_MAX_PDF_BYTES', 60 * 1024 * 1024)),
+            'zip': int(config.get('UPLOAD_MAX_ZIP_BYTES', 256 * 1024 * 1024)),
+            'other': int(config.get('UPLOAD_MAX_OTHER_BYTES', 20 * 1024 * 1024)),
+        }
+        self.spool_threshold = int(config.get('UPLOAD_SPOOL_THRESHOLD', 1024 * 1024))
+        self.spool_dir = config.get('UPLOAD_SPOOL_DIR') or None
+        if self.spool_dir:
+            os.makedirs(self.spool_dir, exist_ok=True)
+        set_max_image_pixels(config.get('IMAGE_MAX_PIXELS', 50_000_000))
+
+    def check_size(self, kind: str, size: int):
+        """Raise ValueError if ``size`` exceeds the limit for ``kind``"""
+        limit = self.max_bytes.get(kind, 0)
+        if limit and size > limit:
+            raise ValueError(f'{kind} files are limited to {limit} bytes')
+
+    def stream_factory(self, total_content_length: Optional[int], content_type: Optional[str],
+                       filename: Optional[str] = None, content_length: Optional[int] = None):
+        kind = upload_kind(content_type, filename)
+        limit = self.max_bytes.get(kind, 0)
+        if limit and content_length and content_length > limit:
+            raise RequestEntityTooLarge(f'{kind} uploads are limited to {limit} bytes')
+        return SpooledUpload(kind, limit, self.spool_threshold, self.spool_dir)
+
+
+class UploadRequest(Request):
+    """Request whose file parts are size-checked and spooled by UploadLimits"""
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None,
+                         content_length=None):
+        limits = current_app.extensions.get('upload_limits')
+        if limits is None:
+            return super()._get_file_stream(total_content_length, content_type, filename,
+                                            content_length)
+        return limits.stream_factory(total_content_length, content_type, filename, content_length)
+
+
+def upload_buffer(file) -> Tuple[Buffer, Optional[str]]:
+    """Contents of an uploaded FileStorage without copying, plus its spool path"""
+    stream = file.stream
+    if isinstance(stream, SpooledUpload):
+        return stream.buffer(), stream.path
+    return file.read(), None
+
+
+def detach_upload(file) -> Tuple[Buffer, Callable[[], None]]:
+    """``upload_buffer`` for contents read after the request has ended
+
+    Streamed responses read uploads after the request context has closed
+    them; the spool stays open until the returned ``release`` is called.
+    """
+    stream = file.stream
+    if isinstance(stream, SpooledUpload):
+        stream.detach()
+        return stream.buffer(), stream.release
+    return file.read(), lambda: None
+
+
+def map_file(path: str) -> Buffer:
+    """Read-only mmap of a file (bytes for an empty one)"""
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return b''
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
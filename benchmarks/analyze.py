@@ -0,0 +1,136 @@
+"""Latency and throughput of POST /api/analyze against an offline model
+
+A randomly initialized ViT with the production interface is saved to a
+temporary directory and loaded through MODEL_NAME, so no network access is
+needed and the numbers measure the serving path rather than a particular
+checkpoint. ``--model-size tiny`` (default) isolates the serving overhead;
+``base`` has ViT-Base/16's ~86M parameters, for realistic inference and
+memory figures. Fundus-sized JPEGs and multi-page PDFs are generated with a
+fixed seed. The prediction cache is disabled so every request runs
+inference. ``--processes 0,4`` repeats the run in-process and with an
+inference pool of four workers (``INFERENCE_PROCESSES``); each run ends
+with RSS/PSS/private memory of the web process and every pool worker, from
+``/proc/<pid>/smaps_rollup``. Example::
+
+    python -m benchmarks.analyze --requests 200 --clients 1,4,16 --output analyze.json
+"""
+import argparse
+import os
+import tempfile
+import time
+from io import BytesIO
+
+from benchmarks.common import environment, latency_summary, make_app, run_clients, write_results
+from benchmarks.fixtures import build_model, fundus_jpegs, fundus_pdf
+
+
+def _post(payload: bytes, filename: str, content_type: str, pages=None):
+    def request(client, i):
+        data = {'file': (BytesIO(payload), filename, content_type)}
+        if pages is not None:
+            data['pages'] = pages
+        return client.post('/api/analyze', data=data, content_type='multipart/form-data')
+    return request
+
+
+def stage_breakdown(app, request, repeats: int) -> dict:
+    """Per-stage mean latency (ms) of sequential requests, from the stage histogram"""
+    from app.extensions import metrics
+
+    client = app.test_client()
+    before = metrics.stages.snapshot()
+    latencies = []
+    for i in range(repeats):
+        started = time.perf_counter()
+        response = request(client, i)
+        latencies.append((time.perf_counter() - started) * 1000.0)
+        if response.status_code != 200:
+            raise RuntimeError(f'Analyze failed with {response.status_code}: {response.get_data(as_text=True)}')
+    after = metrics.stages.snapshot()
+
+    stages = {}
+    for key, (count, total) in after.items():
+        previous_count, previous_total = before.get(key, (0, 0.0))
+        if count > previous_count:
+            stages[key[0]] = {'calls_per_request': (count - previous_count) / repeats,
+                              'mean_ms_per_request': (total - previous_total) * 1000.0 / repeats}
+    return {'latency_ms': latency_summary(latencies), 'stages': stages}
+
+
+def run(requests: int, clients, pdf_pages: int, image_size: int, warmup: int,
+        directory: str = None, processes: int = 0, model_size: str = 'tiny') -> dict:
+    from app.inference_pool import _read_memory
+    from app.services import ImageAnalysisService
+
+    directory = directory or tempfile.mkdtemp(prefix='analyze-bench-')
+    model_path = build_model(directory, model_size)
+    app, _ = make_app({
+        'MODEL_NAME': model_path,
+        'MODEL_REVISION': None,
+        'MODEL_LOAD_MODE': 'eager',
+        'PREDICTION_CACHE_ENABLED': False,
+        'PREDICTION_LOG_ENABLED': False,
+        'METRICS_ENABLED': True,
+        'INFERENCE_PROCESSES': processes,
+    }, directory=directory)
+
+    jpegs = fundus_jpegs(8, size=image_size)
+    # --pdf-pages 0 skips the PDF requests (hosts without poppler)
+    pdf = fundus_pdf(pdf_pages) if pdf_pages else b''
+    jpeg_requests = [_post(jpeg, 'fundus.jpg', 'image/jpeg') for jpeg in jpegs]
+
+    def jpeg_request(client, i):
+        return jpeg_requests[i % len(jpeg_requests)](client, i)
+
+    pdf_request = _post(pdf, 'report.pdf', 'application/pdf', pages='all')
+
+    results = {'inputs': {'jpeg_bytes': len(jpegs[0]), 'jpeg_size': image_size,
+                          'pdf_bytes': len(pdf), 'pdf_pages': pdf_pages},
+               'inference_processes': processes}
+    scenarios = [('jpeg', jpeg_request)] + ([('pdf', pdf_request)] if pdf_pages else [])
+    for name, request in scenarios:
+        stage_breakdown(app, request, warmup)
+        results[name] = {
+            'single_request': stage_breakdown(app, request, max(1, min(requests, 50))),
+            'concurrency': [run_clients(app, request, requests, n) for n in clients]
+        }
+    pool = ImageAnalysisService.get_stats(memory=True)['inference_pool']
+    results['memory'] = {
+        'model_bytes': sum(t.numel() * t.element_size() for t in
+                           list(ImageAnalysisService._model.parameters())
+                           + list(ImageAnalysisService._model.buffers())),
+        'web_process': _read_memory(os.getpid()),
+        'pool_workers': pool['worker_memory'] if pool else None
+    }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=200, help='requests per concurrency level')
+    parser.add_argument('--clients', default='1,4,16', help='comma-separated concurrency levels')
+    parser.add_argument('--pdf-pages', type=int, default=4)
+    parser.add_argument('--image-size', type=int, default=2048, help='JPEG edge length in pixels')
+    parser.add_argument('--warmup', type=int, default=5)
+    parser.add_argument('--processes', default='0',
+                        help='comma-separated INFERENCE_PROCESSES values to compare')
+    parser.add_argument('--model-size', choices=('tiny', 'base'), default='tiny')
+    parser.add_argument('--output', help='write results as JSON to this path')
+    args = parser.parse_args()
+
+    os.environ.setdefault('HF_HUB_OFFLINE', '1')
+    os.environ.setdefault('TRANSFORMERS_OFFLINE', '1')
+    results = {
+        'benchmark': 'analyze',
+        'environment': environment(),
+        'parameters': vars(args),
+        'results': {f'processes={n}': run(args.requests, [int(c) for c in args.clients.split(',')],
+                                          args.pdf_pages, args.image_size, args.warmup,
+                                          processes=int(n), model_size=args.model_size)
+                    for n in args.processes.split(',')}
+    }
+    write_results(results, args.output)
+
+
+if __name__ == '__main__':
+    main()
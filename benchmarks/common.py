@@ -0,0 +1,137 @@
+"""Shared helpers: throwaway apps, concurrent clients, percentiles, JSON output"""
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+MIGRATIONS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'migrations')
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def latency_summary(latencies_ms: List[float]) -> Dict:
+    return {
+        'count': len(latencies_ms),
+        'mean': sum(latencies_ms) / len(latencies_ms) if latencies_ms else 0.0,
+        'p50': percentile(latencies_ms, 0.50),
+        'p95': percentile(latencies_ms, 0.95),
+        'p99': percentile(latencies_ms, 0.99),
+        'max': max(latencies_ms) if latencies_ms else 0.0
+    }
+
+
+def make_app(overrides: Optional[Dict] = None, directory: Optional[str] = None):
+    """Build the real Flask app on a scratch SQLite database
+
+    ``overrides`` replace Config attributes for this app only. Returns
+    ``(app, directory)``; the directory holds the database and artifacts.
+    """
+    from flask_migrate import upgrade
+    from config import Config
+    from app import create_app
+
+    directory = directory or tempfile.mkdtemp(prefix='bench-')
+    settings = {
+        'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + os.path.join(directory, 'bench.db'),
+        'MODEL_LOAD_MODE': 'lazy',
+        'PREDICTION_CACHE_PATH': '',
+        'ARTIFACT_ROOT': os.path.join(directory, 'artifacts'),
+        'ANALYSIS_JOB_UPLOAD_DIR': os.path.join(directory, 'job_uploads'),
+    }
+    settings.update(overrides or {})
+    previous = {key: getattr(Config, key, None) for key in settings}
+    for key, value in settings.items():
+        setattr(Config, key, value)
+    try:
+        app = create_app()
+    finally:
+        for key, value in previous.items():
+            setattr(Config, key, value)
+    with app.app_context():
+        upgrade(directory=MIGRATIONS)
+    return app, directory
+
+
+def run_clients(app, request: Callable, requests: int, clients: int) -> Dict:
+    """Send ``requests`` calls of ``request(client, i)`` from N client threads
+
+    ``request`` returns the response; latency, status codes and overall
+    throughput are reported.
+    """
+    local = threading.local()
+    latencies = []
+    statuses: Dict[int, int] = {}
+    lock = threading.Lock()
+
+    def send(i):
+        client = getattr(local, 'client', None)
+        if client is None:
+            client = local.client = app.test_client()
+        started = time.perf_counter()
+        response = request(client, i)
+        elapsed = (time.perf_counter() - started) * 1000.0
+        with lock:
+            latencies.append(elapsed)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        list(pool.map(send, range(requests)))
+    elapsed = time.perf_counter() - started
+    return {
+        'clients': clients,
+        'requests': requests,
+        'seconds': elapsed,
+        'requests_per_second': requests / elapsed if elapsed else 0.0,
+        'latency_ms': latency_summary(latencies),
+        'status_codes': {str(code): count for code, count in sorted(statuses.items())}
+    }
+
+
+def timed(function: Callable, repeats: int = 5) -> Dict:
+    """Call ``function`` several times and summarize its latency in ms"""
+    latencies = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        function()
+        latencies.append((time.perf_counter() - started) * 1000.0)
+    return latency_summary(latencies)
+
+
+def environment() -> Dict:
+    """Where and on what a run happened, so results can be compared fairly"""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except Exception:
+        commit = None
+    return {
+        'timestamp': datetime.utcnow().isoformat() + 'Z',
+        'git_commit': commit,
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count()
+    }
+
+
+def write_results(results: Dict, path: Optional[str]):
+    """Print results and optionally write them to a JSON file"""
+    text = json.dumps(results, indent=2, sort_keys=True, default=str)
+    if path:
+        with open(path, 'w') as f:
+            f.write(text + '\n')
+        print(f'Results written to {path}')
+    else:
+        print(text)
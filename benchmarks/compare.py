@@ -0,0 +1,59 @@
+"""Compare two benchmark result files metric by metric
+
+Every numeric leaf is flattened to a dotted path (list items keyed by
+their ``size``/``clients``/``mode`` field when present) and printed with
+the relative change. Example::
+
+    python -m benchmarks.compare baseline.json candidate.json --filter p99
+"""
+import argparse
+import json
+from typing import Dict
+
+LIST_KEYS = ('size', 'clients', 'mode')
+
+
+def flatten(value, prefix: str = '') -> Dict[str, float]:
+    if isinstance(value, bool):
+        return {}
+    if isinstance(value, (int, float)):
+        return {prefix: float(value)}
+    items = {}
+    if isinstance(value, dict):
+        for key, child in value.items():
+            items.update(flatten(child, f'{prefix}.{key}' if prefix else str(key)))
+    elif isinstance(value, list):
+        for index, child in enumerate(value):
+            label = index
+            if isinstance(child, dict):
+                label = next((f'{key}={child[key]}' for key in LIST_KEYS if key in child), index)
+            items.update(flatten(child, f'{prefix}[{label}]'))
+    return items
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('baseline')
+    parser.add_argument('candidate')
+    parser.add_argument('--filter', default='', help='only show paths containing this text')
+    args = parser.parse_args()
+
+    with open(args.baseline) as f:
+        baseline = flatten(json.load(f).get('results', {}))
+    with open(args.candidate) as f:
+        candidate = flatten(json.load(f).get('results', {}))
+
+    width = max((len(path) for path in baseline), default=10)
+    for path in sorted(set(baseline) | set(candidate)):
+        if args.filter not in path:
+            continue
+        old, new = baseline.get(path), candidate.get(path)
+        if old is None or new is None:
+            print(f'{path:<{width}}  {old!s:>12}  {new!s:>12}')
+            continue
+        change = f'{(new - old) / old * 100:+7.1f}%' if old else '      n/a'
+        print(f'{path:<{width}}  {old:12.3f}  {new:12.3f}  {change}')
+
+
+if __name__ == '__main__':
+    main()
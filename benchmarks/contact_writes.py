@@ -0,0 +1,75 @@
+"""Compare POST /api/contact throughput across CONTACT_WRITE_MODE settings
+
+Each mode gets a fresh SQLite database in a temporary directory, and the
+same number of submissions is sent from a pool of client threads through
+the Flask test client. Example::
+
+    python -m benchmarks.contact_writes --requests 2000 --threads 16
+"""
+import argparse
+import json
+import time
+
+from benchmarks.common import make_app, run_clients
+
+
+def run_mode(mode: str, requests: int, threads: int, max_batch: int, max_wait_ms: float) -> dict:
+    from app import db
+    from app.extensions import contact_writer
+    from app.models import Contact
+
+    app, _ = make_app({
+        'CONTACT_WRITE_MODE': mode,
+        'CONTACT_WRITE_MAX_BATCH': max_batch,
+        'CONTACT_WRITE_MAX_WAIT_MS': max_wait_ms,
+    })
+
+    def submit(client, i):
+        return client.post('/api/contact', json={
+            'name': f'Bench User {i}',
+            'email': f'bench{i}@example.com',
+            'message': f'Benchmark submission number {i}'
+        })
+
+    started = time.perf_counter()
+    run = run_clients(app, submit, requests, threads)
+    # async mode acknowledges early; include the time to commit the backlog
+    contact_writer.flush(timeout=60)
+    elapsed = time.perf_counter() - started
+
+    with app.app_context():
+        stored = Contact.query.count()
+        db.engine.dispose()
+    return {
+        'mode': mode,
+        'requests': requests,
+        'threads': threads,
+        'seconds': elapsed,
+        'submissions_per_second': requests / elapsed if elapsed else 0.0,
+        'latency_ms': run['latency_ms'],
+        'status_codes': run['status_codes'],
+        'rows_stored': stored,
+        'writer': contact_writer.stats()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--modes', default='direct,group,async')
+    parser.add_argument('--max-batch', type=int, default=64)
+    parser.add_argument('--max-wait-ms', type=float, default=5.0)
+    args = parser.parse_args()
+
+    results = [run_mode(mode, args.requests, args.threads, args.max_batch, args.max_wait_ms)
+               for mode in args.modes.split(',')]
+    for result in results:
+        print(f"{result['mode']:>7}: {result['submissions_per_second']:8.1f} submissions/s  "
+              f"p50 {result['latency_ms']['p50']:6.1f} ms  p99 {result['latency_ms']['p99']:7.1f} ms  "
+              f"stored {result['rows_stored']}/{result['requests']}  {result['status_codes']}")
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
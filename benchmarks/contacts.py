@@ -0,0 +1,159 @@
+"""Contact create/list/search/export performance as the table grows
+
+One SQLite database is seeded up to each size in ``--sizes`` in turn
+(10^3 .. 10^6 by default). At every size the benchmark measures concurrent
+POST /api/contact throughput and the latency of the admin list API: the
+first page, a conditional GET answered with 304, a page deep into the
+keyset cursor, email/name filters, full-text search, and a full CSV export. Example::
+
+    python -m benchmarks.contacts --sizes 1000,10000,100000 --output contacts.json
+"""
+import argparse
+import base64
+import random
+import time
+from datetime import datetime, timedelta
+
+from benchmarks.common import environment, make_app, run_clients, timed, write_results
+
+ADMIN_USERNAME = 'bench-admin'
+ADMIN_PASSWORD = 'bench-password'
+SEED_CHUNK_SIZE = 10000
+WORDS = ('retina', 'appointment', 'screening', 'results', 'insulin', 'vision', 'clinic',
+         'referral', 'glucose', 'follow-up', 'report', 'question', 'lens', 'exam')
+
+
+def seed_contacts(app, start: int, stop: int, rng: random.Random):
+    """Insert contacts ``start``..``stop - 1`` in large executemany chunks
+
+    Seeding bypasses the API; it only has to be fast and deterministic.
+    created_at advances one minute per row so the keyset index is realistic.
+    """
+    from app import db
+    from app.models import Contact
+    from app.repository import ContactRepository
+
+    epoch = datetime(2020, 1, 1)
+    with app.app_context():
+        for chunk_start in range(start, stop, SEED_CHUNK_SIZE):
+            rows = [{
+                'name': f'Patient {i}',
+                'email': f'patient{i % 50000}@example.com',
+                'message': ' '.join(rng.choice(WORDS) for _ in range(12)),
+                'created_at': epoch + timedelta(minutes=i)
+            } for i in range(chunk_start, min(stop, chunk_start + SEED_CHUNK_SIZE))]
+            db.session.execute(db.insert(Contact), rows)
+            ContactRepository.bump_version()
+            db.session.commit()
+
+
+def _cursor_at(app, offset: int) -> str:
+    """Keyset cursor positioned ``offset`` rows into the newest-first listing"""
+    from app.models import Contact
+    from app.services import encode_cursor
+
+    with app.app_context():
+        row = Contact.query.order_by(Contact.created_at.desc(), Contact.id.desc()) \
+            .offset(offset).limit(1).first()
+    return encode_cursor((row.created_at, row.id))
+
+
+def measure_size(app, size: int, create_requests: int, clients: int, repeats: int) -> dict:
+    token = base64.b64encode(f'{ADMIN_USERNAME}:{ADMIN_PASSWORD}'.encode()).decode()
+    headers = {'Authorization': f'Basic {token}'}
+    client = app.test_client()
+
+    def get(url, expected=200, extra_headers=None):
+        def call():
+            response = client.get(url, headers=dict(headers, **(extra_headers or {})))
+            if response.status_code != expected:
+                raise RuntimeError(f'GET {url} returned {response.status_code}')
+        return call
+
+    etag = client.get('/admin/api/contacts?limit=50', headers=headers).headers['ETag']
+
+    deep_cursor = _cursor_at(app, size // 2)
+    reads = {
+        'list_first_page': get('/admin/api/contacts?limit=50'),
+        'list_not_modified': get('/admin/api/contacts?limit=50', 304, {'If-None-Match': etag}),
+        'list_deep_page': get(f'/admin/api/contacts?limit=50&cursor={deep_cursor}'),
+        'filter_email': get(f'/admin/api/contacts?email=patient{size // 3 % 50000}@example.com'),
+        'filter_name': get('/admin/api/contacts?name=Patient%201'),
+        'search': get('/admin/api/contacts/search?q=retina%20referral&limit=50'),
+    }
+    result = {'size': size, 'reads_ms': {name: timed(call, repeats) for name, call in reads.items()}}
+
+    started = time.perf_counter()
+    response = client.get('/admin/api/contacts/export?format=csv&gzip=0', headers=headers)
+    exported = response.get_data().count(b'\n') - 1
+    elapsed = time.perf_counter() - started
+    result['export'] = {'rows': exported, 'seconds': elapsed,
+                        'rows_per_second': exported / elapsed if elapsed else 0.0}
+
+    def submit(client, i):
+        return client.post('/api/contact', json={
+            'name': f'Bench User {i}',
+            'email': f'bench{i}@example.com',
+            'message': f'Benchmark submission number {i}'
+        })
+
+    result['create'] = run_clients(app, submit, create_requests, clients)
+    return result
+
+
+def run(sizes, create_requests: int, clients: int, repeats: int, write_mode: str,
+        seed: int = 0) -> dict:
+    from app import db
+    from app.auth import hash_password
+    from app.extensions import contact_writer
+    from app.models import Contact, User
+
+    # The rendered-response cache would turn repeated reads into cache hits;
+    # list_not_modified measures the conditional path instead
+    app, directory = make_app({'CONTACT_WRITE_MODE': write_mode, 'PREDICTION_LOG_ENABLED': False,
+                               'CONTACTS_RESPONSE_CACHE_ENABLED': False})
+    with app.app_context():
+        db.session.add(User(username=ADMIN_USERNAME, password=hash_password(ADMIN_PASSWORD)))
+        db.session.commit()
+
+    rng = random.Random(seed)
+    seeded = 0
+    results = []
+    for size in sorted(sizes):
+        started = time.perf_counter()
+        seed_contacts(app, seeded, size, rng)
+        seed_seconds = time.perf_counter() - started
+        seeded = size
+        result = measure_size(app, size, create_requests, clients, repeats)
+        result['seed_seconds'] = seed_seconds
+        contact_writer.flush(timeout=60)
+        # Created rows are counted so the next seed lands on the exact size
+        with app.app_context():
+            seeded = Contact.query.count()
+        results.append(result)
+    return {'write_mode': write_mode, 'database': directory, 'sizes': results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default='1000,10000,100000,1000000',
+                        help='comma-separated table sizes')
+    parser.add_argument('--create-requests', type=int, default=1000)
+    parser.add_argument('--clients', type=int, default=16)
+    parser.add_argument('--repeats', type=int, default=20, help='samples per read query')
+    parser.add_argument('--write-mode', default='direct', help='CONTACT_WRITE_MODE for creates')
+    parser.add_argument('--output', help='write results as JSON to this path')
+    args = parser.parse_args()
+
+    results = {
+        'benchmark': 'contacts',
+        'environment': environment(),
+        'parameters': vars(args),
+        'results': run([int(size) for size in args.sizes.split(',')], args.create_requests,
+                       args.clients, args.repeats, args.write_mode)
+    }
+    write_results(results, args.output)
+
+
+if __name__ == '__main__':
+    main()
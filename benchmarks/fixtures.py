@@ -0,0 +1,88 @@
+"""Deterministic offline inputs: random models, fundus JPEGs and PDFs"""
+import os
+from io import BytesIO
+from typing import List
+
+NUM_LABELS = 5
+
+# ViT shapes: 'tiny' has a few thousand parameters, 'base' the ~86M of
+# ViT-Base/16 (the production checkpoint's architecture) for memory runs
+MODEL_SIZES = {
+    'tiny': dict(patch_size=32, hidden_size=32, num_hidden_layers=2,
+                 num_attention_heads=2, intermediate_size=64),
+    'base': dict(patch_size=16, hidden_size=768, num_hidden_layers=12,
+                 num_attention_heads=12, intermediate_size=3072),
+}
+
+
+def build_model(directory: str, size: str = 'tiny', seed: int = 0) -> str:
+    """Save a randomly initialized ViT classifier + processor; returns its path
+
+    The model has the same interface as the production checkpoint (an
+    image processor plus an AutoModelForImageClassification with stage
+    labels), so MODEL_NAME can point at it with no network access.
+    """
+    import torch
+    from transformers import ViTConfig, ViTForImageClassification, ViTImageProcessor
+
+    path = os.path.join(directory, f'{size}-vit')
+    if os.path.exists(os.path.join(path, 'config.json')):
+        return path
+    torch.manual_seed(seed)
+    config = ViTConfig(
+        image_size=224, num_channels=3,
+        num_labels=NUM_LABELS,
+        id2label={i: str(i) for i in range(NUM_LABELS)},
+        label2id={str(i): i for i in range(NUM_LABELS)},
+        **MODEL_SIZES[size]
+    )
+    model = ViTForImageClassification(config).eval()
+    processor = ViTImageProcessor(size={'height': 224, 'width': 224},
+                                  image_mean=[0.5, 0.5, 0.5], image_std=[0.5, 0.5, 0.5])
+    model.save_pretrained(path)
+    processor.save_pretrained(path)
+    return path
+
+
+def fundus_image(seed: int, size: int = 2048):
+    """A fundus-like RGB image: dark surround, bright textured disc, vessels"""
+    import numpy as np
+    from PIL import Image, ImageDraw
+
+    rng = np.random.default_rng(seed)
+    # Build at a quarter size and upscale; noise at full size would dominate runtime
+    small = size // 4
+    y, x = np.mgrid[0:small, 0:small]
+    disc = ((x - small / 2) ** 2 + (y - small / 2) ** 2) < (small * 0.46) ** 2
+    pixels = rng.integers(0, 25, (small, small, 3))
+    base = np.array([170 + rng.integers(0, 40), 70 + rng.integers(0, 30), 25 + rng.integers(0, 20)])
+    pixels[disc] = np.clip(base + rng.normal(0, 18, (int(disc.sum()), 3)), 0, 255)
+    image = Image.fromarray(pixels.astype('uint8'), 'RGB').resize((size, size))
+
+    draw = ImageDraw.Draw(image)
+    centre = size / 2
+    for _ in range(8):
+        points = [(centre, centre)]
+        for _ in range(6):
+            last_x, last_y = points[-1]
+            points.append((last_x + rng.normal(0, size / 10), last_y + rng.normal(0, size / 10)))
+        draw.line(points, fill=(120, 20, 15), width=max(2, size // 250))
+    return image
+
+
+def fundus_jpegs(count: int, size: int = 2048, quality: int = 90, seed: int = 0) -> List[bytes]:
+    """``count`` distinct fundus-sized JPEG files as bytes"""
+    payloads = []
+    for i in range(count):
+        buffer = BytesIO()
+        fundus_image(seed + i, size).save(buffer, 'JPEG', quality=quality)
+        payloads.append(buffer.getvalue())
+    return payloads
+
+
+def fundus_pdf(pages: int, size: int = 1024, seed: int = 0) -> bytes:
+    """A multi-page PDF with one embedded fundus JPEG per page (a scanned report)"""
+    images = [fundus_image(seed + i, size) for i in range(pages)]
+    buffer = BytesIO()
+    images[0].save(buffer, 'PDF', resolution=150.0, save_all=True, append_images=images[1:])
+    return buffer.getvalue()
@@ -0,0 +1,99 @@
+"""Cold-start time and weight memory of a process loading the model from each source
+
+Every sample is a fresh interpreter that imports the app and runs
+``ImageAnalysisService.initialize_model`` without warm-up or batching. It
+reports the wall time from process start to a loaded model, the load call on
+its own, and VmRSS split into anonymous and file-backed pages. ``hub``
+resolves the model through the Hugging Face cache (and network, if
+reachable); ``registry`` loads the imported artifact from
+``MODEL_REGISTRY_DIR``. Memory-mapped safetensors pages show up as
+``rss_file_mb``: the page cache shares them between processes and the
+kernel can reclaim them, unlike ``rss_anon_mb``. Run ``flask import-model``
+first. Linux only. Example::
+
+    python -m benchmarks.model_load --repeats 5 --output model_load.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from benchmarks.common import environment, write_results
+
+SOURCES = ('hub', 'registry')
+
+
+def _proc_status(field: str) -> int:
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith(field + ':'):
+                return int(line.split()[1]) * 1024
+    return 0
+
+
+def load(source: str, started: float):
+    """Load once and print the measurements as JSON (subprocess entry point)"""
+    from config import Config
+    from app.extensions import model_registry
+    from app.services import ImageAnalysisService
+
+    config = {key: getattr(Config, key) for key in dir(Config) if key.isupper()}
+    config.update({'MODEL_SOURCE': source, 'MODEL_WARMUP_ENABLED': False,
+                   'INFERENCE_BATCHING_ENABLED': False, 'INFERENCE_PROCESSES': 0})
+    model_registry.configure(config)
+    if source == 'registry' and not config.get('MODEL_REVISION'):
+        config['MODEL_REVISION'] = model_registry.current_revision(config['MODEL_NAME'])
+    load_started = time.perf_counter()
+    ImageAnalysisService.initialize_model(config)
+    finished = time.perf_counter()
+    print(json.dumps({
+        'cold_start_seconds': time.time() - started,
+        'load_seconds': finished - load_started,
+        'rss_mb': _proc_status('VmRSS') / 2 ** 20,
+        'rss_anon_mb': _proc_status('RssAnon') / 2 ** 20,
+        'rss_file_mb': _proc_status('RssFile') / 2 ** 20
+    }))
+
+
+def run_source(source: str, repeats: int) -> dict:
+    samples = []
+    for _ in range(repeats):
+        completed = subprocess.run(
+            [sys.executable, '-m', 'benchmarks.model_load', '--child', source,
+             '--started', repr(time.time())],
+            capture_output=True, text=True, env=dict(os.environ))
+        if completed.returncode != 0:
+            return {'error': completed.stderr.strip().splitlines()[-1:] or ['failed']}
+        samples.append(json.loads(completed.stdout.strip().splitlines()[-1]))
+    return {key: {'median': statistics.median(s[key] for s in samples),
+                  'max': max(s[key] for s in samples)}
+            for key in samples[0]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--sources', default=','.join(SOURCES))
+    parser.add_argument('--output', help='write results as JSON to this path')
+    parser.add_argument('--child', choices=SOURCES, help=argparse.SUPPRESS)
+    parser.add_argument('--started', type=float, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        load(args.child, args.started)
+        return
+
+    results = {
+        'benchmark': 'model_load',
+        'environment': environment(),
+        'parameters': {'repeats': args.repeats, 'sources': args.sources},
+        'results': {source: run_source(source, args.repeats) for source in args.sources.split(',')}
+    }
+    write_results(results, args.output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+"""Run the offline benchmark suites and write one JSON file per suite
+
+Example::
+
+    python -m benchmarks.run --output-dir results/$(git rev-parse --short HEAD)
+    python -m benchmarks.run --suites contacts --quick
+"""
+import argparse
+import os
+
+from benchmarks import analyze, contact_writes, contacts
+from benchmarks.common import environment, write_results
+
+SUITES = ('analyze', 'contacts', 'contact_writes')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--suites', default=','.join(SUITES))
+    parser.add_argument('--output-dir', default='benchmark-results')
+    parser.add_argument('--quick', action='store_true', help='small sizes for a smoke run')
+    args = parser.parse_args()
+
+    os.environ.setdefault('HF_HUB_OFFLINE', '1')
+    os.environ.setdefault('TRANSFORMERS_OFFLINE', '1')
+    os.makedirs(args.output_dir, exist_ok=True)
+    quick = args.quick
+    for suite in args.suites.split(','):
+        if suite == 'analyze':
+            results = analyze.run(requests=20 if quick else 200, clients=[1, 4] if quick else [1, 4, 16],
+                                  pdf_pages=2 if quick else 4, image_size=1024 if quick else 2048,
+                                  warmup=2 if quick else 5)
+        elif suite == 'contacts':
+            results = contacts.run(sizes=[1000, 10000] if quick else [1000, 10000, 100000, 1000000],
+                                   create_requests=100 if quick else 1000, clients=16,
+                                   repeats=5 if quick else 20, write_mode='direct')
+        elif suite == 'contact_writes':
+            results = [contact_writes.run_mode(mode, 200 if quick else 2000, 16, 64, 5.0)
+                       for mode in ('direct', 'group', 'async')]
+        else:
+            parser.error(f'Unknown suite: {suite}')
+        write_results({'benchmark': suite, 'environment': environment(),
+                       'parameters': {'quick': quick}, 'results': results},
+                      os.path.join(args.output_dir, f'{suite}.json'))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,204 @@
+"""Peak server RSS while concurrent clients upload large files to /api/analyze
+
+Each configuration runs the app in its own server process, so the numbers
+are not polluted by the client. After one warm-up request per input, the
+server's peak-RSS counter is reset through ``/proc/<pid>/clear_refs``. The
+benchmark then sends ``--clients`` concurrent uploads of each input and
+reads ``VmHWM``. ``RssAnon`` is also sampled every few milliseconds.
+VmHWM includes file-backed pages, such as the page cache behind an mmap of a
+spooled upload, which the kernel can reclaim. Anonymous memory is what
+actually limits how many uploads a worker survives. The per-request figures
+are the peak growth divided by the number of concurrent uploads. ``spooled`` uses the default ingestion path;
+``in_memory`` raises the spool threshold so every upload stays in RAM, as
+before spooling existed. Linux only. Example::
+
+    python -m benchmarks.upload_memory --clients 8 --output upload_memory.json
+"""
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.common import environment, write_results
+from benchmarks.fixtures import fundus_image, fundus_pdf
+
+CONFIGURATIONS = {
+    'spooled': {},
+    'in_memory': {'UPLOAD_SPOOL_THRESHOLD': 1 << 40},
+}
+
+
+def _proc_status(pid: int, field: str) -> int:
+    """A memory field of /proc/<pid>/status in bytes"""
+    with open(f'/proc/{pid}/status') as f:
+        for line in f:
+            if line.startswith(field + ':'):
+                return int(line.split()[1]) * 1024
+    raise KeyError(field)
+
+
+class _AnonSampler(threading.Thread):
+    """Track the highest RssAnon of a process until stopped"""
+
+    def __init__(self, pid: int, interval: float = 0.002):
+        super().__init__(daemon=True)
+        self.pid = pid
+        self.interval = interval
+        self.peak = 0
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            self.peak = max(self.peak, _proc_status(self.pid, 'RssAnon'))
+            time.sleep(self.interval)
+
+    def stop(self) -> int:
+        self._stop_event.set()
+        self.join()
+        return self.peak
+
+
+def _reset_peak(pid: int):
+    with open(f'/proc/{pid}/clear_refs', 'w') as f:
+        f.write('5')
+
+
+def make_inputs(directory: str, image_size: int, pdf_pages: int) -> dict:
+    """Write the large test uploads to disk so the client streams them"""
+    image = fundus_image(0, image_size)
+    paths = {}
+    for name, fmt, options, content_type in (
+            ('jpeg', 'JPEG', {'quality': 98}, 'image/jpeg'),
+            ('tiff', 'TIFF', {}, 'image/tiff')):
+        path = os.path.join(directory, f'upload.{name}')
+        image.save(path, fmt, **options)
+        paths[name] = (path, content_type)
+    path = os.path.join(directory, 'upload.pdf')
+    with open(path, 'wb') as f:
+        f.write(fundus_pdf(pdf_pages, size=image_size // 2))
+    paths['pdf'] = (path, 'application/pdf')
+    return paths
+
+
+def serve(port: int, overrides: dict, model: str):
+    """Run the app on a threaded werkzeug server (subprocess entry point)"""
+    from werkzeug.serving import make_server
+    from benchmarks.common import make_app
+    from benchmarks.fixtures import build_model
+
+    directory = tempfile.mkdtemp(prefix='upload-bench-')
+    if model == 'tiny':
+        overrides = dict(overrides, MODEL_NAME=build_model(directory), MODEL_LOAD_MODE='eager')
+    else:
+        # Requests stop at inference; ingestion and decoding are still measured
+        overrides = dict(overrides, MODEL_NAME=os.path.join(directory, 'no-model'))
+    overrides.update({'PREDICTION_CACHE_ENABLED': False, 'PREDICTION_LOG_ENABLED': False})
+    app, _ = make_app(overrides, directory=directory)
+    make_server('127.0.0.1', port, app, threaded=True).serve_forever()
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def run_configuration(name: str, inputs: dict, clients: int, model: str) -> dict:
+    import requests
+
+    port = _free_port()
+    env = dict(os.environ, HF_HUB_OFFLINE='1', TRANSFORMERS_OFFLINE='1')
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'benchmarks.upload_memory', '--serve', str(port),
+         '--overrides', json.dumps(CONFIGURATIONS[name]), '--model', model],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    base = f'http://127.0.0.1:{port}'
+    try:
+        deadline = time.monotonic() + 120
+        while True:
+            try:
+                requests.get(base + '/healthz', timeout=1)
+                break
+            except requests.ConnectionError:
+                if time.monotonic() > deadline or server.poll() is not None:
+                    raise RuntimeError(f'{name} server did not start')
+                time.sleep(0.2)
+
+        def upload(kind):
+            path, content_type = inputs[kind]
+            with open(path, 'rb') as f:
+                response = requests.post(base + '/api/analyze', timeout=300,
+                                         files={'file': (os.path.basename(path), f, content_type)})
+            return response.status_code
+
+        results = {}
+        for kind in inputs:
+            upload(kind)
+            rss_before = _proc_status(server.pid, 'VmRSS')
+            anon_before = _proc_status(server.pid, 'RssAnon')
+            _reset_peak(server.pid)
+            sampler = _AnonSampler(server.pid)
+            sampler.start()
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=clients) as pool:
+                statuses = list(pool.map(upload, [kind] * clients))
+            elapsed = time.perf_counter() - started
+            anon_growth = max(0, sampler.stop() - anon_before)
+            peak = _proc_status(server.pid, 'VmHWM')
+            growth = max(0, peak - rss_before)
+            results[kind] = {
+                'file_bytes': os.path.getsize(inputs[kind][0]),
+                'clients': clients,
+                'seconds': elapsed,
+                'rss_before_mb': rss_before / 2 ** 20,
+                'peak_rss_mb': peak / 2 ** 20,
+                'peak_growth_mb': growth / 2 ** 20,
+                'peak_growth_per_request_mb': growth / clients / 2 ** 20,
+                'peak_anon_growth_mb': anon_growth / 2 ** 20,
+                'peak_anon_growth_per_request_mb': anon_growth / clients / 2 ** 20,
+                'status_codes': {str(code): statuses.count(code) for code in sorted(set(statuses))}
+            }
+        return results
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--clients', type=int, default=8)
+    parser.add_argument('--image-size', type=int, default=3000, help='edge length of the test image')
+    parser.add_argument('--pdf-pages', type=int, default=12)
+    parser.add_argument('--configurations', default=','.join(CONFIGURATIONS))
+    parser.add_argument('--model', choices=('tiny', 'none'), default='tiny',
+                        help="'none' skips inference (for environments without torch)")
+    parser.add_argument('--output', help='write results as JSON to this path')
+    parser.add_argument('--serve', type=int, help=argparse.SUPPRESS)
+    parser.add_argument('--overrides', default='{}', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.serve, json.loads(args.overrides), args.model)
+        return
+
+    directory = tempfile.mkdtemp(prefix='upload-inputs-')
+    inputs = make_inputs(directory, args.image_size, args.pdf_pages)
+    parameters = {key: value for key, value in vars(args).items() if key not in ('serve', 'overrides')}
+    results = {
+        'benchmark': 'upload_memory',
+        'environment': environment(),
+        'parameters': parameters,
+        'results': {name: run_configuration(name, inputs, args.clients, args.model)
+                    for name in args.configurations.split(',')}
+    }
+    write_results(results, args.output)
+
+
+if __name__ == '__main__':
+    main()
@@ -6,4 +6,211 @@ class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'dev-key-123'
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or \
         'sqlite:///' + os.path.join(basedir, 'instance/app.db')
-    SQLALCHEMY_TRACK_MODIFICATIONS = False
\ No newline at end of file
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+    # Admin passwords are stored as werkzeug hashes ('scrypt' or 'pbkdf2');
+    # verified credentials are cached for AUTH_CACHE_TTL seconds (0 disables)
+    AUTH_HASH_METHOD = os.environ.get('AUTH_HASH_METHOD', 'scrypt')
+    AUTH_CACHE_TTL = float(os.environ.get('AUTH_CACHE_TTL', 300))
+    AUTH_CACHE_MAX_ENTRIES = int(os.environ.get('AUTH_CACHE_MAX_ENTRIES', 1024))
+
+    # Database engine profile (see DB_PROFILES); 'auto' picks sqlite-wal for
+    # SQLite URLs and server for everything else
+    DB_PROFILE = os.environ.get('DB_PROFILE', 'auto')
+    DB_PROFILES = {
+        # SQLite/driver defaults: rollback journal, no pool tuning
+        'default': {'pragmas': {}, 'engine_options': {}},
+        # Readers and the writer no longer block each other; NORMAL sync in
+        # WAL mode is crash-safe but may lose the last commits on power loss
+        'sqlite-wal': {
+            'pragmas': {
+                'journal_mode': 'WAL',
+                'synchronous': 'NORMAL',
+                'busy_timeout': 5000,
+                'cache_size': -64000,  # negative = KiB, i.e. 64 MB
+                'mmap_size': 256 * 1024 * 1024,
+            },
+            'engine_options': {},
+        },
+        # WAL with an fsync on every commit
+        'sqlite-durable': {
+            'pragmas': {
+                'journal_mode': 'WAL',
+                'synchronous': 'FULL',
+                'busy_timeout': 5000,
+                'cache_size': -64000,
+                'mmap_size': 256 * 1024 * 1024,
+            },
+            'engine_options': {},
+        },
+        # PostgreSQL/MySQL connection pool
+        'server': {
+            'pragmas': {},
+            'engine_options': {
+                'pool_size': int(os.environ.get('DB_POOL_SIZE', 10)),
+                'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 20)),
+                'pool_recycle': int(os.environ.get('DB_POOL_RECYCLE', 1800)),
+                'pool_timeout': int(os.environ.get('DB_POOL_TIMEOUT', 30)),
+                'pool_pre_ping': True,
+            },
+        },
+    }
+    # Optional read-only engine (replica, or a second SQLite pool) used by
+    # read-only repository calls
+    DATABASE_READ_URL = os.environ.get('DATABASE_READ_URL')
+
+    # Admin contact listings
+    CONTACTS_PAGE_SIZE = int(os.environ.get('CONTACTS_PAGE_SIZE', 50))
+    CONTACTS_MAX_PAGE_SIZE = int(os.environ.get('CONTACTS_MAX_PAGE_SIZE', 500))
+    CONTACTS_BULK_MAX_ROWS = int(os.environ.get('CONTACTS_BULK_MAX_ROWS', 10000))
+    CONTACTS_EXPORT_BATCH_SIZE = int(os.environ.get('CONTACTS_EXPORT_BATCH_SIZE', 1000))
+    # Rendered list/dashboard responses keyed by contact table version
+    CONTACTS_RESPONSE_CACHE_ENABLED = os.environ.get('CONTACTS_RESPONSE_CACHE_ENABLED', '1') == '1'
+    CONTACTS_RESPONSE_CACHE_MAX_ENTRIES = int(os.environ.get('CONTACTS_RESPONSE_CACHE_MAX_ENTRIES', 256))
+    CONTACTS_RESPONSE_CACHE_MAX_BYTES = int(os.environ.get('CONTACTS_RESPONSE_CACHE_MAX_BYTES', 32 * 1024 * 1024))
+    # Part of every listing ETag, so a deploy that changes the JSON invalidates
+    # what clients hold; empty derives it from the app/ source files
+    APP_BUILD_ID = os.environ.get('APP_BUILD_ID', '')
+
+    # Public contact submissions: 'direct' commits each row, 'group' waits
+    # for a shared group commit, 'async' acknowledges before committing
+    CONTACT_WRITE_MODE = os.environ.get('CONTACT_WRITE_MODE', 'direct')
+    CONTACT_WRITE_MAX_BATCH = int(os.environ.get('CONTACT_WRITE_MAX_BATCH', 64))
+    CONTACT_WRITE_MAX_WAIT_MS = float(os.environ.get('CONTACT_WRITE_MAX_WAIT_MS', 5))
+    CONTACT_WRITE_MAX_QUEUE = int(os.environ.get('CONTACT_WRITE_MAX_QUEUE', 10000))
+    # Seconds a 'group' request waits for its commit before failing
+    CONTACT_WRITE_TIMEOUT = float(os.environ.get('CONTACT_WRITE_TIMEOUT', 5))
+
+    # Uploads: MAX_CONTENT_LENGTH caps the whole request; each file part is
+    # capped by kind while it streams in, and parts over
+    # UPLOAD_SPOOL_THRESHOLD are spooled to UPLOAD_SPOOL_DIR (system temp
+    # directory by default) and decoded from an mmap
+    MAX_CONTENT_LENGTH = int(os.environ.get('MAX_CONTENT_LENGTH', 300 * 1024 * 1024))
+    UPLOAD_MAX_IMAGE_BYTES = int(os.environ.get('UPLOAD_MAX_IMAGE_BYTES', 30 * 1024 * 1024))
+    UPLOAD_MAX_PDF_BYTES = int(os.environ.get('UPLOAD_MAX_PDF_BYTES', 60 * 1024 * 1024))
+    UPLOAD_MAX_ZIP_BYTES = int(os.environ.get('UPLOAD_MAX_ZIP_BYTES', 256 * 1024 * 1024))
+    UPLOAD_MAX_OTHER_BYTES = int(os.environ.get('UPLOAD_MAX_OTHER_BYTES', 20 * 1024 * 1024))
+    UPLOAD_SPOOL_THRESHOLD = int(os.environ.get('UPLOAD_SPOOL_THRESHOLD', 1024 * 1024))
+    UPLOAD_SPOOL_DIR = os.environ.get('UPLOAD_SPOOL_DIR')
+    # Decompression-bomb guard: images with more pixels are rejected unread
+    IMAGE_MAX_PIXELS = int(os.environ.get('IMAGE_MAX_PIXELS', 50_000_000))
+
+    # Image classification model
+    MODEL_NAME = os.environ.get('MODEL_NAME') or 'AsmaaElnagger/Diabetic_RetinoPathy_detection'
+    # Unset with MODEL_SOURCE=registry: the registry's current revision
+    MODEL_REVISION = os.environ.get('MODEL_REVISION')
+    # 'registry': load only from MODEL_REGISTRY_DIR, without network access
+    # (populate it with `flask import-model`); 'hub': Hugging Face Hub/cache
+    MODEL_SOURCE = os.environ.get('MODEL_SOURCE', 'registry')
+    MODEL_REGISTRY_DIR = os.environ.get('MODEL_REGISTRY_DIR') or os.path.join(basedir, 'instance/models')
+    # Check of the artifact at load: 'size' (default), 'checksum' or 'none'
+    MODEL_REGISTRY_VERIFY = os.environ.get('MODEL_REGISTRY_VERIFY', 'size')
+    # 'background': load on a thread once the first request arrives,
+    # 'lazy': load on the first analysis, 'eager': load inside create_app()
+    MODEL_LOAD_MODE = os.environ.get('MODEL_LOAD_MODE', 'background')
+    # Seconds an analysis request waits for a loading model before 503
+    MODEL_LOAD_WAIT = float(os.environ.get('MODEL_LOAD_WAIT', 30))
+
+    # CPU thread budget: CPU_BUDGET cores (0 = all available to this
+    # container) are split evenly among WEB_WORKERS processes on the node
+    # (gunicorn's WEB_CONCURRENCY if unset). TORCH_NUM_THREADS overrides the
+    # computed intra-op thread count of a web process (0 = from the budget).
+    CPU_BUDGET = int(os.environ.get('CPU_BUDGET', 0))
+    WEB_WORKERS = int(os.environ.get('WEB_WORKERS') or os.environ.get('WEB_CONCURRENCY') or 1)
+    TORCH_NUM_THREADS = int(os.environ.get('TORCH_NUM_THREADS', 0))
+    TORCH_INTEROP_THREADS = int(os.environ.get('TORCH_INTEROP_THREADS', 1))
+
+    # Synthetic forward passes at each batch size before /readyz reports ready
+    # ('' = powers of two up to INFERENCE_MAX_BATCH_SIZE)
+    MODEL_WARMUP_ENABLED = os.environ.get('MODEL_WARMUP_ENABLED', '1') == '1'
+    MODEL_WARMUP_BATCH_SIZES = os.environ.get('MODEL_WARMUP_BATCH_SIZES', '')
+    MODEL_WARMUP_ROUNDS = int(os.environ.get('MODEL_WARMUP_ROUNDS', 2))
+    MODEL_WARMUP_TIMEOUT = float(os.environ.get('MODEL_WARMUP_TIMEOUT', 300))
+
+    # Inference micro-batching
+    INFERENCE_BATCHING_ENABLED = os.environ.get('INFERENCE_BATCHING_ENABLED', '1') == '1'
+    INFERENCE_MAX_BATCH_SIZE = int(os.environ.get('INFERENCE_MAX_BATCH_SIZE', 16))
+    INFERENCE_MAX_WAIT_MS = float(os.environ.get('INFERENCE_MAX_WAIT_MS', 10))
+    INFERENCE_MAX_QUEUE_SIZE = int(os.environ.get('INFERENCE_MAX_QUEUE_SIZE', 0))
+
+    # Inference backend: 'eager' (fp32), 'int8' (dynamic quantization),
+    # 'traced' (frozen TorchScript) or 'compiled' (torch.compile). Non-eager
+    # backends are only enabled after passing a parity check against fp32.
+    INFERENCE_BACKEND = os.environ.get('INFERENCE_BACKEND', 'eager')
+    INFERENCE_CHANNELS_LAST = os.environ.get('INFERENCE_CHANNELS_LAST', 'auto')
+    INFERENCE_PARITY_IMAGE_DIR = os.environ.get('INFERENCE_PARITY_IMAGE_DIR')
+    INFERENCE_PARITY_TOLERANCE = float(os.environ.get('INFERENCE_PARITY_TOLERANCE', 0.05))
+    INFERENCE_PARITY_MIN_AGREEMENT = float(os.environ.get('INFERENCE_PARITY_MIN_AGREEMENT', 1.0))
+    # A candidate must also be this many times faster than eager fp32
+    INFERENCE_MIN_SPEEDUP = float(os.environ.get('INFERENCE_MIN_SPEEDUP', 1.1))
+
+    # Vectorized preprocessing (used only if it matches the HF processor
+    # within PREPROCESS_PARITY_ATOL) and reduced-resolution JPEG decoding
+    PREPROCESS_FAST = os.environ.get('PREPROCESS_FAST', '1') == '1'
+    PREPROCESS_DRAFT_DECODE = os.environ.get('PREPROCESS_DRAFT_DECODE', '1') == '1'
+    PREPROCESS_PARITY_ATOL = float(os.environ.get('PREPROCESS_PARITY_ATOL', 1e-4))
+    # Draft decoding is compared with a full decode + HF processor by mean
+    # absolute difference in normalized pixel units
+    PREPROCESS_DRAFT_ATOL = float(os.environ.get('PREPROCESS_DRAFT_ATOL', 0.02))
+
+    # PDF rendering: pages are rasterized individually at the lowest DPI
+    # giving PDF_RENDER_MIN_PIXELS (or the model input size) on the short side
+    PDF_RENDER_MIN_PIXELS = int(os.environ.get('PDF_RENDER_MIN_PIXELS', 512))
+    PDF_RENDER_MIN_DPI = int(os.environ.get('PDF_RENDER_MIN_DPI', 36))
+    PDF_RENDER_MAX_DPI = int(os.environ.get('PDF_RENDER_MAX_DPI', 200))
+    # Most pages one request may select, 'all' included (0 = no limit)
+    PDF_MAX_PAGES = int(os.environ.get('PDF_MAX_PAGES', 50))
+
+    # Multi-process inference with shared-memory weights (0 = in-process);
+    # INFERENCE_PROCESS_THREADS=0 splits the web worker's CPU share among them
+    INFERENCE_PROCESSES = int(os.environ.get('INFERENCE_PROCESSES', 0))
+    INFERENCE_PROCESS_START_METHOD = os.environ.get('INFERENCE_PROCESS_START_METHOD', 'spawn')
+    INFERENCE_PROCESS_THREADS = int(os.environ.get('INFERENCE_PROCESS_THREADS', 0))
+    # Seconds to wait for a pool worker's batch (a dead worker never answers)
+    INFERENCE_PROCESS_TIMEOUT = float(os.environ.get('INFERENCE_PROCESS_TIMEOUT', 60))
+
+    # Batch analysis endpoint
+    ANALYZE_BATCH_MAX_ITEMS = int(os.environ.get('ANALYZE_BATCH_MAX_ITEMS', 1000))
+    ANALYZE_BATCH_WORKERS = int(os.environ.get('ANALYZE_BATCH_WORKERS', 16))
+
+    # Asynchronous analysis jobs ('thread' or 'process' workers)
+    ANALYSIS_JOB_EXECUTOR = os.environ.get('ANALYSIS_JOB_EXECUTOR', 'thread')
+    ANALYSIS_JOB_WORKERS = int(os.environ.get('ANALYSIS_JOB_WORKERS', 2))
+    ANALYSIS_JOB_UPLOAD_DIR = os.environ.get('ANALYSIS_JOB_UPLOAD_DIR')
+    ANALYSIS_JOB_STALE_SECONDS = int(os.environ.get('ANALYSIS_JOB_STALE_SECONDS', 600))
+
+    # Extracted-image artifact store
+    ARTIFACT_ROOT = os.environ.get('ARTIFACT_ROOT') or os.path.join(basedir, 'instance/artifacts')
+    ARTIFACT_MAX_BYTES = int(os.environ.get('ARTIFACT_MAX_BYTES', 1024 ** 3))
+    ARTIFACT_MAX_AGE = int(os.environ.get('ARTIFACT_MAX_AGE', 7 * 24 * 3600))
+    ARTIFACT_SWEEP_INTERVAL = int(os.environ.get('ARTIFACT_SWEEP_INTERVAL', 600))
+    ARTIFACT_CACHE_MAX_AGE = int(os.environ.get('ARTIFACT_CACHE_MAX_AGE', 365 * 24 * 3600))
+
+    # Image URL fetcher
+    FETCH_CONNECT_TIMEOUT = float(os.environ.get('FETCH_CONNECT_TIMEOUT', 5))
+    FETCH_READ_TIMEOUT = float(os.environ.get('FETCH_READ_TIMEOUT', 15))
+    FETCH_TOTAL_TIMEOUT = float(os.environ.get('FETCH_TOTAL_TIMEOUT', 30))
+    FETCH_MAX_BYTES = int(os.environ.get('FETCH_MAX_BYTES', 25 * 1024 * 1024))
+    FETCH_PER_HOST_LIMIT = int(os.environ.get('FETCH_PER_HOST_LIMIT', 4))
+    FETCH_HOST_WAIT = float(os.environ.get('FETCH_HOST_WAIT', 10))
+    FETCH_POOL_SIZE = int(os.environ.get('FETCH_POOL_SIZE', 16))
+    FETCH_CACHE_MAX_ENTRIES = int(os.environ.get('FETCH_CACHE_MAX_ENTRIES', 128))
+    FETCH_CACHE_MAX_BYTES = int(os.environ.get('FETCH_CACHE_MAX_BYTES', 64 * 1024 * 1024))
+
+    # Prometheus metrics at /metrics
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', '1') == '1'
+
+    # Prediction log and its daily/label rollups
+    PREDICTION_LOG_ENABLED = os.environ.get('PREDICTION_LOG_ENABLED', '1') == '1'
+    PREDICTION_LOG_MAX_BATCH = int(os.environ.get('PREDICTION_LOG_MAX_BATCH', 64))
+    PREDICTION_LOG_MAX_WAIT_MS = float(os.environ.get('PREDICTION_LOG_MAX_WAIT_MS', 50))
+    PREDICTION_LOG_MAX_QUEUE = int(os.environ.get('PREDICTION_LOG_MAX_QUEUE', 10000))
+    PREDICTION_STATS_MAX_DAYS = int(os.environ.get('PREDICTION_STATS_MAX_DAYS', 366))
+
+    # Prediction cache (set PREDICTION_CACHE_PATH to '' for memory only)
+    PREDICTION_CACHE_ENABLED = os.environ.get('PREDICTION_CACHE_ENABLED', '1') == '1'
+    PREDICTION_CACHE_MAX_ENTRIES = int(os.environ.get('PREDICTION_CACHE_MAX_ENTRIES', 4096))
+    PREDICTION_CACHE_TTL = int(os.environ.get('PREDICTION_CACHE_TTL', 7 * 24 * 3600))
+    PREDICTION_CACHE_PERSIST_MAX_ENTRIES = int(os.environ.get('PREDICTION_CACHE_PERSIST_MAX_ENTRIES', 100000))
+    PREDICTION_CACHE_PATH = os.environ.get(
+        'PREDICTION_CACHE_PATH', os.path.join(basedir, 'instance/prediction_cache.db'))
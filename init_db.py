@@ -1,12 +1,18 @@
 import os
-from app import create_app, db
+from flask_migrate import upgrade
+from app import create_app, database
 
 app = create_app()
 
 with app.app_context():
     # Ensure instance folder exists
     os.makedirs(app.instance_path, exist_ok=True)
-    
-    # Create all database tables
-    db.create_all()
-    print("Database tables created successfully")
\ No newline at end of file
+
+    # Create or update the tables through the migrations, so the database
+    # is stamped and later `flask db upgrade` runs apply cleanly
+    upgrade(directory=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'migrations'))
+    print("Database tables created successfully")
+    # The journal mode persists in the file, so it is set here once
+    mode = database.set_journal_mode(app)
+    if mode:
+        print(f"journal_mode={mode}")
@@ -0,0 +1,53 @@
+"""Add contact full-text search index
+
+Revision ID: b27e4c9a1f03
+Revises: 8d41f0c2e6b9
+Create Date: 2026-10-18 16:48:20.517034
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b27e4c9a1f03'
+down_revision = '8d41f0c2e6b9'
+branch_labels = None
+depends_on = None
+
+# Copied rather than imported so the migration keeps working if the model changes
+FTS_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS contact_fts USING fts5("
+    "name, email, message, content='contact', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS contact_fts_ai AFTER INSERT ON contact BEGIN "
+    "INSERT INTO contact_fts(rowid, name, email, message) "
+    "VALUES (new.id, new.name, new.email, new.message); END",
+    "CREATE TRIGGER IF NOT EXISTS contact_fts_ad AFTER DELETE ON contact BEGIN "
+    "INSERT INTO contact_fts(contact_fts, rowid, name, email, message) "
+    "VALUES ('delete', old.id, old.name, old.email, old.message); END",
+    "CREATE TRIGGER IF NOT EXISTS contact_fts_au AFTER UPDATE ON contact BEGIN "
+    "INSERT INTO contact_fts(contact_fts, rowid, name, email, message) "
+    "VALUES ('delete', old.id, old.name, old.email, old.message); "
+    "INSERT INTO contact_fts(rowid, name, email, message) "
+    "VALUES (new.id, new.name, new.email, new.message); END",
+]
+
+
+def upgrade():
+    # FTS5 is SQLite-only; other backends use the portable search query
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    for statement in FTS_DDL:
+        op.execute(statement)
+    # Index the rows that existed before the triggers
+    op.execute("INSERT INTO contact_fts(contact_fts) VALUES ('rebuild')")
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    op.execute("DROP TRIGGER IF EXISTS contact_fts_au")
+    op.execute("DROP TRIGGER IF EXISTS contact_fts_ad")
+    op.execute("DROP TRIGGER IF EXISTS contact_fts_ai")
+    op.execute("DROP TABLE IF EXISTS contact_fts")
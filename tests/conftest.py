@@ -0,0 +1,59 @@
+import os
+
+import pytest
+from flask_migrate import upgrade
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MIGRATIONS = os.path.join(ROOT, 'migrations')
+
+
+def build_app(tmp_path, migrate=True, **overrides):
+    """The real app on a scratch SQLite database, migrated to head unless ``migrate`` is false"""
+    from config import Config
+    from app import create_app
+
+    settings = {
+        'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + str(tmp_path / 'test.db'),
+        'MODEL_LOAD_MODE': 'lazy',
+        'PREDICTION_CACHE_PATH': '',
+        'PREDICTION_LOG_ENABLED': False,
+        'ARTIFACT_ROOT': str(tmp_path / 'artifacts'),
+        'ANALYSIS_JOB_UPLOAD_DIR': str(tmp_path / 'job_uploads'),
+        'MODEL_REGISTRY_DIR': str(tmp_path / 'models'),
+    }
+    settings.update(overrides)
+    previous = {key: getattr(Config, key, None) for key in settings}
+    for key, value in settings.items():
+        setattr(Config, key, value)
+    try:
+        app = create_app()
+    finally:
+        for key, value in previous.items():
+            setattr(Config, key, value)
+    app.config['TESTING'] = True
+    if migrate:
+        with app.app_context():
+            upgrade(directory=MIGRATIONS)
+    return app
+
+
+@pytest.fixture
+def app(tmp_path):
+    return build_app(tmp_path)
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+def login_admin(client):
+    """Give a test client an admin session, skipping Basic auth"""
+    with client.session_transaction() as session:
+        session['admin_logged_in'] = True
+    return client
+
+
+@pytest.fixture
+def admin_client(client):
+    return login_admin(client)
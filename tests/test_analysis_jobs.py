@@ -0,0 +1,129 @@
+import os
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+
+from app.extensions import db
+from app.jobs import AnalysisJobQueue
+from app.models import AnalysisJob
+from app.repository import AnalysisJobRepository
+
+
+def _set(job_id, **values):
+    AnalysisJob.query.filter_by(id=job_id).update(values, synchronize_session=False)
+    db.session.commit()
+
+
+def _wait_for(app, job_id, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        with app.app_context():
+            job = AnalysisJobRepository.get_by_id(job_id)
+        if job['status'] in ('succeeded', 'failed'):
+            return job
+        time.sleep(0.02)
+    raise AssertionError(f'job {job_id} did not finish: {job}')
+
+
+def test_a_job_is_claimed_once(app):
+    with app.app_context():
+        AnalysisJobRepository.create('job1', 'url', 'http://example.com/a.jpg')
+        job = AnalysisJobRepository.claim('job1')
+        assert job.status == 'running' and job.attempts == 1 and job.started_at is not None
+        assert AnalysisJobRepository.claim('job1') is None
+        assert AnalysisJobRepository.claim('missing') is None
+
+
+def test_concurrent_claims_have_one_winner(app):
+    with app.app_context():
+        AnalysisJobRepository.create('job1', 'url', 'http://example.com/a.jpg')
+    barrier = threading.Barrier(4)
+    winners = []
+
+    def claim():
+        with app.app_context():
+            barrier.wait()
+            if AnalysisJobRepository.claim('job1') is not None:
+                winners.append(threading.current_thread().name)
+    threads = [threading.Thread(target=claim) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(winners) == 1
+
+
+def test_requeue_recovers_only_stale_running_jobs(app):
+    now = datetime.utcnow()
+    with app.app_context():
+        for job_id in ('stale', 'fresh', 'queued', 'done'):
+            AnalysisJobRepository.create(job_id, 'url', 'http://example.com/a.jpg')
+        _set('stale', status='running', started_at=now - timedelta(seconds=700),
+             created_at=now - timedelta(seconds=800))
+        _set('fresh', status='running', started_at=now - timedelta(seconds=10))
+        _set('done', status='succeeded')
+
+        assert AnalysisJobRepository.requeue_unfinished(600) == ['stale', 'queued']
+        assert AnalysisJobRepository.get_by_id('fresh')['status'] == 'running'
+        assert AnalysisJobRepository.get_by_id('done')['status'] == 'succeeded'
+        # A recovered job counts its next claim as another attempt
+        assert AnalysisJobRepository.claim('stale').attempts == 1
+
+
+def test_finish_records_results_and_errors(app):
+    with app.app_context():
+        for job_id in ('ok', 'bad'):
+            AnalysisJobRepository.create(job_id, 'url', 'http://example.com/a.jpg')
+        AnalysisJobRepository.finish('ok', {'stage': 'Mild'})
+        AnalysisJobRepository.finish('bad', {'error': 'Invalid image URL'})
+        ok, bad = AnalysisJobRepository.get_by_id('ok'), AnalysisJobRepository.get_by_id('bad')
+    assert ok['status'] == 'succeeded' and ok['result'] == {'stage': 'Mild'} and ok['finished_at']
+    assert bad['status'] == 'failed' and bad['error'] == 'Invalid image URL'
+
+
+def test_queue_runs_jobs_and_resumes_after_a_restart(app, monkeypatch):
+    calls = []
+
+    def fake_analyze(source_type, source, content_type=None):
+        calls.append(source)
+        return {'stage': 'No DR', 'source': source}
+    monkeypatch.setattr(sys.modules[AnalysisJobQueue.__module__], 'analyze_source', fake_analyze)
+
+    queue = AnalysisJobQueue()
+    queue.init_app(app)
+    with app.app_context():
+        # Left running by a worker that died, and still waiting in the queue
+        AnalysisJobRepository.create('orphan', 'url', 'http://example.com/a.jpg')
+        _set('orphan', status='running', attempts=1, started_at=datetime.utcnow() - timedelta(hours=1))
+        path = queue.store_upload('upload', b'image bytes')
+        AnalysisJobRepository.create('upload', 'file', path, 'image/jpeg')
+    try:
+        queue.start(app)
+        assert _wait_for(app, 'orphan')['attempts'] == 2
+        assert _wait_for(app, 'upload')['result']['source'] == path
+        assert not os.path.exists(path)
+
+        with app.app_context():
+            AnalysisJobRepository.create('new', 'url', 'http://example.com/b.jpg')
+            queue.enqueue('new')
+        assert _wait_for(app, 'new')['status'] == 'succeeded'
+    finally:
+        queue.shutdown()
+    assert sorted(calls) == sorted(['http://example.com/a.jpg', path, 'http://example.com/b.jpg'])
+
+
+def test_worker_exceptions_fail_the_job(app, monkeypatch):
+    def broken(*args, **kwargs):
+        raise RuntimeError('decoder crashed')
+    monkeypatch.setattr(sys.modules[AnalysisJobQueue.__module__], 'analyze_source', broken)
+    queue = AnalysisJobQueue()
+    queue.init_app(app)
+    try:
+        with app.app_context():
+            AnalysisJobRepository.create('job1', 'url', 'http://example.com/a.jpg')
+            queue.enqueue('job1')
+        job = _wait_for(app, 'job1')
+    finally:
+        queue.shutdown()
+    assert job['status'] == 'failed' and job['error'] == 'decoder crashed'
@@ -0,0 +1,97 @@
+import hashlib
+import os
+import time
+
+from PIL import Image
+
+from app.artifacts import ArtifactStore
+from app.extensions import artifact_store
+
+
+def _store(tmp_path, **settings):
+    store = ArtifactStore()
+    store.configure(dict({'ARTIFACT_ROOT': str(tmp_path / 'artifacts')}, **settings))
+    return store
+
+
+def _image(color):
+    return Image.new('RGB', (64, 64), color)
+
+
+def _age(path, seconds):
+    then = time.time() - seconds
+    os.utime(path, (then, then))
+
+
+def test_names_are_content_hashes_and_duplicates_are_stored_once(tmp_path):
+    store = _store(tmp_path)
+    name = store.save_image(_image('red'))
+    path = store.path_for(name)
+    with open(path, 'rb') as f:
+        assert name == hashlib.sha256(f.read()).hexdigest() + '.jpg'
+    assert os.path.basename(os.path.dirname(path)) == name[:2]
+
+    assert store.save_image(_image('red')) == name
+    assert store.save_image(_image('blue')) != name
+    assert store.stats()['stored'] == 2 and store.stats()['deduplicated'] == 1
+
+
+def test_a_duplicate_save_refreshes_the_age(tmp_path):
+    store = _store(tmp_path)
+    name = store.save_image(_image('red'))
+    _age(store.path_for(name), 3600)
+    store.save_image(_image('red'))
+    assert time.time() - os.path.getmtime(store.path_for(name)) < 60
+
+
+def test_path_for_rejects_anything_but_stored_hashes(tmp_path):
+    store = _store(tmp_path)
+    name = store.save_image(_image('red'))
+    for bad in ['../' + name, name.upper(), name[:-4] + '.png', name[1:], '', None, 'a' * 64 + '.jpg']:
+        assert store.path_for(bad) is None, bad
+    assert store.exists(name)
+
+
+def test_sweep_evicts_expired_files_and_stale_temp_files(tmp_path):
+    store = _store(tmp_path, ARTIFACT_MAX_AGE=3600)
+    old, fresh = store.save_image(_image('red')), store.save_image(_image('blue'))
+    _age(store.path_for(old), 7200)
+    shard = os.path.dirname(store.path_for(fresh))
+    stale_temp, new_temp = os.path.join(shard, 'a.tmp'), os.path.join(shard, 'b.tmp')
+    for path in (stale_temp, new_temp):
+        open(path, 'wb').close()
+    _age(stale_temp, 120)
+
+    assert store.sweep() == 2
+    assert not store.exists(old) and store.exists(fresh)
+    assert not os.path.exists(stale_temp) and os.path.exists(new_temp)
+
+
+def test_sweep_drops_the_oldest_files_beyond_the_size_cap(tmp_path):
+    store = _store(tmp_path)
+    names = [store.save_image(_image(color)) for color in ('red', 'green', 'blue')]
+    for age, name in zip((300, 200, 100), names):
+        _age(store.path_for(name), age)
+    sizes = [os.path.getsize(store.path_for(name)) for name in names]
+    store.max_bytes = sizes[1] + sizes[2]
+
+    assert store.sweep() == 1
+    assert [store.exists(name) for name in names] == [False, True, True]
+
+
+def test_served_artifacts_are_immutable_and_conditional(app, client):
+    with app.app_context():
+        name = artifact_store.save_image(_image('red'))
+    url = f'/temp_images/{name}'
+
+    response = client.get(url)
+    assert response.status_code == 200 and response.mimetype == 'image/jpeg'
+    assert response.headers['ETag'] == f'"{name[:-4]}"'
+    assert 'immutable' in response.headers['Cache-Control']
+
+    assert client.get(url, headers={'If-None-Match': response.headers['ETag']}).status_code == 304
+    partial = client.get(url, headers={'Range': 'bytes=0-9'})
+    assert partial.status_code == 206 and partial.get_data() == response.get_data()[:10]
+
+    assert client.get('/temp_images/' + 'a' * 64 + '.jpg').status_code == 404
+    assert client.get('/temp_images/../config.py').status_code == 404
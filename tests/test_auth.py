@@ -0,0 +1,120 @@
+import sys
+from types import SimpleNamespace
+
+import pytest
+import werkzeug.security
+from werkzeug.datastructures import Authorization
+
+from app.auth import CredentialCache, check_auth, hash_password, is_password_hash
+from app.extensions import credential_cache, db
+from app.models import User
+
+
+def _basic(username, password):
+    return {'Authorization': Authorization('basic', {'username': username, 'password': password}).to_header()}
+
+
+@pytest.fixture
+def admin(app):
+    with app.app_context():
+        db.session.add(User(username='admin', password=hash_password('s3cret-pass')))
+        db.session.commit()
+    credential_cache.invalidate()
+    return 'admin'
+
+
+@pytest.fixture
+def hash_checks(monkeypatch):
+    """Count the slow password-hash verifications"""
+    calls = []
+    original = werkzeug.security.check_password_hash
+
+    def counting(stored, password):
+        calls.append(stored)
+        return original(stored, password)
+    monkeypatch.setattr(werkzeug.security, 'check_password_hash', counting)
+    return calls
+
+
+def test_passwords_are_stored_as_scrypt_hashes(app):
+    with app.app_context():
+        stored = hash_password('s3cret-pass')
+    assert stored.startswith('scrypt:') and is_password_hash(stored)
+    assert not is_password_hash('s3cret-pass') and not is_password_hash(None)
+
+
+def test_basic_auth_accepts_only_the_right_password(client, admin):
+    assert client.get('/admin/api/contacts', headers=_basic(admin, 's3cret-pass')).status_code == 200
+    assert client.get('/admin/api/contacts', headers=_basic(admin, 'wrong')).status_code == 401
+    assert client.get('/admin/api/contacts', headers=_basic('nobody', 's3cret-pass')).status_code == 401
+    assert client.get('/admin/api/contacts').status_code == 401
+
+
+def test_repeat_requests_skip_the_slow_hash(client, admin, hash_checks):
+    for _ in range(3):
+        assert client.get('/admin/api/contacts', headers=_basic(admin, 's3cret-pass')).status_code == 200
+    assert len(hash_checks) == 1
+
+
+def test_wrong_passwords_are_always_verified_and_never_cached(client, admin, hash_checks):
+    client.get('/admin/api/contacts', headers=_basic(admin, 's3cret-pass'))
+    for _ in range(2):
+        assert client.get('/admin/api/contacts', headers=_basic(admin, 'wrong')).status_code == 401
+    assert len(hash_checks) == 3
+
+
+def test_a_password_change_makes_the_cached_entry_unreachable(app, client, admin):
+    assert client.get('/admin/api/contacts', headers=_basic(admin, 's3cret-pass')).status_code == 200
+    with app.app_context():
+        User.query.filter_by(username=admin).one().password = hash_password('n3w-pass')
+        db.session.commit()
+    assert client.get('/admin/api/contacts', headers=_basic(admin, 's3cret-pass')).status_code == 401
+    assert client.get('/admin/api/contacts', headers=_basic(admin, 'n3w-pass')).status_code == 200
+
+
+def test_legacy_plaintext_password_is_hashed_on_login(app):
+    with app.app_context():
+        db.session.add(User(username='legacy', password='plain-pass'))
+        db.session.commit()
+        assert check_auth('legacy', 'plain-pass')
+        assert is_password_hash(User.query.filter_by(username='legacy').one().password)
+        assert check_auth('legacy', 'plain-pass')
+        assert not check_auth('legacy', 'other')
+
+
+def test_hash_passwords_command_upgrades_plaintext(app):
+    with app.app_context():
+        db.session.add(User(username='legacy', password='plain-pass'))
+        db.session.commit()
+    result = app.test_cli_runner().invoke(args=['hash-passwords'])
+    assert 'Hashed 1 plaintext password(s)' in result.output
+    with app.app_context():
+        assert check_auth('legacy', 'plain-pass')
+
+
+def test_cache_entries_expire(monkeypatch):
+    clock = SimpleNamespace(monotonic=lambda: clock.now, now=100.0)
+    monkeypatch.setattr(sys.modules[CredentialCache.__module__], 'time', clock)
+    cache = CredentialCache()
+    cache.ttl = 10
+    cache.add('admin', 'hash', 'pw')
+    assert cache.check('admin', 'hash', 'pw')
+    clock.now += 11
+    assert not cache.check('admin', 'hash', 'pw')
+    assert cache.stats()['entries'] == 0
+
+
+def test_cache_is_bounded_and_can_be_disabled():
+    cache = CredentialCache()
+    cache.max_entries = 2
+    for name in ('a', 'b', 'c'):
+        cache.add(name, 'hash', 'pw')
+    assert not cache.check('a', 'hash', 'pw')
+    assert cache.check('c', 'hash', 'pw')
+
+    cache.invalidate('c')
+    assert not cache.check('c', 'hash', 'pw')
+
+    cache.ttl = 0
+    cache.add('d', 'hash', 'pw')
+    assert not cache.check('d', 'hash', 'pw')
@@ -0,0 +1,45 @@
+import pytest
+
+torch = pytest.importorskip('torch')
+transformers = pytest.importorskip('transformers')
+
+from app.backends import select_backend
+from benchmarks.fixtures import build_model
+
+
+@pytest.fixture(scope='module')
+def vit(tmp_path_factory):
+    path = build_model(str(tmp_path_factory.mktemp('model')))
+    model = transformers.AutoModelForImageClassification.from_pretrained(path).eval()
+    return model, transformers.AutoImageProcessor.from_pretrained(path)
+
+
+def _select(vit, **config):
+    return select_backend(vit[0], vit[1], config)
+
+
+def test_auto_layout_is_measured_and_kept_off_without_a_speedup(vit):
+    # A ViT's patch embedding is a Conv2d; that alone must not enable channels-last
+    backend, channels_last, _, info = _select(vit, INFERENCE_MIN_SPEEDUP=1e9)
+    assert (backend, channels_last) == ('eager', False)
+    assert [(c['backend'], c['channels_last']) for c in info['candidates']] == [('eager', True)]
+    assert 'speedup' in info['candidates'][0]
+
+
+def test_faster_passing_candidate_is_used(vit):
+    backend, channels_last, runner, info = _select(vit, INFERENCE_MIN_SPEEDUP=0)
+    assert (backend, channels_last) == ('eager', True)
+    assert info['channels_last'] is True
+    assert runner(torch.rand(2, 3, 224, 224)).shape == (2, 5)
+
+
+def test_candidate_failing_parity_is_rejected(vit):
+    backend, channels_last, _, info = _select(vit, INFERENCE_BACKEND='int8', INFERENCE_CHANNELS_LAST='0',
+                                              INFERENCE_MIN_SPEEDUP=0, INFERENCE_PARITY_TOLERANCE=-1)
+    assert (backend, channels_last) == ('eager', False)
+    assert info['candidates'][0]['parity']['passed'] is False
+
+
+def test_eager_without_layout_change_skips_measuring(vit):
+    _, _, _, info = _select(vit, INFERENCE_CHANNELS_LAST='0')
+    assert 'candidates' not in info
@@ -0,0 +1,65 @@
+import io
+import json
+import os
+import zipfile
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from app.services import ImageAnalysisService
+from tests.conftest import build_app
+
+THRESHOLD = 4096
+
+
+def _jpeg(size=(256, 256), seed=0):
+    # Noise does not compress, so the file is well above the spool threshold
+    pixels = np.random.default_rng(seed).integers(0, 256, size + (3,), dtype=np.uint8)
+    output = io.BytesIO()
+    Image.fromarray(pixels).save(output, format='JPEG', quality=95)
+    return output.getvalue()
+
+
+@pytest.fixture
+def spool_dir(tmp_path):
+    return str(tmp_path / 'spool')
+
+
+@pytest.fixture
+def client(tmp_path, spool_dir, monkeypatch):
+    app = build_app(tmp_path, UPLOAD_SPOOL_THRESHOLD=THRESHOLD, UPLOAD_SPOOL_DIR=spool_dir)
+
+    def analyze_image(image):
+        return {'prediction': 'No_DR', 'confidence': 1.0, 'size': list(image.size)}
+
+    monkeypatch.setattr(ImageAnalysisService, 'analyze_image', staticmethod(analyze_image))
+    return app.test_client()
+
+
+def test_spooled_parts_stay_readable_while_the_response_streams(client, spool_dir):
+    images = [_jpeg(seed=seed) for seed in range(3)]
+    assert all(len(image) > THRESHOLD for image in images)
+    response = client.post('/api/analyze/batch', data={
+        'files': [(io.BytesIO(image), f'{index}.jpg', 'image/jpeg')
+                  for index, image in enumerate(images)]
+    }, content_type='multipart/form-data')
+    lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    results = [line for line in lines if 'index' in line]
+    assert [result.get('error') for result in results] == [None] * 3
+    assert all(result['size'] == [256, 256] for result in results)
+    assert lines[-1]['summary']['succeeded'] == 3
+    # Released once the response has been streamed
+    assert os.listdir(spool_dir) == []
+
+
+def test_spooled_zip_stays_readable_while_the_response_streams(client):
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, 'w') as zf:
+        for seed in range(3):
+            zf.writestr(f'{seed}.jpg', _jpeg(seed=seed))
+    response = client.post('/api/analyze/batch', data={
+        'file': (io.BytesIO(archive.getvalue()), 'images.zip', 'application/zip')
+    }, content_type='multipart/form-data')
+    lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert lines[-1]['summary']['succeeded'] == 3, lines
@@ -0,0 +1,104 @@
+import io
+import sys
+
+from app.repository import ContactRepository
+
+ROW = {'name': 'Sam Lee', 'email': 'sam@example.com', 'message': 'Hello, a question about screening'}
+
+
+def _names(app):
+    with app.app_context():
+        return sorted(contact['name'] for contact in ContactRepository.get_all())
+
+
+def _version(app):
+    with app.app_context():
+        return ContactRepository.get_version()[0]
+
+
+def test_import_inserts_valid_rows_and_reports_the_rest(app, admin_client):
+    rows = [ROW, dict(ROW, email='not-an-email'), 'oops',
+            dict(ROW, name='Ana', created_at='2024-05-01T08:30:00')]
+    response = admin_client.post('/admin/api/contacts/bulk', json={'contacts': rows})
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['imported'] == 2 and len(body['ids']) == 2
+    assert [error['row'] for error in body['errors']] == [2, 3]
+    assert _names(app) == ['Ana', 'Sam Lee']
+    with app.app_context():
+        assert ContactRepository.get_by_id(body['ids'][1])['created_at'].startswith('2024-05-01T08:30')
+
+
+def test_import_keeps_id_order_across_chunks(app, admin_client, monkeypatch):
+    # Three executemany chunks instead of one
+    monkeypatch.setattr(sys.modules[ContactRepository.__module__]._chunks, '__defaults__', (3,))
+    rows = [dict(ROW, name=f'n{i:02d}') for i in range(8)]
+    body = admin_client.post('/admin/api/contacts/bulk', json=rows).get_json()
+    assert body['imported'] == 8
+    with app.app_context():
+        assert [ContactRepository.get_by_id(contact_id)['name'] for contact_id in body['ids']] == \
+            [row['name'] for row in rows]
+
+
+def test_import_accepts_csv_bodies_and_uploads(app, admin_client):
+    text = 'Name,Email,Message\nSam,sam@example.com,A question about screening\n'
+    response = admin_client.post('/admin/api/contacts/bulk', data=text, content_type='text/csv')
+    assert response.get_json()['imported'] == 1
+
+    upload = io.BytesIO(('﻿' + text.replace('Sam', 'Ana')).encode('utf-8'))
+    response = admin_client.post('/admin/api/contacts/bulk', data={'file': (upload, 'contacts.csv')},
+                                 content_type='multipart/form-data')
+    assert response.get_json()['imported'] == 1
+    assert _names(app) == ['Ana', 'Sam']
+
+    response = admin_client.post('/admin/api/contacts/bulk', data='name,email\nx,y\n', content_type='text/csv')
+    assert response.status_code == 400
+
+
+def test_import_rejects_oversized_and_empty_requests(app, admin_client):
+    app.config['CONTACTS_BULK_MAX_ROWS'] = 2
+    assert admin_client.post('/admin/api/contacts/bulk', json=[ROW] * 3).status_code == 400
+    assert admin_client.post('/admin/api/contacts/bulk', json=[]).status_code == 400
+    assert _names(app) == []
+
+
+def test_a_failed_import_writes_nothing(app, admin_client, monkeypatch):
+    def fail():
+        raise RuntimeError('disk full')
+    monkeypatch.setattr(ContactRepository, 'bump_version', staticmethod(fail))
+    response = admin_client.post('/admin/api/contacts/bulk', json=[ROW, dict(ROW, name='Ana')])
+    assert response.status_code == 500
+    assert _names(app) == []
+
+
+def test_bulk_update_applies_found_rows_and_reports_missing(app, admin_client):
+    ids = admin_client.post('/admin/api/contacts/bulk', json=[ROW, dict(ROW, name='Ana')]).get_json()['ids']
+    version = _version(app)
+    rows = [dict(ROW, id=ids[0], name='Sam Updated'), dict(ROW, id=999999), dict(ROW, id='x'),
+            dict(ROW, id=ids[1], email='bad')]
+    body = admin_client.put('/admin/api/contacts/bulk', json={'contacts': rows}).get_json()
+    assert body['updated'] == 1
+    assert [(error['row'], sorted(error['details'])) for error in body['errors']] == \
+        [(2, ['id']), (3, ['id']), (4, ['email'])]
+    assert _names(app) == ['Ana', 'Sam Updated']
+    assert _version(app) == version + 1
+
+
+def test_bulk_delete_by_ids_and_by_filter(app, admin_client):
+    rows = [ROW, dict(ROW, name='Ana', email='ana@example.com'), dict(ROW, name='Bo', email='bo@example.com')]
+    ids = admin_client.post('/admin/api/contacts/bulk', json=rows).get_json()['ids']
+
+    body = admin_client.delete('/admin/api/contacts/bulk', json={'ids': [ids[0], ids[0], 999999]}).get_json()
+    assert body == {'deleted': 1, 'missing_ids': [999999]}
+
+    body = admin_client.delete('/admin/api/contacts/bulk',
+                               json={'filter': {'email': 'ana@example.com'}}).get_json()
+    assert body['deleted'] == 1
+    assert _names(app) == ['Bo']
+
+
+def test_bulk_delete_never_deletes_everything_by_accident(app, admin_client):
+    admin_client.post('/admin/api/contacts/bulk', json=[ROW])
+    for payload in [{}, {'filter': {}}, {'ids': []}, {'ids': ['x']}, ['x']]:
+        assert admin_client.delete('/admin/api/contacts/bulk', json=payload).status_code == 400, payload
+    assert _names(app) == ['Sam Lee']
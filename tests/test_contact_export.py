@@ -0,0 +1,68 @@
+import csv
+import gzip
+import io
+import json
+
+from app.repository import ContactRepository
+from app.services import export_contacts, gzip_stream
+
+ROWS = [
+    {'name': f'Contact {i}', 'email': f'c{i}@example.com', 'message': f'Message {i}, with "quotes"\nand a newline'}
+    for i in range(5)
+] + [{'name': 'Zoë', 'email': 'zoe@example.org', 'message': 'Ünïcödé message text'}]
+
+
+def _seed(app):
+    with app.app_context():
+        return ContactRepository.bulk_create(ROWS)
+
+
+def test_gzip_export_decompresses_to_every_row(app, admin_client):
+    _seed(app)
+    app.config['CONTACTS_EXPORT_BATCH_SIZE'] = 2
+    response = admin_client.get('/admin/api/contacts/export', headers={'Accept-Encoding': 'gzip'})
+    assert response.status_code == 200
+    assert response.is_streamed
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in response.headers['Vary']
+
+    rows = list(csv.DictReader(io.StringIO(gzip.decompress(response.get_data()).decode('utf-8'))))
+    assert sorted(row['email'] for row in rows) == sorted(row['email'] for row in ROWS)
+    assert {row['message'] for row in rows} == {row['message'] for row in ROWS}
+
+
+def test_export_is_plain_without_gzip_support_or_when_disabled(app, admin_client):
+    _seed(app)
+    for url, headers in [('/admin/api/contacts/export', {}),
+                         ('/admin/api/contacts/export?gzip=0', {'Accept-Encoding': 'gzip'})]:
+        response = admin_client.get(url, headers=headers)
+        assert 'Content-Encoding' not in response.headers
+        assert response.get_data(as_text=True).startswith('id,name,email,message,created_at')
+
+
+def test_ndjson_export_honours_filters(app, admin_client):
+    _seed(app)
+    response = admin_client.get('/admin/api/contacts/export?format=ndjson&email=zoe@example.org')
+    assert response.mimetype == 'application/x-ndjson'
+    lines = response.get_data(as_text=True).splitlines()
+    assert [json.loads(line)['name'] for line in lines] == ['Zoë']
+
+
+def test_export_rejects_unknown_formats(admin_client):
+    assert admin_client.get('/admin/api/contacts/export?format=xlsx').status_code == 400
+
+
+def test_export_yields_one_chunk_per_batch(app):
+    _seed(app)
+    with app.app_context():
+        chunks = list(export_contacts('csv', None, batch_size=2))
+    # The header travels with the first batch; 6 rows make 3 batches
+    assert len(chunks) == 3
+    assert chunks[0].startswith('id,name,')
+
+
+def test_gzip_stream_round_trips_many_chunks():
+    chunks = [f'line {i} ✓\n' * 50 for i in range(200)]
+    compressed = b''.join(gzip_stream(iter(chunks)))
+    assert gzip.decompress(compressed).decode('utf-8') == ''.join(chunks)
+    assert len(compressed) < len(''.join(chunks).encode('utf-8')) // 10
@@ -0,0 +1,32 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import text
+
+from app.extensions import db
+from app.repository import ContactRepository
+
+AFTER = (datetime(2024, 1, 1), 5)
+
+
+def _plan(query):
+    """SQLite's EXPLAIN QUERY PLAN details for a select"""
+    sql = str(query.compile(db.engine, compile_kwargs={'literal_binds': True}))
+    return [row[-1] for row in db.session.execute(text('EXPLAIN QUERY PLAN ' + sql))]
+
+
+@pytest.mark.parametrize('after', [None, AFTER])
+def test_page_query_walks_created_at_index(app, after):
+    with app.app_context():
+        plan = _plan(ContactRepository.page_query(10, after))
+    assert any('ix_contact_created_at_id' in step for step in plan), plan
+    assert not any('TEMP B-TREE' in step for step in plan), plan
+
+
+@pytest.mark.parametrize('after', [None, AFTER])
+def test_email_page_query_uses_email_index(app, after):
+    with app.app_context():
+        plan = _plan(ContactRepository.page_query(10, after, {'email': 'a@example.com'}))
+    assert any('ix_contact_email_created_at' in step for step in plan), plan
+    assert not any('TEMP B-TREE' in step for step in plan), plan
+    assert not any(step.startswith('SCAN contact') for step in plan), plan
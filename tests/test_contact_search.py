@@ -0,0 +1,87 @@
+import pytest
+
+from app.repository import ContactRepository
+from app.services import SearchContactsUseCase
+
+CONTACTS = [
+    {'name': 'Retina Clinic', 'email': 'clinic@example.com', 'message': 'Referral question'},
+    {'name': 'Sam Lee', 'email': 'sam@example.com', 'message': 'Is retinopathy screening covered?'},
+    {'name': 'Ana Diaz', 'email': 'ana@example.com', 'message': 'Upload failed <b>twice</b> for my retina scan'},
+    {'name': 'Bo Chen', 'email': 'bo@example.com', 'message': 'Discount of 100% off_label?'},
+]
+
+
+@pytest.fixture(params=['fts', 'like'])
+def search(app, request, monkeypatch):
+    """Run each test against the FTS5 index and the portable LIKE fallback"""
+    if request.param == 'like':
+        monkeypatch.setattr(ContactRepository, 'fts_available', staticmethod(lambda: False))
+    with app.app_context():
+        ContactRepository.bulk_create(CONTACTS)
+        yield lambda query, limit=10, offset=0: SearchContactsUseCase.execute(query, limit, offset)
+
+
+def _names(result):
+    return sorted(contact['name'] for contact in result['results'])
+
+
+def test_terms_match_as_prefixes(search):
+    assert _names(search('retin')) == ['Ana Diaz', 'Retina Clinic', 'Sam Lee']
+
+
+def test_every_term_must_match(search):
+    assert _names(search('retina scan')) == ['Ana Diaz']
+    assert search('retina nonexistent')['total'] == 0
+
+
+def test_only_the_fts_path_scores(search, request):
+    scores = {contact['score'] for contact in search('retin')['results']}
+    if request.node.callspec.params['search'] == 'fts':
+        assert all(isinstance(score, float) for score in scores)
+    else:
+        assert scores == {None}
+
+
+def test_snippets_are_escaped_and_marked(search):
+    snippet = search('twice')['results'][0]['snippet']
+    assert '<mark>twice</mark>' in snippet
+    assert '&lt;b&gt;' in snippet and '<b>' not in snippet
+
+
+def test_query_syntax_is_treated_as_text(search):
+    for query in ['"OR" NEAR(', 'retina*', '100% off_label', 'name:sam']:
+        result = search(query)
+        assert 'error' not in result, query
+    assert _names(search('100% off_label')) == ['Bo Chen']
+
+
+def test_results_are_paged(search):
+    first = search('retin', limit=2)
+    assert first['total'] == 3 and len(first['results']) == 2 and first['next_offset'] == 2
+    rest = search('retin', limit=2, offset=2)
+    assert len(rest['results']) == 1 and rest['next_offset'] is None
+    assert sorted(_names(first) + _names(rest)) == ['Ana Diaz', 'Retina Clinic', 'Sam Lee']
+
+
+def test_query_without_words_is_rejected(search):
+    assert search('  %% ')['error'] == 'Validation failed'
+
+
+def test_fts_ranks_name_hits_first_and_follows_writes(app):
+    with app.app_context():
+        ids = ContactRepository.bulk_create(CONTACTS)
+        results = SearchContactsUseCase.execute('retina', 10)['results']
+        assert results[0]['name'] == 'Retina Clinic'
+        assert results[0]['score'] > results[1]['score']
+
+        # The triggers keep the index in step with updates and deletes
+        ContactRepository.update(ids[0], dict(CONTACTS[0], name='Eye Clinic'))
+        ContactRepository.delete(ids[2])
+        assert _names(SearchContactsUseCase.execute('retina', 10)) == []
+        assert _names(SearchContactsUseCase.execute('eye', 10)) == ['Eye Clinic']
+
+
+def test_search_route_validates_paging(admin_client):
+    assert admin_client.get('/admin/api/contacts/search?q=x&limit=ten').status_code == 400
+    assert admin_client.get('/admin/api/contacts/search?q=').status_code == 400
+    assert admin_client.get('/admin/api/contacts/search?q=retina').status_code == 200
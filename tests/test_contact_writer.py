@@ -0,0 +1,37 @@
+import time
+
+from app.extensions import contact_writer, db
+from app.models import Contact
+from app.repository import ContactRepository
+from tests.conftest import build_app
+
+CONTACT = {'name': 'Ada', 'email': 'ada@example.com', 'message': 'Please call me back'}
+
+
+def test_group_write_past_timeout_is_reported_queued_and_commits_once(tmp_path, monkeypatch):
+    app = build_app(tmp_path, CONTACT_WRITE_MODE='group', CONTACT_WRITE_TIMEOUT=0.1)
+    bulk_create = ContactRepository.bulk_create
+
+    def slow_bulk_create(rows):
+        time.sleep(0.5)
+        return bulk_create(rows)
+
+    monkeypatch.setattr(ContactRepository, 'bulk_create', staticmethod(slow_bulk_create))
+    try:
+        response = app.test_client().post('/api/contact', json=CONTACT)
+        assert response.status_code == 202
+        assert response.get_json()['queued'] is True
+    finally:
+        contact_writer.flush()
+    with app.app_context():
+        assert db.session.query(Contact).filter_by(email=CONTACT['email']).count() == 1
+
+
+def test_group_write_returns_the_committed_contact(tmp_path):
+    app = build_app(tmp_path, CONTACT_WRITE_MODE='group')
+    try:
+        response = app.test_client().post('/api/contact', json=CONTACT)
+    finally:
+        contact_writer.flush()
+    assert response.status_code == 201
+    assert response.get_json()['contact']['email'] == CONTACT['email']
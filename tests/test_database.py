@@ -0,0 +1,35 @@
+from sqlalchemy import text
+
+from app import database
+from app.extensions import db
+from tests.conftest import build_app
+
+
+def test_create_app_does_not_open_the_database(tmp_path):
+    build_app(tmp_path, migrate=False)
+    # SQLite creates the file on first connect
+    assert not (tmp_path / 'test.db').exists()
+
+
+def test_describe_reports_the_profile_without_connecting(tmp_path):
+    app = build_app(tmp_path, migrate=False)
+    line = database.describe(app)
+    assert 'profile=sqlite-wal' in line
+    assert 'journal_mode=WAL' in line
+    assert not (tmp_path / 'test.db').exists()
+
+
+def test_connections_leave_the_journal_mode_alone(app):
+    with app.app_context():
+        assert db.session.execute(text('PRAGMA journal_mode')).scalar() == 'delete'
+        # Per-connection settings are still applied
+        assert db.session.execute(text('PRAGMA busy_timeout')).scalar() == 5000
+
+
+def test_set_journal_mode_command_switches_to_wal(app):
+    result = app.test_cli_runner().invoke(args=['set-journal-mode'])
+    assert result.exit_code == 0, result.output
+    assert 'journal_mode=wal' in result.output
+    with app.app_context():
+        db.engine.dispose()
+        assert db.session.execute(text('PRAGMA journal_mode')).scalar() == 'wal'
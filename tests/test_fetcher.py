@@ -0,0 +1,129 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app.fetcher import FetchError, ImageFetcher
+
+BODY = b'\xff\xd8' + b'x' * 4096
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Local image host; the path picks the behaviour"""
+
+    protocol_version = 'HTTP/1.1'
+    requests_seen = []
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body=b'', headers=()):
+        self.send_response(status)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        self.requests_seen.append((self.path, dict(self.headers)))
+        if self.path == '/etag.jpg':
+            if self.headers.get('If-None-Match') == '"v1"':
+                self._send(304, headers=[('ETag', '"v1"')])
+            else:
+                self._send(200, BODY, [('Content-Type', 'image/jpeg'), ('ETag', '"v1"')])
+        elif self.path == '/modified.jpg':
+            stamp = 'Wed, 01 Jan 2025 00:00:00 GMT'
+            if self.headers.get('If-Modified-Since') == stamp:
+                self._send(304)
+            else:
+                self._send(200, BODY, [('Content-Type', 'image/jpeg'), ('Last-Modified', stamp)])
+        elif self.path == '/large.jpg':
+            self._send(200, b'x' * 200_000, [('Content-Type', 'image/jpeg')])
+        elif self.path == '/large-undeclared.jpg':
+            # Close-delimited body: no Content-Length to reject up front
+            self.send_response(200)
+            self.send_header('Connection', 'close')
+            self.end_headers()
+            self.wfile.write(b'x' * 200_000)
+            self.close_connection = True
+        elif self.path == '/drip.jpg':
+            # One byte just inside the read timeout, far beyond the deadline
+            self.send_response(200)
+            self.send_header('Content-Length', '40')
+            self.end_headers()
+            try:
+                for _ in range(40):
+                    self.wfile.write(b'x')
+                    self.wfile.flush()
+                    time.sleep(0.2)
+            except OSError:
+                pass
+        elif self.path == '/slow.jpg':
+            time.sleep(1.0)
+            self._send(200, BODY, [('Content-Type', 'image/jpeg')])
+        else:
+            self._send(404)
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), StandInHandler)
+    httpd.daemon_threads = True
+    StandInHandler.requests_seen = []
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{httpd.server_address[1]}'
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def _fetcher(**settings):
+    fetcher = ImageFetcher()
+    fetcher.configure(dict({'FETCH_MAX_BYTES': 100_000, 'FETCH_READ_TIMEOUT': 2,
+                            'FETCH_TOTAL_TIMEOUT': 5}, **settings))
+    return fetcher
+
+
+@pytest.mark.parametrize('path', ['/large.jpg', '/large-undeclared.jpg'])
+def test_byte_cap(server, path):
+    fetcher = _fetcher()
+    with pytest.raises(FetchError, match='exceeds 100000 bytes'):
+        fetcher.fetch(server + path)
+    assert fetcher.stats()['oversize_aborts'] == 1
+
+
+def test_deadline_holds_against_a_dripping_server(server):
+    fetcher = _fetcher(FETCH_READ_TIMEOUT=1, FETCH_TOTAL_TIMEOUT=1)
+    started = time.monotonic()
+    with pytest.raises(FetchError, match='longer than 1s'):
+        fetcher.fetch(server + '/drip.jpg')
+    assert time.monotonic() - started < 2
+
+
+def test_per_host_limit(server):
+    fetcher = _fetcher(FETCH_PER_HOST_LIMIT=1, FETCH_HOST_WAIT=0.2)
+    holder = threading.Thread(target=fetcher.fetch, args=(server + '/slow.jpg',))
+    holder.start()
+    time.sleep(0.2)
+    try:
+        with pytest.raises(FetchError, match='Too many concurrent downloads'):
+            fetcher.fetch(server + '/etag.jpg')
+    finally:
+        holder.join()
+    # The slot is free again once the first download is done
+    assert fetcher.fetch(server + '/etag.jpg').content == BODY
+
+
+@pytest.mark.parametrize('path, header', [('/etag.jpg', 'If-None-Match'),
+                                          ('/modified.jpg', 'If-Modified-Since')])
+def test_revalidation(server, path, header):
+    fetcher = _fetcher()
+    first = fetcher.fetch(server + path)
+    second = fetcher.fetch(server + path)
+    assert (first.from_cache, second.from_cache) == (False, True)
+    assert second.content == BODY and second.content_type == 'image/jpeg'
+    assert header not in StandInHandler.requests_seen[0][1]
+    assert header in StandInHandler.requests_seen[1][1]
+    assert fetcher.stats()['revalidated'] == 1
@@ -0,0 +1,32 @@
+import time
+
+import pytest
+
+from app.imaging import parse_page_selection
+
+
+def test_selection_forms():
+    assert parse_page_selection(None, 3) == [1]
+    assert parse_page_selection('2', 3) == [2]
+    assert parse_page_selection('3,1-2,2', 3) == [1, 2, 3]
+    assert parse_page_selection('all', 3) == [1, 2, 3]
+
+
+@pytest.mark.parametrize('selection', ['0', '4', '1-4', '3-2', '0-1'])
+def test_out_of_range_selection_is_rejected(selection):
+    with pytest.raises(ValueError):
+        parse_page_selection(selection, 3)
+
+
+def test_huge_range_is_rejected_before_expanding():
+    started = time.perf_counter()
+    with pytest.raises(ValueError):
+        parse_page_selection('1-999999999', 3)
+    assert time.perf_counter() - started < 0.1
+
+
+def test_page_limit_applies_to_ranges_lists_and_all():
+    assert parse_page_selection('1-5', 100, max_pages=5) == [1, 2, 3, 4, 5]
+    for selection in ('1-6', '1-3,5,7,9', 'all'):
+        with pytest.raises(ValueError, match='limit 5'):
+            parse_page_selection(selection, 100, max_pages=5)
@@ -0,0 +1,49 @@
+import os
+import signal
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+torch = pytest.importorskip('torch')
+
+from app.inference_pool import InferencePool
+
+
+class SlowClassifier(torch.nn.Module):
+    """Two-class stand-in; inputs starting with a negative value block for a minute"""
+
+    def __init__(self):
+        super().__init__()
+        self.linear = torch.nn.Linear(4, 2)
+
+    def forward(self, pixel_values):
+        if pixel_values[0, 0] < 0:
+            time.sleep(60)
+        return SimpleNamespace(logits=self.linear(pixel_values))
+
+
+@pytest.fixture
+def pool():
+    pool = InferencePool(SlowClassifier(), workers=1, start_method='spawn', timeout=5)
+    assert pool.wait_ready(60)
+    yield pool
+    pool.close()
+
+
+def test_predict_returns_softmax_rows(pool):
+    rows = pool.predict(torch.ones(3, 4))
+    assert rows.shape == (3, 2)
+    assert torch.allclose(rows.sum(dim=1), torch.ones(3))
+
+
+def test_dead_worker_times_out_instead_of_hanging(pool):
+    pid = pool.worker_pids()[0]
+    threading.Timer(1.0, os.kill, (pid, signal.SIGKILL)).start()
+    started = time.monotonic()
+    with pytest.raises(TimeoutError):
+        pool.predict(-torch.ones(1, 4))
+    assert time.monotonic() - started < 10
+    # The pool has replaced the worker and keeps serving
+    assert pool.predict(torch.ones(1, 4)).shape == (1, 2)
@@ -0,0 +1,30 @@
+import pytest
+
+from app.extensions import metrics
+
+
+def _count(status):
+    return metrics.requests._values.get(('none', 'GET', status), 0.0)
+
+
+@pytest.mark.parametrize('propagate', [True, False])
+def test_unhandled_exception_is_counted_as_500(app, propagate):
+    @app.route('/boom')
+    def boom():
+        raise RuntimeError('boom')
+
+    app.config['PROPAGATE_EXCEPTIONS'] = propagate
+    before = _count('500')
+    client = app.test_client()
+    if propagate:
+        with pytest.raises(RuntimeError):
+            client.get('/boom')
+    else:
+        assert client.get('/boom').status_code == 500
+    assert _count('500') == before + 1
+
+
+def test_response_status_is_counted(client):
+    before = _count('404')
+    client.get('/no-such-page')
+    assert _count('404') == before + 1
@@ -0,0 +1,91 @@
+import shutil
+from datetime import datetime
+
+import sqlalchemy as sa
+from alembic.config import Config
+from alembic.script import ScriptDirectory
+from flask_migrate import upgrade
+
+from app.extensions import db
+from app.repository import ContactRepository
+from tests.conftest import MIGRATIONS, ROOT, build_app
+
+HEAD_TABLES = {'contact', 'user', 'analysis_job', 'prediction_log', 'prediction_daily_stat',
+               'prediction_confidence_bin', 'table_version', 'contact_fts'}
+HEAD_INDEXES = {'ix_contact_created_at_id', 'ix_contact_email_created_at', 'ix_contact_name'}
+BASELINE_REVISION = 'fa5dc27548ba'
+
+
+def _head():
+    config = Config()
+    config.set_main_option('script_location', MIGRATIONS)
+    return ScriptDirectory.from_config(config).get_current_head()
+
+
+def _baseline_copy(tmp_path):
+    """Copy of the shipped database, which is at the first revision"""
+    database = tmp_path / 'baseline.db'
+    shutil.copy(f'{ROOT}/instance/app.db', database)
+    return database, sa.create_engine(f'sqlite:///{database}')
+
+
+def _assert_at_head(engine):
+    inspector = sa.inspect(engine)
+    assert HEAD_TABLES <= set(inspector.get_table_names())
+    assert HEAD_INDEXES <= {index['name'] for index in inspector.get_indexes('contact')}
+    columns = {column['name']: column for column in inspector.get_columns('user')}
+    assert columns['password']['type'].length == 255
+    columns = {column['name']: column for column in inspector.get_columns('contact')}
+    assert not columns['created_at']['nullable']
+    with engine.connect() as connection:
+        assert connection.execute(sa.text('SELECT version_num FROM alembic_version')).scalar() == _head()
+        assert connection.execute(
+            sa.text("SELECT version FROM table_version WHERE name = 'contact'")).scalar() == 0
+
+
+def test_baseline_database_upgrades_to_head(tmp_path):
+    database, engine = _baseline_copy(tmp_path)
+    with engine.connect() as connection:
+        assert connection.execute(sa.text('SELECT version_num FROM alembic_version')).scalar() == BASELINE_REVISION
+
+    app = build_app(tmp_path, migrate=False, SQLALCHEMY_DATABASE_URI=f'sqlite:///{database}')
+    with app.app_context():
+        upgrade(directory=MIGRATIONS)
+    _assert_at_head(engine)
+
+
+def test_app_start_does_not_create_tables(tmp_path):
+    database, engine = _baseline_copy(tmp_path)
+    app = build_app(tmp_path, migrate=False, SQLALCHEMY_DATABASE_URI=f'sqlite:///{database}')
+    app.test_client().get('/healthz')
+    assert set(sa.inspect(engine).get_table_names()) == {'alembic_version', 'contact', 'user'}
+
+
+def test_null_created_at_is_backfilled_before_not_null(tmp_path):
+    app = build_app(tmp_path, migrate=False)
+    with app.app_context():
+        upgrade(directory=MIGRATIONS, revision='9c3d5e7f1a20')
+        contact = sa.table('contact', *(sa.column(name) for name in ('name', 'email', 'message')),
+                           sa.column('created_at', sa.DateTime()))
+        db.session.execute(contact.insert(), [
+            {'name': 'a', 'email': 'a@example.com', 'message': 'dated', 'created_at': datetime(2024, 1, 1)},
+            {'name': 'b', 'email': 'b@example.com', 'message': 'undated', 'created_at': None},
+            {'name': 'c', 'email': 'c@example.com', 'message': 'dated', 'created_at': datetime(2024, 2, 1)},
+            {'name': 'd', 'email': 'd@example.com', 'message': 'undated', 'created_at': None},
+        ])
+        db.session.commit()
+
+        upgrade(directory=MIGRATIONS)
+        assert db.session.execute(
+            sa.text('SELECT COUNT(*) FROM contact WHERE created_at IS NULL')).scalar() == 0
+        # A page boundary on a backfilled row still yields a usable cursor
+        batches = list(ContactRepository.iter_batches(batch_size=1))
+        assert sorted(row['name'] for batch in batches for row in batch) == ['a', 'b', 'c', 'd']
+
+        # The table rebuild kept the full-text triggers
+        db.session.execute(contact.insert(), [
+            {'name': 'e', 'email': 'e@example.com', 'message': 'retinopathy', 'created_at': datetime(2024, 3, 1)},
+        ])
+        db.session.commit()
+        assert db.session.execute(
+            sa.text("SELECT COUNT(*) FROM contact_fts WHERE contact_fts MATCH 'retinopathy'")).scalar() == 1
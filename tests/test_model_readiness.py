@@ -0,0 +1,36 @@
+import pytest
+from PIL import Image
+
+from app.services import ImageAnalysisService, ModelNotReadyError
+
+
+@pytest.fixture
+def half_loaded(monkeypatch):
+    """The state mid-way through initialize_model: weights set, runner and batcher not yet"""
+    monkeypatch.setattr(ImageAnalysisService, '_model', object())
+    monkeypatch.setattr(ImageAnalysisService, '_processor', object())
+    monkeypatch.setattr(ImageAnalysisService, '_runner', None)
+    monkeypatch.setattr(ImageAnalysisService, '_batcher', None)
+    monkeypatch.setattr(ImageAnalysisService, '_load_state', 'warming')
+    monkeypatch.setattr(ImageAnalysisService, '_config', {'MODEL_LOAD_WAIT': 0.01})
+    monkeypatch.setattr(ImageAnalysisService, 'start_background_load', classmethod(lambda cls: None))
+    ImageAnalysisService._loaded.clear()
+
+
+def test_analyze_image_waits_for_ready(half_loaded):
+    with pytest.raises(ModelNotReadyError):
+        ImageAnalysisService.analyze_image(Image.new('RGB', (8, 8)))
+
+
+def test_analyze_images_waits_for_ready(half_loaded):
+    with pytest.raises(ModelNotReadyError):
+        ImageAnalysisService.analyze_images([Image.new('RGB', (8, 8))])
+
+
+def test_analyze_endpoint_returns_503_while_loading(client, half_loaded):
+    import io
+    buffer = io.BytesIO()
+    Image.new('RGB', (8, 8)).save(buffer, 'PNG')
+    response = client.post('/api/analyze', data={'file': (io.BytesIO(buffer.getvalue()), 'eye.png', 'image/png')},
+                           content_type='multipart/form-data')
+    assert response.status_code == 503
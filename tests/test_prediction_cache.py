@@ -0,0 +1,35 @@
+from app.prediction_cache import PredictionCache, inference_identity
+
+CONFIG = {'MODEL_NAME': 'org/model', 'MODEL_REVISION': 'abc123', 'PREDICTION_CACHE_PATH': ''}
+
+
+def _key(**settings):
+    cache = PredictionCache()
+    cache.configure(dict(CONFIG, **settings))
+    return cache.make_key(b'fundus')
+
+
+def test_key_depends_on_backend():
+    assert _key(INFERENCE_BACKEND='eager') != _key(INFERENCE_BACKEND='int8')
+
+
+def test_key_depends_on_preprocessing():
+    keys = {_key(PREPROCESS_FAST=True, PREPROCESS_DRAFT_DECODE=True),
+            _key(PREPROCESS_FAST=True, PREPROCESS_DRAFT_DECODE=False),
+            _key(PREPROCESS_FAST=False, PREPROCESS_DRAFT_DECODE=True)}
+    assert len(keys) == 3
+
+
+def test_key_follows_the_active_backend():
+    # int8 requested but rejected by the parity check: results come from fp32
+    cache = PredictionCache()
+    cache.configure(dict(CONFIG, INFERENCE_BACKEND='int8'))
+    cache.set_inference_identity(inference_identity('eager', True, True))
+    assert cache.make_key(b'fundus') == _key(INFERENCE_BACKEND='eager')
+
+
+def test_key_from_input_digest_matches_key_from_bytes():
+    from app.prediction_log import input_hash
+    cache = PredictionCache()
+    cache.configure(CONFIG)
+    assert cache.key_for_hash(input_hash(b'fundus'), 'pages=1') == cache.make_key(b'fundus', 'pages=1')
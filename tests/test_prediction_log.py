@@ -0,0 +1,33 @@
+import sys
+import threading
+import time
+
+from app.prediction_log import MicroBatcher, PredictionLog
+
+
+def test_concurrent_first_records_share_one_batcher(monkeypatch):
+    class SlowBatcher(MicroBatcher):
+        def __init__(self, *args, **kwargs):
+            # Widen the window between the None check and the assignment
+            time.sleep(0.05)
+            super().__init__(*args, **kwargs)
+
+    monkeypatch.setattr(sys.modules[PredictionLog.__module__], 'MicroBatcher', SlowBatcher)
+    log = PredictionLog()
+    log.configure({'PREDICTION_LOG_MAX_WAIT_MS': 1})
+    start = threading.Barrier(8)
+    batchers = []
+
+    def first_record():
+        start.wait()
+        batchers.append(log._get_batcher())
+
+    threads = [threading.Thread(target=first_record) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    try:
+        assert len({id(batcher) for batcher in batchers}) == 1
+    finally:
+        log.flush()
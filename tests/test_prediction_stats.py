@@ -0,0 +1,23 @@
+import pytest
+
+from app.services import GetPredictionStatsUseCase
+
+
+@pytest.mark.parametrize('args', [
+    {'days': '1000000'},
+    {'days': '99999999999'},
+    {'days': '0'},
+    {'days': '-3'},
+    {'days': 'week'},
+    {'to': '0001-01-03', 'days': '30'},
+])
+def test_out_of_range_days_are_rejected(app, args):
+    with app.app_context():
+        result = GetPredictionStatsUseCase.execute(args, max_days=366)
+    assert result['error'] == 'Validation failed'
+
+
+def test_days_within_limit_are_served(app):
+    with app.app_context():
+        result = GetPredictionStatsUseCase.execute({'days': '7'}, max_days=366)
+    assert 'error' not in result
@@ -0,0 +1,70 @@
+import io
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from app.backends import reference_images
+from app.imaging import load_image
+from app.preprocess import (FastImagePreprocessor, check_draft_parity, draft_reference,
+                            reference_pixels)
+from config import Config
+
+transformers = pytest.importorskip('transformers')
+
+
+@pytest.fixture(scope='module')
+def processor():
+    return transformers.ViTImageProcessor()
+
+
+def _fundus_jpeg(size: int, seed: int = 0) -> bytes:
+    """Full-resolution fundus-like photo: dark surround, textured bright disc"""
+    rng = np.random.default_rng(seed)
+    y, x = np.mgrid[0:size, 0:size]
+    disc = ((x - size / 2) ** 2 + (y - size / 2) ** 2) < (size * 0.45) ** 2
+    pixels = rng.integers(0, 40, (size, size, 3))
+    vessels = (np.sin(x / (size / 40)) * np.cos(y / (size / 55)) > 0.8)
+    pixels[disc] = np.clip([190, 90, 40] + rng.normal(0, 20, (disc.sum(), 3)), 0, 255)
+    pixels[disc & vessels] = [120, 30, 20]
+    buffer = io.BytesIO()
+    Image.fromarray(pixels.astype('uint8'), 'RGB').save(buffer, 'JPEG', quality=92)
+    return buffer.getvalue()
+
+
+def test_fast_path_matches_hf_processor(processor):
+    images = reference_images(count=4)
+    fast = FastImagePreprocessor(processor)
+    expected = reference_pixels(processor, images)
+    actual = fast.pixel_array(images).transpose(0, 3, 1, 2)
+    assert np.abs(expected - actual).max() <= Config.PREPROCESS_PARITY_ATOL
+
+
+@pytest.mark.parametrize('size', [1024, 1792, 2048, 3000])
+def test_draft_decode_matches_full_decode(processor, size):
+    data = _fundus_jpeg(size)
+    fast = FastImagePreprocessor(processor)
+
+    draft = load_image(data, draft_size=fast.decode_size)
+    full = load_image(data)
+    assert draft.size[0] < full.size[0]
+    assert min(draft.size) > min(fast.decode_size)
+
+    expected = reference_pixels(processor, [full])
+    actual = fast.pixel_array([draft]).transpose(0, 3, 1, 2)
+    assert expected.shape == actual.shape
+    assert np.abs(expected - actual).mean() <= Config.PREPROCESS_DRAFT_ATOL
+
+
+def test_load_time_draft_check_passes_on_reference_set(processor):
+    fast = FastImagePreprocessor(processor)
+    report = check_draft_parity(processor, fast, draft_reference(reference_images(), fast.decode_size),
+                                atol=Config.PREPROCESS_DRAFT_ATOL)
+    assert report['passed'], report
+
+
+def test_load_time_draft_check_rejects_a_tight_tolerance(processor):
+    fast = FastImagePreprocessor(processor)
+    report = check_draft_parity(processor, fast, draft_reference(reference_images(count=2), fast.decode_size),
+                                atol=1e-6)
+    assert not report['passed']
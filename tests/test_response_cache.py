@@ -0,0 +1,25 @@
+from app.response_cache import source_digest
+from tests.conftest import build_app, login_admin
+
+
+def test_etag_is_stable_and_answers_304(admin_client):
+    etag = admin_client.get('/admin/api/contacts').headers['ETag']
+    assert admin_client.get('/admin/api/contacts').headers['ETag'] == etag
+    response = admin_client.get('/admin/api/contacts', headers={'If-None-Match': etag})
+    assert response.status_code == 304
+
+
+def test_a_new_build_invalidates_etags(tmp_path):
+    old = login_admin(build_app(tmp_path, APP_BUILD_ID='build-1').test_client())
+    etag = old.get('/admin/api/contacts').headers['ETag']
+
+    # Same database, table version and query; only the build differs
+    new = login_admin(build_app(tmp_path, APP_BUILD_ID='build-2').test_client())
+    response = new.get('/admin/api/contacts', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+
+
+def test_build_id_defaults_to_the_source_digest(app):
+    assert app.extensions['response_cache'].build_id == source_digest()
+    assert len(source_digest()) == 12